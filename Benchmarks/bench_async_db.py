@@ -0,0 +1,74 @@
+#bench_async_db.py compares the old blocking handler pattern against Database.executor.run_query
+#a fake PostgREST query sleeps for a fixed latency so no supabase project is needed
+#run from the repo root: python Benchmarks/bench_async_db.py --requests 400 --concurrency 50 --latency-ms 20
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from Database.executor import run_query
+
+class FakeQuery:
+    """Stands in for a PostgREST builder: .execute() blocks for a fixed round-trip time."""
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self):
+        time.sleep(self.latency)
+        return {"data": [{"course_code": "VFB4094"}]}
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        return FakeQuery(latency).execute() #what every route did before: sync call inside async def
+
+    @app.get("/offloaded")
+    async def offloaded():
+        return await run_query(FakeQuery(latency))
+
+    return app
+
+async def run_load(app: FastAPI, path: str, total: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return total / elapsed, p99 * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    app = build_app(args.latency_ms / 1000)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, simulated query latency {args.latency_ms}ms")
+    for label, path in (("before (blocking)", "/blocking"), ("after (run_query)", "/offloaded")):
+        rps, p99 = asyncio.run(run_load(app, path, args.requests, args.concurrency))
+        print(f"{label:<20} {rps:8.1f} req/s   p99 {p99:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
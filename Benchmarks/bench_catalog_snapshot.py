@@ -0,0 +1,114 @@
+#bench_catalog_snapshot.py compares per-worker catalog dicts with the shared memory-mapped snapshot
+#every worker is a fresh process that makes the catalog ready (parse the PostgREST JSON and build dicts,
+#or map the snapshot) and then serves lookups; reports time to ready, lookup cost and memory per worker
+#run from the repo root: python Benchmarks/bench_catalog_snapshot.py --size 20000 --workers 8
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+#Services.catalog imports the supabase client; placeholders are enough offline
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import orjson
+from bench_seed_sync import synthetic_catalog
+
+def memory_kb():
+    """Private (USS) and proportional (PSS) memory of this process, from /proc."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), fields.get("Pss", 0)
+
+def worker(mode: str, payload_path: str, snapshot_path: str, codes: list, lookups: int, results, barrier):
+    from Services.catalog import CourseCatalog
+
+    catalog = CourseCatalog(snapshot_path=snapshot_path if mode == "snapshot" else "")
+    baseline = memory_kb()
+    start = time.perf_counter()
+    if mode == "snapshot":
+        catalog._map_snapshot()
+    else:
+        with open(payload_path, "rb") as file:
+            catalog._build(orjson.loads(file.read())) #what _ensure_loaded does with the PostgREST response
+    ready_ms = (time.perf_counter() - start) * 1000
+
+    async def lookups_us():
+        start = time.perf_counter()
+        for code in codes[:lookups]:
+            await catalog.get(code)
+        return (time.perf_counter() - start) * 1e6 / lookups
+
+    async def department_ms():
+        start = time.perf_counter()
+        await catalog.by_department("CEE", "CD")
+        return (time.perf_counter() - start) * 1000
+
+    catalog._loaded_version, catalog._loaded_at = catalog.version, time.monotonic()
+    lookup_us, dept_ms = asyncio.run(lookups_us()), asyncio.run(department_ms())
+
+    barrier.wait() #every worker still maps the file, so shared pages are counted as shared
+    uss, pss = memory_kb()
+    results.put((mode, ready_ms, lookup_us, dept_ms, uss - baseline[0], pss - baseline[1]))
+    barrier.wait()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    from Services.catalog import CourseCatalog
+    from Services.catalog_snapshot import write_snapshot
+
+    rows = synthetic_catalog(args.size)
+    for row in rows:
+        row["course_semester"] = str(row["course_semester"])
+    directory = tempfile.mkdtemp()
+    payload_path = os.path.join(directory, "courses.json")
+    snapshot_path = os.path.join(directory, "catalog.snapshot")
+    with open(payload_path, "wb") as file:
+        file.write(orjson.dumps(rows))
+
+    builder = CourseCatalog(snapshot_path="")
+    builder._build(rows)
+    start = time.perf_counter()
+    size = write_snapshot(snapshot_path, list(builder._courses.values()), builder._content_hash)
+    print(f"{args.size} courses: PostgREST JSON {os.path.getsize(payload_path) / 1e6:.1f} MB, "
+          f"snapshot {size / 1e6:.1f} MB (compiled in {(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    codes = [row["course_code"] for row in rows]
+    random.Random(1).shuffle(codes)
+    context = multiprocessing.get_context("spawn")
+    for mode in ("dicts", "snapshot"):
+        results, barrier = context.Queue(), context.Barrier(args.workers)
+        processes = [context.Process(target=worker, args=(mode, payload_path, snapshot_path, codes, args.lookups, results, barrier))
+                     for _ in range(args.workers)]
+        for process in processes:
+            process.start()
+        rows_out = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        median = lambda k: sorted(r[k] for r in rows_out)[len(rows_out) // 2]
+        uss = sum(r[4] for r in rows_out) / len(rows_out) / 1024
+        pss = sum(r[5] for r in rows_out) / len(rows_out) / 1024
+        print(f"  {mode:8}  ready {median(1):7.1f} ms   get {median(2):5.1f} us   by_department {median(3):6.1f} ms   "
+              f"per worker: private {uss:5.1f} MB, proportional {pss:5.1f} MB  ({args.workers} workers)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#bench_gpa_engine.py times the per-student utils functions against Services.gpa_engine.GradeBook
+#synthetic transcripts are drawn from Data/courses.json; results are checked for exact equality
+#run from the repo root: python Benchmarks/bench_gpa_engine.py --students 5000
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+#Services.utils builds the supabase client at import time; placeholders are enough for pure computation
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from Services.utils import Calc_Cgpa, Calc_Gpa, TotalCreditHour
+from Services.gpa_engine import GradeBook
+
+GRADES = ["A", "A-", "B+", "B", "C+", "C", "D+", "D", "F", "a ", "", None]
+
+def synthetic_records(students: int, seed: int = 7):
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, "Data", "courses.json")) as file:
+        courses = json.load(file)
+
+    records = {}
+    for s in range(students):
+        rows = []
+        for semester in range(1, rng.randint(2, 10) + 1):
+            picked = rng.sample(courses, 5)
+            if rng.random() < 0.1:
+                picked.append(picked[0]) #same course twice in one semester: Calc_Cgpa keeps the first row
+            for course in picked:
+                rows.append({
+                    "course_code": course["course_code"],
+                    "semester": semester,
+                    "grade": rng.choice(GRADES),
+                    "status": "Completed",
+                    "COURSE": {"credit_hour": course["credit_hour"]},
+                })
+        records[f"student-{s}"] = rows
+    return records
+
+def scalar(records: dict):
+    cgpa, earned, sem_gpa = {}, {}, {}
+    for student_id, rows in records.items():
+        cgpa[student_id] = Calc_Cgpa(rows)
+        earned[student_id] = TotalCreditHour(rows)
+        by_sem = {}
+        for row in rows:
+            by_sem.setdefault(row["semester"], []).append(row)
+        sem_gpa[student_id] = {sem: Calc_Gpa(sem_rows) for sem, sem_rows in by_sem.items()}
+    return cgpa, earned, sem_gpa
+
+def vectorized(records: dict):
+    book = GradeBook(records)
+    return book.cgpa(), book.earned_credits(), book.semester_gpa()
+
+def vectorized_compute_only(book: GradeBook):
+    return book.cgpa(), book.earned_credits(), book.semester_gpa()
+
+def best_of(func, arg, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.students)
+    rows = sum(len(r) for r in records.values())
+
+    scalar_time, expected = best_of(scalar, records, args.repeat)
+    vector_time, actual = best_of(vectorized, records, args.repeat)
+
+    assert actual[0] == expected[0], "CGPA mismatch"
+    assert actual[1] == expected[1], "earned credit mismatch"
+    assert actual[2] == expected[2], "semester GPA mismatch"
+
+    ingest_time, book = best_of(GradeBook, records, args.repeat)
+    compute_time, _ = best_of(vectorized_compute_only, book, args.repeat)
+
+    print(f"{args.students} students, {rows} records (results identical)")
+    print(f"utils functions           {scalar_time * 1000:9.1f} ms")
+    print(f"GradeBook end-to-end      {vector_time * 1000:9.1f} ms   ({scalar_time / vector_time:.1f}x)")
+    print(f"  parse rows into arrays  {ingest_time * 1000:9.1f} ms")
+    print(f"  vectorized aggregates   {compute_time * 1000:9.1f} ms   (reuse the GradeBook for further reports)")
+
+if __name__ == "__main__":
+    main()
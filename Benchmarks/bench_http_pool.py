@@ -0,0 +1,116 @@
+#bench_http_pool.py measures what connection reuse saves per backend round trip
+#a local HTTPS stand-in answers after --rtt-ms and charges new connections the TCP and TLS handshake
+#round trips on top of the real local handshake; compares a fresh httpx client per call (a new connection
+#every time) against Database.http_pool's shared client, one caller at a time and from --threads callers
+#run from the repo root: python Benchmarks/bench_http_pool.py --requests 200 --threads 16 --rtt-ms 20
+
+import argparse
+import os
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from Database import http_pool
+
+BODY = b'[{"course_code":"VFB4094","credit_hour":3}]'
+
+class StandIn(BaseHTTPRequestHandler):
+    """A PostgREST-like endpoint: keep-alive HTTP/1.1, one rtt per request, two more per new connection."""
+    protocol_version = "HTTP/1.1"
+    rtt = 0.02
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) #headers and body go out as separate writes
+        self.connection.do_handshake()
+        time.sleep(2 * self.rtt) #TCP handshake plus a TLS 1.3 handshake over the network
+
+    def do_GET(self):
+        time.sleep(self.rtt)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+def start_server(directory: str, rtt: float):
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes",
+         "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    os.environ["SSL_CERT_FILE"] = cert #httpx trusts the stand-in's certificate through the environment
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    StandIn.rtt = rtt
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    #handshake in the handler thread, not in accept(), so new connections are not serialized
+    server.socket = context.wrap_socket(server.socket, server_side=True, do_handshake_on_connect=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"https://127.0.0.1:{server.server_address[1]}/rest/v1/COURSE"
+
+def fresh_client_call(url: str):
+    with httpx.Client() as client:
+        return client.get(url)
+
+def run(label: str, call, requests: int, threads: int):
+    timings = []
+
+    def timed(_):
+        start = time.perf_counter()
+        call().raise_for_status()
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    p50, p95 = timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+    print(f"  {label:44} mean {sum(timings) / len(timings) * 1000:7.1f} ms   p50 {p50 * 1000:7.1f}   "
+          f"p95 {p95 * 1000:7.1f}   {requests / elapsed:7.1f} req/s")
+    return sum(timings) / len(timings)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rtt-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server, url = start_server(directory, args.rtt_ms / 1000)
+
+        for threads in (1, args.threads):
+            client = http_pool.sync_client(f"bench-{threads}")
+            print(f"{args.requests} GETs from {threads} thread(s), network rtt {args.rtt_ms:g} ms:")
+            fresh = run("new httpx.Client per call (a connection each)", lambda: fresh_client_call(url),
+                        args.requests, threads)
+            pooled = run("http_pool.sync_client (shared, keep-alive)", lambda: client.get(url),
+                         args.requests, threads)
+            counters = http_pool.stats()["clients"][f"bench-{threads}"]
+            print(f"  pool: {counters['connections_opened']} connections and {counters['tls_handshakes']} TLS handshakes "
+                  f"for {counters['requests']} requests (reuse {counters['reuse_ratio']:.1%}); "
+                  f"round trip {fresh / pooled:.1f}x faster")
+            client.close()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#bench_import_time.py measures how long `import main` takes in a fresh interpreter, from python -X importtime
+#reports the total, the slowest top-level packages (self time summed over their submodules) and whether
+#the heavy clients stayed unimported; --budget-ms fails the run when startup regresses past it
+#run from the repo root: python Benchmarks/bench_import_time.py --runs 5 --budget-ms 1500
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+#created on first use by the lazy providers; none of them should load at import time
+DEFERRED = ["supabase", "huggingface_hub", "passlib", "PIL", "numpy"]
+
+def import_profile(module: str):
+    """(total us, {module: self us}) for one import of module in a new interpreter."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "0"}
+    env.setdefault("SUPABASE_URL", "http://localhost:54321") #placeholders: nothing connects at import time
+    env.setdefault("SUPABASE_KEY", "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+
+    modules, total = {}, 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        modules[name] = self_us
+        if not indent:
+            total += cumulative_us
+    return total, modules
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--budget-ms", type=float, default=None, help="exit 1 when the median import is slower")
+    args = parser.parse_args()
+
+    import_profile(args.module) #warm the bytecode cache so every run measures imports, not compiles
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    totals = sorted(total for total, _ in profiles)
+    median_ms = totals[len(totals) // 2] / 1000
+    _, modules = profiles[len(profiles) // 2]
+
+    packages = {}
+    for name, self_us in modules.items():
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+
+    print(f"import {args.module}: median {median_ms:.0f} ms over {args.runs} runs "
+          f"(min {totals[0] / 1000:.0f}, max {totals[-1] / 1000:.0f}), {len(modules)} modules")
+    for root, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {root:28} {self_us / 1000:8.1f} ms")
+
+    loaded = [name for name in DEFERRED if name in modules]
+    print(f"deferred clients imported at startup: {', '.join(loaded) if loaded else 'none'}")
+
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"FAIL: {median_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
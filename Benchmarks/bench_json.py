@@ -0,0 +1,113 @@
+#bench_json.py measures response serialization CPU time and bytes on the wire for the largest payloads:
+#the full catalog, a full transcript (list[ReadSemesterCourse]) and a report-data payload, built from Data/courses.json
+#run from the repo root: python Benchmarks/bench_json.py --semesters 10 --repeat 200
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+#Routes.report imports the supabase client; placeholders are enough offline
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from Model.models import ReadSemesterCourse
+from Routes.report import build_report_structure
+from Services.catalog import normalize_prereqs
+from Services.responses import json_response
+
+GRADES = ["A+", "A", "A-", "B+", "B", "B-", "C+", "C", "D", "F"]
+
+def full_catalog():
+    with open(os.path.join(ROOT, "Data", "courses.json")) as file:
+        rows = json.load(file)
+    for row in rows:
+        row["pre_requisite"] = normalize_prereqs(row.get("pre_requisite"))
+        if row.get("course_semester") is not None:
+            row["course_semester"] = str(row["course_semester"]) #a text column in COURSE
+    return rows
+
+def full_transcript(catalog: list, semesters: int, seed: int = 3):
+    """Six courses a semester with the COURSE join, the shape /student_course/get returns."""
+    rng = random.Random(seed)
+    student_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    courses = rng.sample(catalog, min(len(catalog), semesters * 6))
+    return [
+        {
+            "student_id": student_id,
+            "course_code": course["course_code"],
+            "semester": i // 6 + 1,
+            "grade": rng.choice(GRADES) if i // 6 < semesters - 1 else None,
+            "status": "Completed" if i // 6 < semesters - 1 else "Current",
+            "COURSE": dict(course),
+        }
+        for i, course in enumerate(courses)
+    ]
+
+def report_payload(transcript: list):
+    report_structure, _ = build_report_structure(transcript)
+    return {
+        "student_info": {"student_email": "bench@utp.edu.my", "student_name": "Bench Student", "intake_session": "2022-09-01"},
+        "academic_record": report_structure, #int semester keys, like the real route
+        "final_cgpa": 3.21,
+        "total_credits_accumulated": sum(d["total_credits"] for d in report_structure.values()),
+    }
+
+def best_of(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+def report(label: str, payload, repeat: int, adapter: TypeAdapter = None):
+    if adapter:
+        # response_model routes: FastAPI validates the rows, dumps them to JSON-ready python, then renders
+        encode = lambda: adapter.dump_python(adapter.validate_python(payload), mode="json")
+    else:
+        # routes without a response_model go through jsonable_encoder first
+        encode = lambda: jsonable_encoder(payload)
+
+    default_us = best_of(lambda: JSONResponse(encode()).body, repeat)
+    orjson_us = best_of(lambda: ORJSONResponse(encode()).body, repeat)
+    body = ORJSONResponse(encode()).body
+    assert json.loads(body) == json.loads(JSONResponse(encode()).body)
+
+    print(f"{label}: {len(body):,} bytes of JSON")
+    print(f"  FastAPI default (encode + json.dumps)    {default_us:8.1f} us")
+    print(f"  ORJSONResponse  (encode + orjson)        {orjson_us:8.1f} us   {default_us / orjson_us:4.1f}x")
+    if not adapter:
+        direct_us = best_of(lambda: json_response(payload).body, repeat)
+        assert json.loads(json_response(payload).body) == json.loads(body)
+        print(f"  json_response   (orjson only)            {direct_us:8.1f} us   {default_us / direct_us:4.1f}x")
+    for level in (1, 6, 9):
+        gzip_us = best_of(lambda: gzip.compress(body, compresslevel=level), max(1, repeat // 4))
+        size = len(gzip.compress(body, compresslevel=level))
+        print(f"  gzip level {level}  {size:8,} bytes ({size / len(body):5.1%})  {gzip_us:8.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--semesters", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    catalog = full_catalog()
+    transcript = full_transcript(catalog, args.semesters)
+
+    report("full catalog", catalog, args.repeat)
+    report("full transcript", transcript, args.repeat, adapter=TypeAdapter(list[ReadSemesterCourse]))
+    report("report payload", report_payload(transcript), args.repeat)
+
+if __name__ == "__main__":
+    main()
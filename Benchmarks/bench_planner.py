@@ -0,0 +1,82 @@
+#bench_planner.py times Services.planner.SemesterPlanner on the real catalog and on synthetic ones
+#synthetic catalogs are layered DAGs (prerequisites only point to earlier layers) with 1-4 credit courses
+#run from the repo root: python Benchmarks/bench_planner.py --sizes 500 5000 20000
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+#Services.prereq_graph reaches the supabase client through the catalog; placeholders are enough offline
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from Services.catalog import normalize_prereqs
+from Services.prereq_graph import PrerequisiteGraph
+from Services.planner import SemesterPlanner, FULL_LOAD
+
+def real_catalog():
+    with open(os.path.join(ROOT, "Data", "courses.json")) as file:
+        rows = json.load(file)
+    for row in rows:
+        row["pre_requisite"] = normalize_prereqs(row.get("pre_requisite"))
+    return rows
+
+def synthetic_catalog(size: int, seed: int = 11):
+    rng = random.Random(seed)
+    layers = max(10, size // 50)
+    rows = []
+    for i in range(size):
+        layer = i * layers // size
+        earlier = len(rows) - (len(rows) % max(1, size // layers)) if layer else 0
+        pre_requisite = sorted({rows[rng.randrange(earlier)]["course_code"] for _ in range(rng.randint(0, 3))}) if earlier else []
+        rows.append({
+            "course_code": f"SYN{i:06d}",
+            "credit_hour": float(rng.choice([1, 2, 2, 3, 3, 3, 4])),
+            "course_semester": layer + 1 if rng.random() < 0.6 else None,
+            "pre_requisite": pre_requisite,
+        })
+    return rows
+
+def best_of(func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def report(label: str, rows: list, first_limit: int, repeat: int):
+    # The graph is compiled once per catalog load (CATALOG.derived); only the plan runs per request
+    graph_time, graph = best_of(lambda: PrerequisiteGraph(rows), repeat)
+    courses = {row["course_code"]: row for row in rows}
+    plan_time, plan = best_of(
+        lambda: SemesterPlanner(courses, graph.prereqs, set(graph.external)).plan(1, first_limit=first_limit),
+        repeat
+    )
+    gap = plan["semester_count"] - plan["lower_bound"]
+    print(
+        f"{label:<30} {len(rows):>7} courses {plan['total_credits']:>9.0f} cr "
+        f"{plan['semester_count']:>6} sems (bound {plan['lower_bound']}, +{gap}, {plan['strategy']:<11}) "
+        f"plan {plan_time * 1000:8.1f} ms   graph {graph_time * 1000:9.1f} ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = real_catalog()
+    report("Data/courses.json", catalog, FULL_LOAD, args.repeat)
+    report("Data/courses.json, probation", catalog, 11, args.repeat)
+    for size in args.sizes:
+        report(f"synthetic {size}", synthetic_catalog(size), FULL_LOAD, args.repeat)
+
+if __name__ == "__main__":
+    main()
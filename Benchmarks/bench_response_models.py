@@ -0,0 +1,76 @@
+#bench_response_models.py measures what response_model validation costs per 100 transcript rows
+#compares FastAPI's path (validate, dump, render), a precompiled TypeAdapter writing the JSON itself,
+#Services.responses.model_list_response (trusted rows cut to the model's fields, written by orjson) and
+#skipping validation with model_construct; all must give the same JSON
+#run from the repo root: python Benchmarks/bench_response_models.py --rows 100 --repeat 300
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_json import full_catalog, full_transcript
+from fastapi.responses import ORJSONResponse
+from Model.models import ReadSemesterCourse, CourseRead
+from pydantic import BaseModel
+from Services.responses import list_adapter, model_list_response
+
+def construct(model: type[BaseModel], row: dict):
+    """model_construct with the nested COURSE built the same way: no validation at all."""
+    values = dict(row)
+    if model is ReadSemesterCourse and isinstance(values.get("COURSE"), dict):
+        values["COURSE"] = CourseRead.model_construct(**values["COURSE"])
+    return model.model_construct(**values)
+
+def best_of(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+def report(label: str, model, rows: list, repeat: int):
+    adapter = list_adapter(model)
+    per_100 = 100 / len(rows)
+
+    paths = {
+        "validate only": lambda: adapter.validate_python(rows),
+        "FastAPI response_model (validate + dump + render)":
+            lambda: ORJSONResponse(adapter.dump_python(adapter.validate_python(rows), mode="json")).body,
+        "TypeAdapter (validate + dump_json)":
+            lambda: adapter.dump_json(adapter.validate_python(rows)),
+        "model_list_response (project + orjson, no validation)":
+            lambda: model_list_response(model, rows).body,
+        "model_construct + dump_json (no validation)":
+            lambda: adapter.dump_json([construct(model, row) for row in rows], warnings=False),
+    }
+
+    expected = json.loads(paths["FastAPI response_model (validate + dump + render)"]())
+    #byte for byte too: 3 and 3.0 compare equal once parsed, but not on the wire
+    assert paths["model_list_response (project + orjson, no validation)"]() == paths["TypeAdapter (validate + dump_json)"]()
+    print(f"{label}: {len(rows)} rows, times per 100 rows")
+    for name, func in paths.items():
+        if name != "validate only":
+            assert json.loads(func()) == expected, name
+        print(f"  {name:54} {best_of(func, repeat) * per_100:8.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    catalog = full_catalog()
+    transcript = full_transcript(catalog, semesters=max(1, args.rows // 6))[:args.rows]
+    for row in transcript:
+        row["id"] = len(row) #PostgREST "*" also returns columns the model does not declare
+
+    report("ReadSemesterCourse (transcript rows with COURSE)", ReadSemesterCourse, transcript, args.repeat)
+    report("CourseRead (catalog rows)", CourseRead, catalog[:args.rows], args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#bench_seed_sync.py times seed.py's incremental sync on synthetic multi-department catalogs
+#compares json.load + upsert-everything payload against the streaming parser + content-hash diff,
+#with a stored table where only --changed courses differ; also reports peak parse memory
+#run from the repo root: python Benchmarks/bench_seed_sync.py --sizes 1000 10000 50000 --changed 20
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#seed imports the supabase client; placeholders are enough offline
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import seed
+
+DEPARTMENTS = ["CEE", "ME", "EE", "CHE", "PE", "CS", "IT", "BM"]
+
+def synthetic_catalog(size: int, seed_value: int = 5):
+    rng = random.Random(seed_value)
+    codes = [f"{rng.choice(DEPARTMENTS)}{i:05d}" for i in range(size)]
+    return [
+        {
+            "course_code": code,
+            "course_name": f"Course {i}",
+            "credit_hour": float(rng.choice([1, 2, 3, 4])),
+            "pre_requisite": rng.sample(codes[:i], min(i, rng.randint(0, 3))),
+            "course_type": rng.choice(["CD", "NR", "UR", "CC", "EM"]),
+            "course_semester": rng.randint(1, 10),
+            "course_desc": None,
+            "course_department": rng.sample(DEPARTMENTS, rng.randint(1, 2)),
+        }
+        for i, code in enumerate(codes)
+    ]
+
+def stored_table(courses: list, changed: int):
+    """The table as PostgREST returns it (course_semester as text) with a few rows out of date."""
+    stored = {c["course_code"]: {**c, "course_semester": str(c["course_semester"])} for c in courses}
+    for course in random.Random(9).sample(courses, changed):
+        stored[course["course_code"]]["credit_hour"] += 1
+    return stored
+
+def measure(func):
+    """Result, wall time (ms) and traced peak memory (MB); timed on its own run, tracing slows it down."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed * 1000, peak / 1e6
+
+def from_file(path: str, read):
+    with open(path, "r") as file:
+        return read(file)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--changed", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        courses = synthetic_catalog(size)
+        text = json.dumps(courses, indent=2)
+        path = os.path.join(tempfile.gettempdir(), f"bench_courses_{size}.json")
+        with open(path, "w") as file:
+            file.write(text)
+        stored = stored_table(courses, min(args.changed, size))
+
+        full, full_ms, full_mb = measure(lambda: from_file(path, json.load))
+        parsed, stream_ms, stream_mb = measure(lambda: from_file(path, lambda f: sum(1 for _ in seed.iter_json_array(f))))
+        diff, diff_ms, _ = measure(lambda: from_file(path, lambda f: seed.diff_courses(seed.iter_json_array(f), stored)))
+        os.remove(path)
+        added, changed, unchanged, removed = diff
+        assert parsed == len(full) == size and not added and not removed and len(changed) == min(args.changed, size)
+
+        payload = len(json.dumps(full).encode())
+        pending = len(json.dumps(changed).encode())
+        print(f"{size:6} courses, {len(text) / 1e6:5.1f} MB file")
+        print(f"  json.load                 {full_ms:8.1f} ms  peak {full_mb:6.1f} MB")
+        print(f"  iter_json_array           {stream_ms:8.1f} ms  peak {stream_mb:6.1f} MB")
+        print(f"  stream + hash diff        {diff_ms:8.1f} ms")
+        print(f"  upsert payload: full {payload / 1e6:6.2f} MB in {-(-size // seed.SEED_CHUNK_SIZE)} requests, "
+              f"incremental {pending / 1e3:6.1f} KB in {-(-len(changed) // seed.SEED_CHUNK_SIZE)}")
+
+if __name__ == "__main__":
+    main()
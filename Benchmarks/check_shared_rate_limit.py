@@ -0,0 +1,113 @@
+#check_shared_rate_limit.py shows the advisor rate limit holds across worker processes
+#  storage check: N processes hit the same "2/minute" key at once through limits' fixed-window strategy,
+#                 once with memory:// (each process counts alone) and once with Services.rate_limit's sqlite://
+#  server check (--server): starts uvicorn main:app with N workers and calls /advisor/ai-advisor until it gets 429s
+#run from the repo root: python Benchmarks/check_shared_rate_limit.py --processes 8 [--server]
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from Services.rate_limit import SQLiteStorage
+
+LIMIT = "2/minute" #same limit as the advisor routes
+
+def hammer(uri: str, key: str, hits: int, barrier, results):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    item = parse(LIMIT)
+    barrier.wait() #every process starts hitting at the same moment
+    results.put(sum(limiter.hit(item, key) for _ in range(hits)))
+
+def allowed_across_processes(uri: str, processes: int, hits: int):
+    key = str(uuid.uuid4())
+    barrier, results = multiprocessing.Barrier(processes), multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=hammer, args=(uri, key, hits, barrier, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    allowed = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return allowed
+
+def per_hit_microseconds(uri: str, hits: int = 5000):
+    limiter = FixedWindowRateLimiter(storage_from_string(uri))
+    item = parse(f"{hits * 2}/minute")
+    key = str(uuid.uuid4())
+    start = time.perf_counter()
+    for _ in range(hits):
+        limiter.hit(item, key)
+    return (time.perf_counter() - start) / hits * 1e6
+
+def storage_check(processes: int, hits: int, uri: str):
+    expected = parse(LIMIT).amount
+    print(f"{processes} processes x {hits} hits on {LIMIT}")
+    for label, storage_uri in (("memory://", "memory://"), ("sqlite://", uri)):
+        allowed = allowed_across_processes(storage_uri, processes, hits)
+        print(f"  {label:10} allowed {allowed:4}  per hit {per_hit_microseconds(storage_uri):7.1f} us")
+    return allowed == expected
+
+def server_check(workers: int, port: int, uri: str, calls: int):
+    env = dict(os.environ, RATE_LIMIT_STORAGE_URI=uri)
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:9") #requests past the limiter may fail, that is fine here
+    env.setdefault("SUPABASE_KEY", "check")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/advisor/ai-advisor/{uuid.uuid4()}"
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/docs", timeout=1)
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+
+        statuses = []
+        for _ in range(calls): #a fresh connection per call, so the calls spread over the workers
+            try:
+                statuses.append(urllib.request.urlopen(url, timeout=10).status)
+            except urllib.error.HTTPError as e:
+                statuses.append(e.code)
+    finally:
+        server.terminate()
+        server.wait()
+
+    passed = sum(status != 429 for status in statuses)
+    print(f"uvicorn --workers {workers}: {calls} calls, {passed} got past the limiter, {statuses.count(429)} were 429")
+    return passed == parse(LIMIT).amount
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--hits", type=int, default=10, help="hits per process")
+    parser.add_argument("--server", action="store_true", help="also check a multi-worker uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        uri = "sqlite:///" + os.path.join(folder, "rate_limits.sqlite3")
+        ok = storage_check(args.processes, args.hits, uri)
+        if args.server:
+            SQLiteStorage(uri).reset()
+            ok = server_check(args.processes, args.port, uri, args.processes * 3) and ok
+
+    print("limit is global" if ok else "LIMIT IS NOT GLOBAL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
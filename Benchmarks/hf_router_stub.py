@@ -0,0 +1,101 @@
+#hf_router_stub.py is a local stand-in for the Hugging Face router's OpenAI-compatible chat API
+#point the backend at it with HF_ROUTER_URL=http://127.0.0.1:8901/v1 to exercise the advisor offline
+#run from the repo root: python Benchmarks/hf_router_stub.py --port 8901 --latency 3
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+app.state.latency = 3.0
+app.state.first_token = 0.3
+app.state.fail_rate = 0.0
+app.state.calls = 0
+app.state.failures = 0
+
+def fake_analysis(messages: list, max_tokens: int):
+    """Deterministic text derived from the prompt, about max_tokens words long."""
+    digest = hashlib.sha256(repr(messages).encode("utf-8")).hexdigest()
+    words = ["Overall", "standing", "is", "steady;", "focus", "on", "core", "courses", "and", "prerequisites."]
+    body = " ".join(words[i % len(words)] for i in range(max(1, max_tokens // 4)))
+    return f"[stub {digest[:12]}] {body}"
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    app.state.calls += 1
+    content = fake_analysis(payload.get("messages", []), payload.get("max_tokens") or 600)
+
+    if random.random() < app.state.fail_rate: #an overloaded router answers 503 after a short wait
+        app.state.failures += 1
+        await asyncio.sleep(min(0.5, app.state.latency))
+        return JSONResponse({"error": "Model is overloaded"}, status_code=503)
+
+    if payload.get("stream"):
+        return StreamingResponse(stream_completion(payload, content), media_type="text/event-stream")
+
+    await asyncio.sleep(app.state.latency) #the real router takes seconds for a 600-token completion
+    return {
+        "id": f"stub-{app.state.calls}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(content.split()), "total_tokens": len(content.split())},
+    }
+
+async def stream_completion(payload: dict, content: str):
+    """Same text as the blocking call, as OpenAI chunks spread over the same total latency."""
+    words = content.split(" ")
+    await asyncio.sleep(app.state.first_token)
+    per_word = max(0.0, app.state.latency - app.state.first_token) / len(words)
+
+    for i, word in enumerate(words):
+        chunk = {
+            "id": f"stub-{app.state.calls}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": word if i == 0 else " " + word}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(per_word)
+
+    yield "data: [DONE]\n\n"
+
+@app.get("/stats")
+async def stats():
+    return {
+        "calls": app.state.calls,
+        "failures": app.state.failures,
+        "latency": app.state.latency,
+        "first_token": app.state.first_token,
+        "fail_rate": app.state.fail_rate,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", type=float, default=3.0, help="seconds per completion")
+    parser.add_argument("--first-token", type=float, default=0.3, help="seconds before the first streamed token")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of calls answered with a 503")
+    args = parser.parse_args()
+
+    app.state.latency = args.latency
+    app.state.first_token = args.first_token
+    app.state.fail_rate = args.fail_rate
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
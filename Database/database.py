@@ -1,11 +1,25 @@
-from supabase import create_client, Client
 from dotenv import load_dotenv
+from Database.executor import run_query, run_sync
+from Database.providers import Provider
+from Database.http_pool import sync_client
 import os
 
 load_dotenv()
 
 SUPABASE_URL= os.getenv("SUPABASE_URL")
 SUPABASE_KEY= os.getenv("SUPABASE_KEY") 
+#row-level-security tables the API reads on a student's behalf (the academic aggregates) need the service-role key
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-SUPABASE: Client = create_client(SUPABASE_URL, SUPABASE_KEY) #initialize the supabase client
+def create_supabase_client(key: str = None, pool: str = "supabase"):
+    from supabase import create_client #~0.7 s of imports, paid by the first query instead of every startup
+    from supabase.lib.client_options import SyncClientOptions
+    # PostgREST, storage, auth and functions all talk to the same project host: one pool serves them all
+    return create_client(SUPABASE_URL, key or SUPABASE_KEY, options=SyncClientOptions(httpx_client=sync_client(pool)))
 
+SUPABASE = Provider("supabase", create_supabase_client) #initialize the supabase client on first use
+#without a service-role key, SUPABASE_KEY is expected to be one already (it bypasses RLS either way)
+SUPABASE_SERVICE = Provider(
+    "supabase-service", lambda: create_supabase_client(SUPABASE_SERVICE_ROLE_KEY, "supabase-service")
+) if SUPABASE_SERVICE_ROLE_KEY else SUPABASE
+#route handlers must go through run_query / run_sync so the blocking client never stalls the event loop
@@ -0,0 +1,31 @@
+#executor.py runs the blocking supabase client off the event loop
+#every route is async, so a PostgREST round-trip must never run directly inside the handler
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "32"))
+
+_executor = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the shared thread pool used for database I/O, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="supabase-io")
+    return _executor
+
+async def run_sync(func, *args, **kwargs):
+    """Runs any blocking call (auth, storage, SDK clients) in the shared pool and awaits the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+async def run_query(query):
+    """
+    Executes a PostgREST query builder without blocking the event loop.
+    Build the query as usual and pass it in instead of calling .execute():
+        response = await run_query(SUPABASE.table("COURSE").select("*"))
+    """
+    return await run_sync(query.execute)
@@ -0,0 +1,152 @@
+#http_pool.py builds the httpx clients every outbound call goes through, from one set of pool settings
+#supabase (PostgREST, storage, auth share one sync client) and the advisor's router client (async) get
+#long-lived keep-alive connections, HTTP/2 multiplexing and explicit timeouts instead of each SDK's defaults
+#stats() reports requests, new TCP connections and TLS handshakes per client, so churn is visible
+
+import os
+import threading
+import time
+import httpx
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", os.getenv("DB_MAX_WORKERS", "32"))) #one per DB thread
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", str(HTTP_POOL_MAX_CONNECTIONS)))
+HTTP_POOL_KEEPALIVE_SECONDS = float(os.getenv("HTTP_POOL_KEEPALIVE_SECONDS", "60")) #httpx's default of 5 s drops connections between bursts
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "1") == "1"
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("HTTP_WRITE_TIMEOUT", "30"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "10")) #waiting for a free connection when the pool is full
+
+class PoolStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+        self.failures = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _count(self, event: str):
+        with self._lock:
+            if event == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            elif event == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def trace(self, event: str, info: dict):
+        self._count(event)
+
+    async def atrace(self, event: str, info: dict):
+        self._count(event)
+
+    def record(self, seconds: float, failed: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.failures += failed
+            self.seconds += seconds
+
+    def snapshot(self, pool=None):
+        with self._lock:
+            stats = {
+                "requests": self.requests,
+                "failures": self.failures,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "reuse_ratio": round(1 - self.connections_opened / self.requests, 4) if self.requests else 0.0,
+                "mean_ms": round(self.seconds * 1000 / self.requests, 2) if self.requests else 0.0,
+            }
+        connections = list(getattr(pool, "connections", []))
+        stats["open_connections"] = len(connections)
+        stats["idle_connections"] = sum(1 for connection in connections if connection.is_idle())
+        stats["http2_connections"] = sum(1 for connection in connections if "HTTP/2" in connection.info())
+        return stats
+
+def _with_defaults(request: httpx.Request, trace, timeout: dict):
+    """Adds the trace hook, and the pool's timeouts wherever an SDK passed None (which means never time out)."""
+    requested = request.extensions.get("timeout") or {}
+    request.extensions = {
+        **request.extensions,
+        "trace": trace,
+        "timeout": {key: timeout[key] if requested.get(key) is None else requested[key] for key in timeout},
+    }
+
+class CountingTransport(httpx.HTTPTransport):
+    """Pooled transport that times each request and counts the connections it had to open."""
+
+    def __init__(self, stats: PoolStats, timeout: httpx.Timeout, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        self.timeout = timeout.as_dict()
+
+    def handle_request(self, request: httpx.Request):
+        _with_defaults(request, self.stats.trace, self.timeout)
+        start = time.perf_counter()
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            self.stats.record(time.perf_counter() - start, failed=True)
+            raise
+        self.stats.record(time.perf_counter() - start) #time to response headers
+        return response
+
+class AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, stats: PoolStats, timeout: httpx.Timeout, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+        self.timeout = timeout.as_dict()
+
+    async def handle_async_request(self, request: httpx.Request):
+        _with_defaults(request, self.stats.atrace, self.timeout)
+        start = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.stats.record(time.perf_counter() - start, failed=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return response
+
+_clients = {} #name -> (stats, transport)
+
+def _settings(read_timeout: float = None):
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_POOL_KEEPALIVE_SECONDS,
+    )
+    timeout = httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT if read_timeout is None else read_timeout,
+        write=HTTP_WRITE_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT,
+    )
+    return limits, timeout
+
+def sync_client(name: str, read_timeout: float = None, **kwargs):
+    """A pooled httpx.Client for blocking SDKs (supabase); safe to share across the DB threads."""
+    stats = PoolStats(name)
+    limits, timeout = _settings(read_timeout)
+    transport = CountingTransport(stats, timeout, limits=limits, http2=HTTP_HTTP2)
+    _clients[name] = (stats, transport)
+    return httpx.Client(transport=transport, timeout=timeout, follow_redirects=True, **kwargs)
+
+def async_client(name: str, read_timeout: float = None, **kwargs):
+    """A pooled httpx.AsyncClient for SDKs awaited on the event loop (the advisor router)."""
+    stats = PoolStats(name)
+    limits, timeout = _settings(read_timeout)
+    transport = AsyncCountingTransport(stats, timeout, limits=limits, http2=HTTP_HTTP2)
+    _clients[name] = (stats, transport)
+    return httpx.AsyncClient(transport=transport, timeout=timeout, follow_redirects=True, **kwargs)
+
+def stats():
+    """Counters and current connections for every client built so far, plus the shared settings."""
+    return {
+        "settings": {
+            "max_connections": HTTP_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_POOL_MAX_KEEPALIVE,
+            "keepalive_seconds": HTTP_POOL_KEEPALIVE_SECONDS,
+            "http2": HTTP_HTTP2,
+        },
+        "clients": {name: stats.snapshot(transport._pool) for name, (stats, transport) in _clients.items()},
+    }
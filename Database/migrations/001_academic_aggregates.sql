@@ -0,0 +1,291 @@
+-- 001_academic_aggregates.sql
+-- Running per-student and per-semester academic aggregates, maintained by triggers on STUDENT_COURSE.
+-- Summary, semester GPA, standing and probation read these few rows instead of the whole history.
+--
+-- Apply once (Supabase SQL editor or psql); the migration backfills existing students at the end.
+-- Check it against a full recomputation with verify_academic_aggregates.sql.
+--
+-- Rules mirrored from Services/utils.py:
+--   * grade points follow GRADE_MAP; unknown or empty grades are worth 0.00 (Calc_Gpa)
+--   * credits come from COURSE.credit_hour, 0 when missing
+--   * earned credits: any non-empty grade other than F (TotalCreditHour)
+--   * CGPA counts only the latest attempt of each course among Completed, non-Exemption rows (Calc_Cgpa)
+
+create or replace function public.grade_quality_points(p_grade text)
+returns numeric
+language sql
+immutable
+as $$
+    select case upper(trim(coalesce(p_grade, '')))
+        when 'A'  then 4.00 when 'A-' then 3.75 when 'B+' then 3.50 when 'B' then 3.00
+        when 'C+' then 2.50 when 'C'  then 2.00 when 'D+' then 1.50 when 'D' then 1.00
+        else 0.00
+    end
+$$;
+
+create table if not exists public."STUDENT_ACADEMIC_AGGREGATE" (
+    student_id      uuid primary key,
+    completed_count integer not null default 0,   -- status Completed, grade not Exemption
+    current_count   integer not null default 0,
+    planned_count   integer not null default 0,
+    earned_credits  numeric not null default 0,   -- TotalCreditHour over the completed list
+    cgpa_points     numeric not null default 0,   -- latest attempts only
+    cgpa_credits    numeric not null default 0,
+    revision        bigint  not null default 0,   -- bumped on every STUDENT_COURSE change for the student
+    updated_at      timestamptz not null default now()
+);
+
+create table if not exists public."STUDENT_SEMESTER_AGGREGATE" (
+    student_id         uuid not null references public."STUDENT_ACADEMIC_AGGREGATE"(student_id) on delete cascade,
+    semester           text not null,             -- str(semester), as the API compares them
+    row_count          integer not null default 0,
+    status_completed   integer not null default 0, -- every Completed row, Exemptions included (probation rule)
+    status_current     integer not null default 0,
+    status_planned     integer not null default 0,
+    completed_count    integer not null default 0, -- Completed and not Exemption (semester GPA)
+    registered_credits numeric not null default 0, -- every row: semester_credits and Calc_Gpa's denominator
+    gpa_points         numeric not null default 0, -- every row: Calc_Gpa's numerator
+    graded_credits     numeric not null default 0, -- TotalCreditHour over every row (standing)
+    completed_points   numeric not null default 0, -- Completed and not Exemption
+    completed_credits  numeric not null default 0,
+    primary key (student_id, semester)
+);
+
+-- Contribution of each (student, course) latest attempt to the CGPA, so a change only re-reads one course
+create table if not exists public."STUDENT_COURSE_LATEST" (
+    student_id  uuid not null,
+    course_code text not null,
+    semester    text not null,
+    points      numeric not null,
+    credits     numeric not null,
+    primary key (student_id, course_code)
+);
+
+create or replace function public.apply_student_course_delta(
+    p_student uuid, p_course text, p_semester text, p_grade text, p_status text, p_sign integer
+)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_credits   numeric;
+    v_points    numeric;
+    v_grade     text := upper(trim(coalesce(p_grade, '')));
+    v_status    text := coalesce(p_status, '');
+    v_completed boolean := v_status = 'Completed' and p_grade is distinct from 'Exemption';
+    v_graded    boolean := v_grade <> '' and v_grade <> 'F';
+begin
+    select coalesce(credit_hour, 0) into v_credits from "COURSE" where course_code = p_course;
+    v_credits := coalesce(v_credits, 0);
+    v_points  := grade_quality_points(p_grade) * v_credits;
+
+    insert into "STUDENT_ACADEMIC_AGGREGATE" (student_id) values (p_student)
+    on conflict (student_id) do nothing;
+
+    update "STUDENT_ACADEMIC_AGGREGATE" set
+        completed_count = completed_count + p_sign * v_completed::int,
+        current_count   = current_count   + p_sign * (v_status = 'Current')::int,
+        planned_count   = planned_count   + p_sign * (v_status = 'Planned')::int,
+        earned_credits  = earned_credits  + p_sign * case when v_completed and v_graded then v_credits else 0 end
+    where student_id = p_student;
+
+    insert into "STUDENT_SEMESTER_AGGREGATE" (student_id, semester) values (p_student, p_semester)
+    on conflict (student_id, semester) do nothing;
+
+    update "STUDENT_SEMESTER_AGGREGATE" set
+        row_count          = row_count          + p_sign,
+        status_completed   = status_completed   + p_sign * (v_status = 'Completed')::int,
+        status_current     = status_current     + p_sign * (v_status = 'Current')::int,
+        status_planned     = status_planned     + p_sign * (v_status = 'Planned')::int,
+        completed_count    = completed_count    + p_sign * v_completed::int,
+        registered_credits = registered_credits + p_sign * v_credits,
+        gpa_points         = gpa_points         + p_sign * v_points,
+        graded_credits     = graded_credits     + p_sign * case when v_graded then v_credits else 0 end,
+        completed_points   = completed_points   + p_sign * case when v_completed then v_points else 0 end,
+        completed_credits  = completed_credits  + p_sign * case when v_completed then v_credits else 0 end
+    where student_id = p_student and semester = p_semester;
+
+    delete from "STUDENT_SEMESTER_AGGREGATE"
+    where student_id = p_student and semester = p_semester and row_count = 0;
+end;
+$$;
+
+-- Re-reads the attempts of one course and moves the CGPA totals by the change in its latest attempt
+create or replace function public.refresh_student_course_latest(p_student uuid, p_course text)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_old "STUDENT_COURSE_LATEST"%rowtype;
+    v_new record;
+begin
+    select * into v_old from "STUDENT_COURSE_LATEST" where student_id = p_student and course_code = p_course;
+
+    select sc.semester::text as semester,
+           grade_quality_points(sc.grade) * coalesce(c.credit_hour, 0) as points,
+           coalesce(c.credit_hour, 0) as credits
+      into v_new
+      from "STUDENT_COURSE" sc
+      left join "COURSE" c on c.course_code = sc.course_code
+     where sc.student_id = p_student
+       and sc.course_code = p_course
+       and sc.status = 'Completed'
+       and sc.grade is distinct from 'Exemption'
+     order by sc.semester desc
+     limit 1;
+
+    update "STUDENT_ACADEMIC_AGGREGATE" set
+        cgpa_points  = cgpa_points  - coalesce(v_old.points, 0)  + coalesce(v_new.points, 0),
+        cgpa_credits = cgpa_credits - coalesce(v_old.credits, 0) + coalesce(v_new.credits, 0)
+    where student_id = p_student;
+
+    if v_new.semester is null then
+        delete from "STUDENT_COURSE_LATEST" where student_id = p_student and course_code = p_course;
+    else
+        insert into "STUDENT_COURSE_LATEST" (student_id, course_code, semester, points, credits)
+        values (p_student, p_course, v_new.semester, v_new.points, v_new.credits)
+        on conflict (student_id, course_code) do update
+            set semester = excluded.semester, points = excluded.points, credits = excluded.credits;
+    end if;
+end;
+$$;
+
+create or replace function public.sync_student_course_aggregates()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform apply_student_course_delta(old.student_id, old.course_code, old.semester::text, old.grade, old.status, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform apply_student_course_delta(new.student_id, new.course_code, new.semester::text, new.grade, new.status, 1);
+    end if;
+
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform refresh_student_course_latest(old.student_id, old.course_code);
+        update "STUDENT_ACADEMIC_AGGREGATE" set revision = revision + 1, updated_at = now()
+        where student_id = old.student_id;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        if tg_op = 'INSERT' or new.student_id is distinct from old.student_id or new.course_code is distinct from old.course_code then
+            perform refresh_student_course_latest(new.student_id, new.course_code);
+        end if;
+        if tg_op = 'INSERT' or new.student_id is distinct from old.student_id then
+            update "STUDENT_ACADEMIC_AGGREGATE" set revision = revision + 1, updated_at = now()
+            where student_id = new.student_id;
+        end if;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists student_course_aggregates on public."STUDENT_COURSE";
+create trigger student_course_aggregates
+after insert or update or delete on public."STUDENT_COURSE"
+for each row execute function public.sync_student_course_aggregates();
+
+-- Full recomputation for one student: used for the backfill below and when a course's credit hours change
+create or replace function public.rebuild_student_academic_aggregates(p_student uuid)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_row record;
+    v_revision bigint;
+begin
+    select revision into v_revision from "STUDENT_ACADEMIC_AGGREGATE" where student_id = p_student;
+
+    delete from "STUDENT_COURSE_LATEST" where student_id = p_student;
+    delete from "STUDENT_ACADEMIC_AGGREGATE" where student_id = p_student; -- cascades to the semester rows
+
+    insert into "STUDENT_ACADEMIC_AGGREGATE" (student_id, revision)
+    values (p_student, coalesce(v_revision, 0) + 1);
+
+    for v_row in select * from "STUDENT_COURSE" where student_id = p_student loop
+        perform apply_student_course_delta(v_row.student_id, v_row.course_code, v_row.semester::text, v_row.grade, v_row.status, 1);
+    end loop;
+
+    for v_row in select distinct course_code from "STUDENT_COURSE" where student_id = p_student loop
+        perform refresh_student_course_latest(p_student, v_row.course_code);
+    end loop;
+end;
+$$;
+
+create or replace function public.sync_course_credit_aggregates()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    v_student uuid;
+begin
+    for v_student in select distinct student_id from "STUDENT_COURSE" where course_code = new.course_code loop
+        perform rebuild_student_academic_aggregates(v_student);
+    end loop;
+    return null;
+end;
+$$;
+
+drop trigger if exists course_credit_aggregates on public."COURSE";
+create trigger course_credit_aggregates
+after update of credit_hour on public."COURSE"
+for each row when (old.credit_hour is distinct from new.credit_hour)
+execute function public.sync_course_credit_aggregates();
+
+-- The functions above run as their owner (security definer) and write the aggregates; only the triggers
+-- may call them. Supabase also grants execute to anon and authenticated directly, which exposes them over RPC.
+revoke execute on function public.apply_student_course_delta(uuid, text, text, text, text, integer) from public;
+revoke execute on function public.refresh_student_course_latest(uuid, text) from public;
+revoke execute on function public.sync_student_course_aggregates() from public;
+revoke execute on function public.rebuild_student_academic_aggregates(uuid) from public;
+revoke execute on function public.sync_course_credit_aggregates() from public;
+
+do $$
+begin
+    if exists (select 1 from pg_roles where rolname = 'anon')
+       and exists (select 1 from pg_roles where rolname = 'authenticated') then
+        revoke execute on function public.apply_student_course_delta(uuid, text, text, text, text, integer) from anon, authenticated;
+        revoke execute on function public.refresh_student_course_latest(uuid, text) from anon, authenticated;
+        revoke execute on function public.sync_student_course_aggregates() from anon, authenticated;
+        revoke execute on function public.rebuild_student_academic_aggregates(uuid) from anon, authenticated;
+        revoke execute on function public.sync_course_credit_aggregates() from anon, authenticated;
+    end if;
+end;
+$$;
+
+-- Row-level security: students read only their own aggregates (skipped outside Supabase).
+-- The API reads them for any student, so it needs a key that bypasses RLS: set SUPABASE_SERVICE_ROLE_KEY
+-- (or use the service-role key as SUPABASE_KEY). With an anon key these selects return no rows and
+-- Services/aggregates.py falls back to computing the figures from STUDENT_COURSE on every request.
+alter table public."STUDENT_ACADEMIC_AGGREGATE" enable row level security;
+alter table public."STUDENT_SEMESTER_AGGREGATE" enable row level security;
+alter table public."STUDENT_COURSE_LATEST" enable row level security;
+
+do $$
+begin
+    if exists (select 1 from pg_namespace where nspname = 'auth') then
+        drop policy if exists "students read own academic aggregate" on public."STUDENT_ACADEMIC_AGGREGATE";
+        create policy "students read own academic aggregate" on public."STUDENT_ACADEMIC_AGGREGATE"
+            for select using (auth.uid() = student_id);
+
+        drop policy if exists "students read own semester aggregates" on public."STUDENT_SEMESTER_AGGREGATE";
+        create policy "students read own semester aggregates" on public."STUDENT_SEMESTER_AGGREGATE"
+            for select using (auth.uid() = student_id);
+    end if;
+end;
+$$;
+
+-- Backfill existing students
+select public.rebuild_student_academic_aggregates(student_id)
+from (select distinct student_id from public."STUDENT_COURSE") students;
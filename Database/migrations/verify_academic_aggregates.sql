@@ -0,0 +1,67 @@
+-- verify_academic_aggregates.sql
+-- Recomputes every aggregate from STUDENT_COURSE and lists the rows that disagree with the stored ones.
+-- An empty result means the triggers in 001_academic_aggregates.sql are in sync.
+
+with rows as (
+    select sc.student_id,
+           sc.course_code,
+           sc.semester,
+           sc.status,
+           coalesce(c.credit_hour, 0)::numeric as credits,
+           public.grade_quality_points(sc.grade) * coalesce(c.credit_hour, 0)::numeric as points,
+           sc.status = 'Completed' and sc.grade is distinct from 'Exemption' as completed,
+           upper(trim(coalesce(sc.grade, ''))) not in ('', 'F') as graded
+      from public."STUDENT_COURSE" sc
+      left join public."COURSE" c on c.course_code = sc.course_code
+),
+latest as (
+    select distinct on (student_id, course_code) student_id, points, credits
+      from rows
+     where completed
+     order by student_id, course_code, semester desc
+),
+expected_student as (
+    select r.student_id,
+           count(*) filter (where completed)               as completed_count,
+           count(*) filter (where status = 'Current')      as current_count,
+           count(*) filter (where status = 'Planned')      as planned_count,
+           coalesce(sum(credits) filter (where completed and graded), 0) as earned_credits,
+           coalesce((select sum(points)  from latest l where l.student_id = r.student_id), 0) as cgpa_points,
+           coalesce((select sum(credits) from latest l where l.student_id = r.student_id), 0) as cgpa_credits
+      from rows r
+     group by r.student_id
+),
+expected_semester as (
+    select student_id,
+           semester::text as semester,
+           count(*)                                        as row_count,
+           count(*) filter (where status = 'Completed')    as status_completed,
+           count(*) filter (where status = 'Current')      as status_current,
+           count(*) filter (where status = 'Planned')      as status_planned,
+           count(*) filter (where completed)               as completed_count,
+           sum(credits)                                    as registered_credits,
+           sum(points)                                     as gpa_points,
+           coalesce(sum(credits) filter (where graded), 0)    as graded_credits,
+           coalesce(sum(points)  filter (where completed), 0) as completed_points,
+           coalesce(sum(credits) filter (where completed), 0) as completed_credits
+      from rows
+     group by student_id, semester
+)
+select 'student' as level, e.student_id, null::text as semester, to_jsonb(e) as expected, to_jsonb(a) as stored
+  from expected_student e
+  full join public."STUDENT_ACADEMIC_AGGREGATE" a on a.student_id = e.student_id
+ where e.student_id is null and (a.completed_count, a.current_count, a.planned_count) <> (0, 0, 0)
+    or a.student_id is null
+    or (e.completed_count, e.current_count, e.planned_count, e.earned_credits, e.cgpa_points, e.cgpa_credits)
+       is distinct from (a.completed_count, a.current_count, a.planned_count, a.earned_credits, a.cgpa_points, a.cgpa_credits)
+   and e.student_id is not null
+union all
+select 'semester', coalesce(e.student_id, a.student_id), coalesce(e.semester, a.semester), to_jsonb(e), to_jsonb(a)
+  from expected_semester e
+  full join public."STUDENT_SEMESTER_AGGREGATE" a on a.student_id = e.student_id and a.semester = e.semester
+ where e.student_id is null or a.student_id is null
+    or (e.row_count, e.status_completed, e.status_current, e.status_planned, e.completed_count,
+        e.registered_credits, e.gpa_points, e.graded_credits, e.completed_points, e.completed_credits)
+       is distinct from
+       (a.row_count, a.status_completed, a.status_current, a.status_planned, a.completed_count,
+        a.registered_credits, a.gpa_points, a.graded_credits, a.completed_points, a.completed_credits);
@@ -0,0 +1,43 @@
+#providers.py defers building heavy SDK clients (supabase, the Hugging Face router, bcrypt) until first use
+#importing the app then costs nothing for them, and scripts/tests that never touch a client need no credentials
+
+import threading
+
+class Provider:
+    """
+    Holds a zero-argument factory and builds its object once, on first use, under a lock (the
+    supabase client is first reached from executor threads). Attribute access is forwarded, so a
+    provider stands in wherever the client itself used to be a module-level global.
+    """
+
+    def __init__(self, name: str, factory):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    @property
+    def created(self):
+        return self._instance is not None
+
+    def reset(self):
+        """Drops the built object; the next use builds a new one (e.g. after rotating a key)."""
+        with self._lock:
+            self._instance = None
+
+    def __getattr__(self, attribute):
+        if attribute.startswith("_"): #only reached for missing private names (e.g. while copying); never build for those
+            raise AttributeError(attribute)
+        return getattr(self.get(), attribute)
+
+    def __repr__(self):
+        return f"<Provider {self._name} ({'created' if self.created else 'not created'})>"
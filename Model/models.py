@@ -80,6 +80,9 @@ class StudentCourseAdd(BaseModel):
     grade: Optional[str] = ""
     status: Optional[str] = "Null"
 
+class StudentCourseBulkAdd(BaseModel):
+    courses: list[StudentCourseAdd] = Field(..., min_length=1, max_length=80) #a whole transcript fits comfortably
+
 class CourseRead(BaseModel):
     course_name: Optional[str] 
     course_code: Optional[str] 
@@ -114,4 +117,16 @@ class CourseCreate(BaseModel):
     course_type: str  
     credit_hour: float = 0.0
     pre_requisite: Optional[Union[list[str], str]] = []
-    course_department: Optional[Union[list[str], str]] = []
\ No newline at end of file
+    course_department: Optional[Union[list[str], str]] = []
+
+class GotScenario(BaseModel):
+    name: Optional[str] = None
+    fail_courses: list[str] = []
+    probation_semesters: int = Field(0, ge=0, le=21)
+    extra_deferment_normal: int = Field(0, ge=0, le=21)
+    extra_deferment_medical: int = Field(0, ge=0, le=21)
+
+class GotSimulationRequest(BaseModel):
+    scenarios: list[GotScenario] = Field(default_factory=list, max_length=500)
+    monte_carlo_runs: int = Field(0, ge=0, le=20000)
+    seed: Optional[int] = None
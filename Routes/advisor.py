@@ -1,7 +1,15 @@
 from fastapi import APIRouter, HTTPException, Request
-from huggingface_hub import InferenceClient
-from Database.database import SUPABASE
+from fastapi.responses import StreamingResponse
+from Database.database import SUPABASE, run_query
+from Database.providers import Provider
+from Database.http_pool import async_client
+from Services.advisor_cache import ADVISOR_CACHE, advisor_cache_key
+from Services.job_queue import JobQueue, QueueFull, ADVISOR_JOB_TIMEOUT_SECONDS
+from Services.rate_limit import RATE_LIMIT_STORAGE_URI
 from uuid import UUID
+from contextlib import aclosing
+import asyncio
+import json
 import os
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -9,61 +17,286 @@ from slowapi.util import get_remote_address
 router = APIRouter()
 
 # 2. Initialize Limiter to track by IP address
-limiter = Limiter(key_func=get_remote_address)
+# Counters live in a SQLite file shared by all workers, so 2/minute holds however many workers run
+limiter = Limiter(key_func=get_remote_address, storage_uri=RATE_LIMIT_STORAGE_URI)
 
-# 3. Initialize Hugging Face Client
-client = InferenceClient(
-    base_url="https://router.huggingface.co/v1",
-    api_key=os.getenv("HF_TOKEN")
+# 3. Initialize Hugging Face Client (HF_ROUTER_URL points it at a local stand-in for testing)
+# The async client awaits the router on the event loop, so a slow completion never ties up a worker thread
+HF_ROUTER_URL = os.getenv("HF_ROUTER_URL", "https://router.huggingface.co/v1")
+
+def create_advisor_client():
+    from huggingface_hub import AsyncInferenceClient, set_async_client_factory #imported with the first advisor request, not at startup
+    from huggingface_hub.utils._http import async_hf_request_event_hook, async_hf_response_event_hook
+    # the router connection comes from the shared pool (keep-alive, HTTP/2); the hooks are the ones HF's own factory installs
+    set_async_client_factory(lambda: async_client(
+        "advisor",
+        read_timeout=ADVISOR_JOB_TIMEOUT_SECONDS, #a completion arrives in one response, so reads wait as long as a job may
+        event_hooks={"request": [async_hf_request_event_hook], "response": [async_hf_response_event_hook]},
+    ))
+    return AsyncInferenceClient(
+        base_url=HF_ROUTER_URL,
+        api_key=os.getenv("HF_TOKEN")
+    )
+
+client = Provider("advisor", create_advisor_client)
+
+# Streams go straight through the pool with an explicit context: AsyncInferenceClient parks every stream
+# in its exit stack until the client closes, which for a process-wide client means never
+stream_client = Provider("advisor-stream", lambda: async_client("advisor-stream"))
+
+ADVISOR_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
+ADVISOR_MAX_TOKENS = 600
+ADVISOR_TEMPERATURE = 0.6
+
+# 2. THE "TASK-BASED" SYSTEM PROMPT
+SYSTEM_INSTRUCTION = (
+    "You are a Senior Academic Advisor at UTP. Your goal is to provide an "
+    "EXECUTIVE SUMMARY. Do not list every course individually. The paragraph can only contain around 100 to 200 words only. Instead, "
+    "group your findings into three sections: \n"
+    "1. Overall Academic Standing (One paragraph)\n"
+    "2. Critical Priorities (Specific course code to focus on based on low grades or credit weight)\n"
+    "3. Future Planning (Advice for 'Planned' course code and prerequisites)\n"
+    "4. A 3-sentence motivational closing."
 )
 
+NO_RECORDS_MESSAGE = "No course records found. Please add subjects to start the analysis."
+
+def build_transcript_summary(records: list):
+    """
+    1. CLEAN DATA PREPARATION
+    Rows are ordered by semester and course code first, so the same records always give the
+    same transcript (and the same cache key) whatever order the database returns them in.
+    """
+    transcript_summary = ""
+    for record in sorted(records, key=lambda r: (str(r.get("semester")), str(r.get("course_code")))):
+        course = record.get('COURSE') or {}
+        grade = record.get('grade') or "Not Graded"
+        status = record.get('status', 'Unknown')
+
+        transcript_summary += (
+            f"- {course.get('course_name')} ({record.get('course_code')}): "
+            f"Grade: {grade}, Status: {status}, Credit: {course.get('credit_hour')}, Pre-requiste: {course.get('pre_requisite')}\n"
+        )
+    return transcript_summary
+
+def advisor_messages(transcript_summary: str):
+    return [
+        {"role": "system", "content": SYSTEM_INSTRUCTION},
+        {"role": "user", "content": f"Student Transcript Data:\n{transcript_summary}"}
+    ]
+
+def transcript_cache_key(transcript_summary: str):
+    return advisor_cache_key(
+        transcript_summary, SYSTEM_INSTRUCTION, ADVISOR_MODEL,
+        max_tokens=ADVISOR_MAX_TOKENS, temperature=ADVISOR_TEMPERATURE
+    )
+
+async def load_transcript(student_id: UUID):
+    """The student's transcript as prompt text, or None when they have no records."""
+    db_res = await run_query(SUPABASE.table("STUDENT_COURSE").select("*, COURSE(*)").eq("student_id", student_id))
+    if not db_res.data:
+        return None
+    return build_transcript_summary(db_res.data)
+
+async def generate_analysis(transcript_summary: str):
+    # 6. LLM Request using high-availability Llama 3.1
+    response = await client.chat.completions.create(
+        model=ADVISOR_MODEL,
+        messages=advisor_messages(transcript_summary),
+        max_tokens=ADVISOR_MAX_TOKENS,
+        temperature=ADVISOR_TEMPERATURE
+    )
+    return response.choices[0].message.content
+
 @router.get("/ai-advisor/{student_id}")
 @limiter.limit("2/minute")  # 4. Apply limit: 2 requests per minute per IP
 async def get_advisor(request: Request, student_id: UUID): # 5. Added 'request' parameter
     try:
         # Fetch data
-        db_res = SUPABASE.table("STUDENT_COURSE").select("*, COURSE(*)").eq("student_id", student_id).execute()
-
-        if not db_res.data:
-            return {"analysis": "No course records found. Please add subjects to start the analysis."}
-        
-        # 1. CLEAN DATA PREPARATION
-        transcript_summary = ""
-        for record in db_res.data:
-            course = record.get('COURSE', {})
-            grade = record.get('grade') or "Not Graded"
-            status = record.get('status', 'Unknown')
-            
-            transcript_summary += (
-                f"- {course.get('course_name')} ({record.get('course_code')}): "
-                f"Grade: {grade}, Status: {status}, Credit: {course.get('credit_hour')}, Pre-requiste: {course.get('pre_requisite')}\n"
-            )
-
-        # 2. THE "TASK-BASED" SYSTEM PROMPT
-        system_instruction = (
-            "You are a Senior Academic Advisor at UTP. Your goal is to provide an "
-            "EXECUTIVE SUMMARY. Do not list every course individually. The paragraph can only contain around 100 to 200 words only. Instead, "
-            "group your findings into three sections: \n"
-            "1. Overall Academic Standing (One paragraph)\n"
-            "2. Critical Priorities (Specific course code to focus on based on low grades or credit weight)\n"
-            "3. Future Planning (Advice for 'Planned' course code and prerequisites)\n"
-            "4. A 3-sentence motivational closing."
-        )
+        transcript_summary = await load_transcript(student_id)
 
-        # 6. LLM Request using high-availability Llama 3.1
-        response = client.chat.completions.create(
-            model="meta-llama/Llama-3.1-8B-Instruct", 
-            messages=[
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": f"Student Transcript Data:\n{transcript_summary}"}
-            ],
-            max_tokens=600,
-            temperature=0.6 
+        if transcript_summary is None:
+            return {"analysis": NO_RECORDS_MESSAGE, "cached": False}
+
+        # An unchanged transcript (same prompt and model settings) is answered from the cache
+        analysis, cached = await ADVISOR_CACHE.get_or_generate(
+            transcript_cache_key(transcript_summary),
+            lambda: generate_analysis(transcript_summary)
         )
-        
-        return {"analysis": response.choices[0].message.content}
-        
+
+        return {"analysis": analysis, "cached": cached}
+
     except Exception as e:
         # Error handling for rate limits is managed globally, other errors logged here
         print(f"HF ROUTER ERROR: {str(e)}")
-        raise HTTPException(status_code=500, detail="Advisor is currently offline.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Advisor is currently offline.")
+
+def sse_event(data: dict, event: str = None):
+    """One server-sent event; data is JSON so tokens containing newlines stay on one data: line."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def stream_tokens(transcript_summary: str):
+    """
+    Yields completion tokens from the router's OpenAI-compatible streaming API. The response is
+    closed when the generator finishes, fails or is closed early (a client disconnect).
+    """
+    hf_token = os.getenv("HF_TOKEN")
+    async with stream_client.stream(
+        "POST",
+        f"{HF_ROUTER_URL.rstrip('/')}/chat/completions",
+        json={
+            "model": ADVISOR_MODEL,
+            "messages": advisor_messages(transcript_summary),
+            "max_tokens": ADVISOR_MAX_TOKENS,
+            "temperature": ADVISOR_TEMPERATURE,
+            "stream": True
+        },
+        headers={"Authorization": f"Bearer {hf_token}"} if hf_token else None
+    ) as response:
+        if response.is_error:
+            await response.aread()
+        response.raise_for_status()
+        done = False
+        async for line in response.aiter_lines(): #read to the end even after [DONE], so the connection is reused
+            if done or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                done = True
+                continue
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            choices = chunk.get("choices") or []
+            token = (choices[0].get("delta") or {}).get("content") if choices else None
+            if token:
+                yield token
+
+async def stream_analysis(transcript_summary: str):
+    """
+    Yields the analysis as server-sent events: one "token" event per chunk, then "done".
+    A cached analysis goes out as a single token event; a fresh one is cached once it completes.
+    """
+    key = transcript_cache_key(transcript_summary)
+    analysis = ADVISOR_CACHE.lookup(key)
+    if analysis is not None:
+        yield sse_event({"token": analysis}, "token")
+        yield sse_event({"cached": True}, "done")
+        return
+
+    parts = []
+    try:
+        # aclosing: if this generator is closed at a yield, the router response is closed right away too
+        async with aclosing(stream_tokens(transcript_summary)) as tokens:
+            async for token in tokens:
+                parts.append(token)
+                yield sse_event({"token": token}, "token")
+    except asyncio.CancelledError:
+        # The browser went away; leaving aclosing has closed the response and released its connection
+        print("HF ROUTER STREAM: client disconnected, stream closed")
+        raise
+    except Exception as e:
+        # The 200 and headers are already sent, so the failure is reported in-band
+        print(f"HF ROUTER ERROR: {str(e)}")
+        yield sse_event({"detail": "Advisor is currently offline."}, "error")
+        return
+
+    ADVISOR_CACHE.put(key, "".join(parts))
+    yield sse_event({"cached": False}, "done")
+
+@router.get("/ai-advisor/{student_id}/stream")
+@limiter.limit("2/minute")
+async def stream_advisor(request: Request, student_id: UUID):
+    """
+    Same analysis as /ai-advisor, streamed as server-sent events while the model generates it
+    (event: token, data: {"token": ...}; then event: done, or event: error).
+    """
+    transcript_summary = await load_transcript(student_id)
+
+    if transcript_summary is None:
+        async def no_records():
+            yield sse_event({"token": NO_RECORDS_MESSAGE}, "token")
+            yield sse_event({"cached": False}, "done")
+        events = no_records()
+    else:
+        events = stream_analysis(transcript_summary)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} #keep proxies from buffering the stream
+    )
+
+# Background analyses: finished results also land in the advisor cache, so /ai-advisor serves them instantly
+# Job state is shared by all workers through ADVISOR_JOB_STORE_PATH; the cache itself is per worker
+ADVISOR_JOBS = JobQueue(
+    generate_analysis,
+    on_success=lambda job, analysis: ADVISOR_CACHE.put(job.key, analysis)
+)
+
+JOB_KEEPALIVE_SECONDS = 15
+
+@router.post("/jobs/{student_id}", status_code=202)
+@limiter.limit("2/minute")
+async def submit_advisor_job(request: Request, student_id: UUID):
+    """
+    Queues an advisor analysis and returns its job id straight away. Poll GET /advisor/jobs/{job_id}
+    or subscribe to /advisor/jobs/{job_id}/events. Submitting an unchanged transcript again
+    returns the job already in progress, or a finished one when the analysis is cached.
+    """
+    transcript_summary = await load_transcript(student_id)
+
+    if transcript_summary is None:
+        return ADVISOR_JOBS.completed(f"no-records:{student_id}", NO_RECORDS_MESSAGE).to_dict()
+
+    key = transcript_cache_key(transcript_summary)
+    analysis = ADVISOR_CACHE.lookup(key)
+    if analysis is not None:
+        return ADVISOR_JOBS.completed(key, analysis).to_dict()
+
+    try:
+        job = ADVISOR_JOBS.submit(key, transcript_summary)
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Advisor is busy, please try again shortly.")
+
+    return job.to_dict()
+
+@router.get("/jobs/stats")
+async def read_advisor_job_stats():
+    return ADVISOR_JOBS.stats()
+
+@router.get("/jobs/{job_id}")
+async def read_advisor_job(job_id: str):
+    job = ADVISOR_JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_advisor_job(job_id: str):
+    """Server-sent events for one job: keep-alive comments while it runs, then a single done or failed event."""
+    job = ADVISOR_JOBS.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current = job
+        while True:
+            # the job may run on another worker, in which case wait() follows it through the shared store
+            current = await ADVISOR_JOBS.wait(current, JOB_KEEPALIVE_SECONDS)
+            if not current.is_active:
+                break
+            yield ": keep-alive\n\n"
+        yield sse_event(current.to_dict(), current.status)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+async def read_advisor_cache_stats():
+    """Hit/miss counters for the advisor analysis cache."""
+    return ADVISOR_CACHE.stats()
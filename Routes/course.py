@@ -1,138 +1,128 @@
-from fastapi import FastAPI,APIRouter, HTTPException, Depends
-from Database.database import SUPABASE
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from Database.database import SUPABASE, run_query
 from Model.models import  CourseRead, CourseCreate
 from Services.utils import authenticate_admin
+from Services.catalog import CATALOG
+from Services.prereq_graph import get_prereq_graph
+from Services.metrics_cache import METRICS_CACHE
+from Services.etag import make_etag, conditional
+from Services.responses import json_response, model_list_response
 from uuid import UUID
-import json 
 
 router = APIRouter()
 
+async def get_student_department(student_id: UUID):
+    """The student's department, cached with their other figures (update_student invalidates it)."""
+    async def fetch():
+        student_query = await run_query(SUPABASE.table("STUDENT")
+            .select("student_department")
+            .eq("student_id", student_id)
+            .maybe_single())
+
+        if not student_query.data or not student_query.data.get("student_department"):
+            raise HTTPException(
+                status_code=404,
+                detail="Student department not found. Please set your department in your profile."
+            )
+        return student_query.data["student_department"]
+
+    return await METRICS_CACHE.get_or_compute(student_id, "department", fetch)
+
+async def catalog_not_modified(request: Request, response: Response, *parts):
+    """
+    304 when the client's ETag still matches the catalog content for this view (parts, e.g. department
+    and type), else None with the ETag set. Only needs the in-memory catalog hash.
+    """
+    return conditional(request, response, make_etag("catalog", await CATALOG.content_hash(), *parts))
+
 @router.get("/get/all/{student_id}")
-async def read_all_course(student_id: UUID):
-    student_query = SUPABASE.table("STUDENT") \
-        .select("student_department") \
-        .eq("student_id", student_id) \
-        .maybe_single() \
-        .execute()
-    
-    if not student_query.data or not student_query.data.get("student_department"):
-        raise HTTPException(
-            status_code=404, 
-            detail="Student department not found. Please set your department in your profile."
-        )
-    
-    dept_name = student_query.data["student_department"]
+async def read_all_course(student_id: UUID, request: Request, response: Response):
+    dept_name = await get_student_department(student_id)
 
-    json_dept_query = json.dumps([dept_name])
+    not_modified = await catalog_not_modified(request, response, dept_name)
+    if not_modified:
+        return not_modified
 
-    response = SUPABASE.table("COURSE") \
-        .select("*") \
-        .contains("course_department", json_dept_query) \
-        .execute()
+    # Served from the in-memory catalog (pre_requisite already normalized)
+    courses = await CATALOG.by_department(dept_name)
 
-    if not response.data:
+    if not courses:
         raise HTTPException(
             status_code=404, 
             detail=f"No courses found for the {dept_name} department."
         )
-    
-    # 3. Data Normalization
-    for course in response.data:
-        pre_req = course.get("pre_requisite")
-        course["pre_requisite"] = [pre_req] if isinstance(pre_req, str) else (pre_req or [])
         
-    return response.data
+    return json_response(courses, response)
 
-async def get_courses_by_student_context(student_id: UUID, course_type: str):
+async def get_courses_by_student_context(student_id: UUID, course_type: str, request: Request, response: Response):
     """
     Smarter helper that looks up the student's department first, 
     then filters the global COURSE table.
     """
     # 1. Fetch Student's Department
-    student_query = SUPABASE.table("STUDENT") \
-        .select("student_department") \
-        .eq("student_id", student_id) \
-        .maybe_single() \
-        .execute()
-    
-    if not student_query.data or not student_query.data.get("student_department"):
-        raise HTTPException(
-            status_code=404, 
-            detail="Student department not found. Please set your department in your profile."
-        )
-    
-    dept_name = student_query.data["student_department"]
+    dept_name = await get_student_department(student_id)
 
-    # 2. Query COURSE table using Type and Department JSONB filter
-    # We manually stringify the JSON list for PostgreSQL
-    json_dept_query = json.dumps([dept_name])
+    not_modified = await catalog_not_modified(request, response, dept_name, course_type)
+    if not_modified:
+        return not_modified
 
-    response = SUPABASE.table("COURSE") \
-        .select("*") \
-        .ilike("course_type", course_type.strip()) \
-        .contains("course_department", json_dept_query) \
-        .execute()
+    # 2. Filter the cached catalog by Department and Type (case-insensitive, like the old ilike)
+    courses = await CATALOG.by_department(dept_name, course_type)
 
-    if not response.data:
+    if not courses:
         raise HTTPException(
             status_code=404, 
             detail=f"No {course_type} courses found for the {dept_name} department."
         )
-    
-    # 3. Data Normalization
-    for course in response.data:
-        pre_req = course.get("pre_requisite")
-        course["pre_requisite"] = [pre_req] if isinstance(pre_req, str) else (pre_req or [])
         
-    return response.data
+    return json_response(courses, response)
 
 # --- Simplified Routes ---
 
 @router.get("/get/CoreDiscipline/{student_id}")
-async def read_core_discipline(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "CD")
+async def read_core_discipline(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "CD", request, response)
 
 @router.get("/get/CoreSpecialization/{student_id}")
-async def read_core_specialization(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "CSp")
+async def read_core_specialization(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "CSp", request, response)
 
 @router.get("/get/UniversityRequirement/{student_id}")
-async def read_university_requirement(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "UR")
+async def read_university_requirement(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "UR", request, response)
 
 @router.get("/get/NationalRequirement/{student_id}")
-async def read_national_requirement(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "NR")
+async def read_national_requirement(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "NR", request, response)
 
 @router.get("/get/CommonCourse/{student_id}")
-async def read_common_courses(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "CC")
+async def read_common_courses(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "CC", request, response)
 
 @router.get("/get/ElectiveMinor/{student_id}")
-async def read_elective_minor(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "EM")
+async def read_elective_minor(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "EM", request, response)
 
 @router.get("/get/CourseIntern/{student_id}")
-async def read_course_intern(student_id: UUID):
-    return await get_courses_by_student_context(student_id, "CI")
+async def read_course_intern(student_id: UUID, request: Request, response: Response):
+    return await get_courses_by_student_context(student_id, "CI", request, response)
 
 
 
 #get specific course information
 @router.get("/get/{course_code}", response_model=list[CourseRead]) #@router is a sub mdodule of FastAPI to handle routes
 async def get_specific_course(course_code:str):
-    response = SUPABASE.table("COURSE").select("*").eq("course_code",course_code).execute()
-    if not response.data:
+    course = await CATALOG.get(course_code)
+    if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return response.data
+    return [course]
 
 async def get_available_courses_by_type(student_id: UUID, course_type: str):
     # 1. Fetch Student's Department using the correct column name
-    student_info = SUPABASE.table("STUDENT") \
-        .select("student_department") \
-        .eq("student_id", student_id) \
-        .maybe_single() \
-        .execute()
+    student_info = await run_query(SUPABASE.table("STUDENT")
+        .select("student_department")
+        .eq("student_id", student_id)
+        .maybe_single())
     
     if not student_info.data or not student_info.data.get("student_department"):
         raise HTTPException(status_code=404, detail="Student department not found. Please update profile.")
@@ -140,10 +130,9 @@ async def get_available_courses_by_type(student_id: UUID, course_type: str):
     dept_name = student_info.data["student_department"]
 
     # 2. Fetch Student History (To check prerequisites and duplicates)
-    history_res = SUPABASE.table("STUDENT_COURSE") \
-        .select("course_code, status") \
-        .eq("student_id", student_id) \
-        .execute()
+    history_res = await run_query(SUPABASE.table("STUDENT_COURSE")
+        .select("course_code, status")
+        .eq("student_id", student_id))
     
     planning_eligibility = {
         record["course_code"] for record in history_res.data 
@@ -155,28 +144,20 @@ async def get_available_courses_by_type(student_id: UUID, course_type: str):
         if record["status"] in ["Current", "Completed", "Planned"]
     }
 
-    # 3. Fetch Department-Specific Courses by Type using JSONB filter
-    json_dept_query = json.dumps([dept_name])
+    # 3. Department-Specific Courses by Type from the cached catalog
+    all_courses = await CATALOG.by_department(dept_name, course_type)
     
-    all_courses_res = SUPABASE.table("COURSE") \
-        .select("*") \
-        .eq("course_type", course_type) \
-        .contains("course_department", json_dept_query) \
-        .execute()
-    
-    if not all_courses_res.data:
+    if not all_courses:
         return []
 
     processed_courses = []
-    for course in all_courses_res.data:
+    for course in all_courses:
         code = course["course_code"]
         if code in taken_or_planned:
             continue
             
-        # 4. Prerequisite and Status Logic
-        pre_reqs = course.get("pre_requisite")
-        cleaned_pre_reqs = [pre_reqs] if isinstance(pre_reqs, str) else (pre_reqs or [])
-        course["pre_requisite"] = cleaned_pre_reqs
+        # 4. Prerequisite and Status Logic (pre_requisite is normalized by the catalog)
+        cleaned_pre_reqs = course["pre_requisite"]
 
         # Eligibility Check (is_unlocked)
         course["is_unlocked"] = not cleaned_pre_reqs or all(pre in planning_eligibility for pre in cleaned_pre_reqs)
@@ -186,48 +167,101 @@ async def get_available_courses_by_type(student_id: UUID, course_type: str):
     
 @router.get("/get/CourseAvailable/CoreDiscipline/{student_id}", response_model=list[CourseRead])
 async def read_available_cd(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "CD")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "CD"))
 
 @router.get("/get/CourseAvailable/CoreSpecialization/{student_id}", response_model=list[CourseRead])
 async def read_available_csp(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "CSp")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "CSp"))
 
 @router.get("/get/CourseAvailable/NationalRequirement/{student_id}", response_model=list[CourseRead])
 async def read_available_nr(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "NR")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "NR"))
 
 @router.get("/get/CourseAvailable/UniversityRequirement/{student_id}", response_model=list[CourseRead])
 async def read_available_ur(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "UR")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "UR"))
 
 @router.get("/get/CourseAvailable/CommonCourse/{student_id}", response_model=list[CourseRead])
 async def read_available_cc(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "CC")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "CC"))
 
 @router.get("/get/CourseAvailable/ElectiveMinor/{student_id}", response_model=list[CourseRead])
 async def read_available_em(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "EM")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "EM"))
 
 @router.get("/get/CourseAvailable/CourseIntern/{student_id}", response_model=list[CourseRead])
 async def read_available_ci(student_id: UUID):
-    return await get_available_courses_by_type(student_id, "CI")
+    return model_list_response(CourseRead, await get_available_courses_by_type(student_id, "CI"))
 
 
 #get all courses by department
 @router.get("/get/all/CourseDepartment/{course_department}")
-async def read_all_course_by_department(course_department:str):
-    json_course_department = json.dumps([course_department.strip()])
+async def read_all_course_by_department(course_department:str, request: Request, response: Response):
+    not_modified = await catalog_not_modified(request, response, course_department.strip())
+    if not_modified:
+        return not_modified
 
-    response = SUPABASE.table("COURSE").select("*").contains("course_department", json_course_department).execute()
+    courses = await CATALOG.by_department(course_department.strip())
 
-    if not response.data:
+    if not courses:
         raise HTTPException(status_code=404, detail=f"No courses found for department: {course_department}")
     
-    for course in response.data:
-        pre_req = course.get("pre_requisite")
-        course["pre_requisite"] = [pre_req] if isinstance(pre_req, str) else (pre_req or [])
-    
-    return response.data
+    return json_response(courses, response)
+
+#prerequisite graph queries, answered from the compiled graph without touching the database
+@router.get("/graph/unlocks/{course_code}")
+async def read_course_unlocks(course_code: str):
+    """Every course that directly or eventually requires course_code."""
+    graph = await get_prereq_graph()
+    if course_code not in graph:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    return {
+        "course_code": course_code,
+        "direct_unlocks": sorted(graph.dependents[course_code]),
+        "unlocks": list(graph.unlocks(course_code)),
+    }
+
+@router.get("/graph/critical-path/{course_code}")
+async def read_course_critical_path(course_code: str):
+    """The longest prerequisite chain ending at course_code, i.e. the minimum number of semesters to reach it."""
+    graph = await get_prereq_graph()
+    if course_code not in graph:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    path = graph.critical_path(course_code)
+    return {
+        "course_code": course_code,
+        "critical_path": path,
+        "min_semesters": len(path),
+        "total_credit_hour": sum(graph.credits[code] for code in path),
+        "all_prerequisites": list(graph.requires(course_code)),
+    }
+
+@router.get("/graph/summary")
+async def read_prereq_graph_summary():
+    """Catalog-wide checks: prerequisite cycles, unknown prerequisite codes, longest chain."""
+    graph = await get_prereq_graph()
+    deepest = max(graph.chain_length, key=graph.chain_length.get, default=None)
+
+    return {
+        "course_count": len(graph.prereqs),
+        "is_acyclic": graph.is_acyclic,
+        "cycles": graph.cycles,
+        "unknown_prerequisites": graph.external,
+        "longest_chain": graph.critical_path(deepest) if deepest else [],
+    }
+
+@router.get("/cache/stats")
+async def read_catalog_cache_stats():
+    """Hit/miss counters for the in-memory COURSE catalog."""
+    return CATALOG.stats()
+
+@router.post("/cache/invalidate")
+async def invalidate_catalog_cache(username: str = Depends(authenticate_admin)):
+    """Lets seed.py (a separate process, maybe on another host) tell the workers on this host to reload the catalog."""
+    await CATALOG.invalidate()
+    return {"message": "Course catalog cache invalidated.", "version": CATALOG.version}
 
 @router.post("/upsert")
 async def upsert_course_to_department(course: CourseCreate, department: str, username: str = Depends(authenticate_admin)):
@@ -236,11 +270,10 @@ async def upsert_course_to_department(course: CourseCreate, department: str, use
     without overwriting existing departments.
     """
     # 1. Check if the course already exists globally
-    existing = SUPABASE.table("COURSE") \
-        .select("course_department") \
-        .eq("course_code", course.course_code) \
-        .maybe_single() \
-        .execute()
+    existing = await run_query(SUPABASE.table("COURSE")
+        .select("course_department")
+        .eq("course_code", course.course_code)
+        .maybe_single())
     
     if existing and existing.data:
         # COURSE EXISTS: Prepare the merged department list
@@ -262,10 +295,10 @@ async def upsert_course_to_department(course: CourseCreate, department: str, use
         update_data["course_department"] = current_depts
 
         # 3. Execute the update
-        update_res = SUPABASE.table("COURSE") \
-            .update(update_data) \
-            .eq("course_code", course.course_code) \
-            .execute()
+        update_res = await run_query(SUPABASE.table("COURSE")
+            .update(update_data)
+            .eq("course_code", course.course_code))
+        await CATALOG.invalidate()
         
         return {
             "message": f"Course details updated and linked to {department}.", 
@@ -277,7 +310,8 @@ async def upsert_course_to_department(course: CourseCreate, department: str, use
         new_course_data = course.model_dump()
         new_course_data["course_department"] = [department]
         
-        insert_res = SUPABASE.table("COURSE").insert(new_course_data).execute()
+        insert_res = await run_query(SUPABASE.table("COURSE").insert(new_course_data))
+        await CATALOG.invalidate()
         
         if not insert_res.data:
             raise HTTPException(status_code=400, detail="Failed to create new course.")
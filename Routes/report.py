@@ -1,35 +1,48 @@
-from fastapi import FastAPI,APIRouter, HTTPException
-from Database.database import SUPABASE
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from Database.database import SUPABASE, run_query
 from uuid import UUID
-from Services.utils import Calc_Cgpa, Calc_Gpa
+from datetime import date
+from typing import Optional
+from Services.utils import Calc_Cgpa, Calc_Gpa, authenticate_admin
+from Services.catalog import CATALOG
+from Services.metrics_cache import METRICS_CACHE
+from Services.responses import json_response
+import orjson
 
 router = APIRouter()
 
+REPORT_COURSE_COLUMNS = "*, COURSE(course_name, course_code, credit_hour)"
+COHORT_STUDENT_PAGE = 200 #student ids per STUDENT_COURSE .in_() filter, keeps the request URL short
+COHORT_ROW_PAGE = 1000 #PostgREST's default max-rows
 
-@router.get("/report-data/{student_id}")
-async def get_report_data(student_id: UUID):
-    student = SUPABASE.table("STUDENT").select("student_email, student_name, intake_session").eq("student_id", student_id).single().execute()
-    
-    courses_res = SUPABASE.table("STUDENT_COURSE")\
-        .select("*, COURSE(course_name, course_code, credit_hour)")\
-        .eq("student_id", student_id).execute()
-    
-    data = courses_res.data
-    
+def build_report_structure(records: list):
+    """Groups a student's records by semester; GPAs are filled in by the caller."""
     report_structure = {}
     all_completed = []
-    
-    for record in data:
+
+    for record in records:
         sem = record["semester"]
         if sem not in report_structure:
             report_structure[sem] = {"courses": [], "total_credits": 0, "gpa": 0.0}
-        
+
         report_structure[sem]["courses"].append(record)
         report_structure[sem]["total_credits"] += record["COURSE"]["credit_hour"]
-        
+
         if record["status"] == "Completed":
             all_completed.append(record)
 
+    return report_structure, all_completed
+
+async def compute_report_data(student_id: UUID):
+    student = await run_query(SUPABASE.table("STUDENT").select("student_email, student_name, intake_session").eq("student_id", student_id).single())
+
+    courses_res = await run_query(SUPABASE.table("STUDENT_COURSE")
+        .select(REPORT_COURSE_COLUMNS)
+        .eq("student_id", student_id))
+
+    report_structure, all_completed = build_report_structure(courses_res.data)
+
     for sem, details in report_structure.items():
         sem_completed = [c for c in details["courses"] if c["status"] == "Completed"]
         details["gpa"] = Calc_Gpa(sem_completed)
@@ -39,4 +52,89 @@ async def get_report_data(student_id: UUID):
         "academic_record": report_structure,
         "final_cgpa": Calc_Cgpa(all_completed),
         "total_credits_accumulated": sum(d["total_credits"] for d in report_structure.values())
-    }
\ No newline at end of file
+    }
+
+@router.get("/report-data/{student_id}")
+async def get_report_data(student_id: UUID):
+    report = await METRICS_CACHE.get_or_compute(
+        student_id, ("report", CATALOG.version),
+        lambda: compute_report_data(student_id)
+    )
+    return json_response(report)
+
+async def fetch_cohort_records(student_ids: list):
+    """All STUDENT_COURSE rows for one page of students, read in PostgREST-sized pages."""
+    records, offset = [], 0
+    while True:
+        page = await run_query(SUPABASE.table("STUDENT_COURSE")
+            .select(REPORT_COURSE_COLUMNS)
+            .in_("student_id", student_ids)
+            .order("student_id")
+            .order("semester")
+            .order("course_code") #(student_id, semester, course_code) names one attempt, so pages never overlap or skip rows
+            .range(offset, offset + COHORT_ROW_PAGE - 1))
+        records.extend(page.data or [])
+        if len(page.data or []) < COHORT_ROW_PAGE:
+            return records
+        offset += COHORT_ROW_PAGE
+
+async def stream_cohort_reports(department: Optional[str], intake_session: Optional[date]):
+    """
+    Yields one NDJSON line per student. Only one page of students and their records is held
+    at a time, so memory stays flat however large the cohort is.
+    """
+    offset = 0
+    while True:
+        query = SUPABASE.table("STUDENT").select("student_id, student_email, student_name, intake_session, student_department")
+        if department:
+            query = query.eq("student_department", department)
+        if intake_session:
+            query = query.eq("intake_session", intake_session.isoformat())
+
+        students = (await run_query(query.order("student_id").range(offset, offset + COHORT_STUDENT_PAGE - 1))).data or []
+        if not students:
+            return
+
+        records_by_student = {s["student_id"]: [] for s in students}
+        for record in await fetch_cohort_records(list(records_by_student)):
+            records_by_student[record["student_id"]].append(record)
+
+        # GPAs for the whole page in one vectorized pass (same results as Calc_Gpa / Calc_Cgpa)
+        from Services.gpa_engine import GradeBook #numpy loads with the first cohort export, not at startup
+        completed = {sid: [r for r in rows if r["status"] == "Completed"] for sid, rows in records_by_student.items()}
+        book = GradeBook(completed)
+        cgpa, semester_gpa = book.cgpa(), book.semester_gpa()
+
+        for student in students:
+            sid = student["student_id"]
+            report_structure, _ = build_report_structure(records_by_student[sid])
+            for sem, details in report_structure.items():
+                details["gpa"] = semester_gpa[sid].get(int(sem), 0.0)
+
+            yield orjson.dumps({
+                "student_id": sid,
+                "student_info": student,
+                "academic_record": report_structure,
+                "final_cgpa": cgpa[sid],
+                "total_credits_accumulated": sum(d["total_credits"] for d in report_structure.values())
+            }, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE, default=str)
+
+        if len(students) < COHORT_STUDENT_PAGE:
+            return
+        offset += COHORT_STUDENT_PAGE
+
+@router.get("/cohort")
+async def get_cohort_reports(department: Optional[str] = None, intake_session: Optional[date] = None,
+                             username: str = Depends(authenticate_admin)):
+    """
+    Transcript reports for a whole department and/or intake, streamed as newline-delimited JSON
+    (one get_report_data-shaped object per line, plus student_id). Admin only: it exposes every
+    student's contact details and grades.
+    """
+    if not department and not intake_session:
+        raise HTTPException(status_code=400, detail="Provide a department and/or intake_session filter.")
+
+    return StreamingResponse(
+        stream_cohort_reports(department, intake_session),
+        media_type="application/x-ndjson"
+    )
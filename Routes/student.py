@@ -1,11 +1,19 @@
-from fastapi import FastAPI,APIRouter, HTTPException, UploadFile, File
-from Database.database import SUPABASE
-from Model.models import StudentCreate, StudentRead,StudentLogin, StudentUpdate, StudentCalcGOT
+from fastapi import FastAPI,APIRouter, HTTPException, Request
+from Database.database import SUPABASE, run_query, run_sync
+from Model.models import StudentCreate, StudentRead,StudentLogin, StudentUpdate, StudentCalcGOT, GotSimulationRequest
 from uuid import UUID
 from fastapi.encoders import jsonable_encoder
 from datetime import date, datetime
 from dotenv import load_dotenv
 from Services.utils import calculate_got_details, Calc_Cgpa, Calc_Gpa
+from Services.metrics_cache import METRICS_CACHE
+from Services.catalog import CATALOG
+from Services.snapshot import AcademicSnapshot
+from Services.simulation import run_scenario, simulate_scenarios, simulate_monte_carlo, historical_pass_rates, pending_courses
+from Services.images import read_image_upload, make_thumbnails, thumbnail_paths, AVATAR_SIZE, THUMBNAIL_CONTENT_TYPE
+from Services.image_store import IMAGE_STORE
+from Services.workers import run_in_process
+import asyncio
 import os
 
 load_dotenv()
@@ -17,7 +25,7 @@ router = APIRouter() #defining a router for student-related routes
 #route to fetch student based on student id sent by react
 @router.get("/{student_id}", response_model=StudentRead) #@router is a sub mdodule of FastAPI to handle routes
 async def read_students(student_id:UUID):
-    response = SUPABASE.table("STUDENT").select("*").eq("student_id",student_id).maybe_single().execute() #query for get all students data
+    response = await run_query(SUPABASE.table("STUDENT").select("*").eq("student_id",student_id).maybe_single()) #query for get all students data
     if not response.data:
         raise HTTPException(status_code=404, detail="Student not found")
         
@@ -26,7 +34,7 @@ async def read_students(student_id:UUID):
 @router.post("/register")
 async def register_student(student: StudentCreate):
     try:
-        auth_response = SUPABASE.auth.sign_up({
+        auth_response = await run_sync(SUPABASE.auth.sign_up, {
             "email": student.student_email,
             "password": student.student_password,
             
@@ -44,7 +52,7 @@ async def register_student(student: StudentCreate):
             "student_email": student.student_email,
         }
         
-        profile_response = SUPABASE.table("STUDENT").insert(new_profile).execute()
+        profile_response = await run_query(SUPABASE.table("STUDENT").insert(new_profile))
         
         if not profile_response.data:
              raise HTTPException(status_code=500, detail="User created but profile sync failed.")
@@ -59,55 +67,71 @@ async def register_student(student: StudentCreate):
         raise HTTPException(status_code=400, detail=error_msg)
 
 #update image to student table
-@router.put("/upload-profile-image/{student_id}")
-async def upload_student_image(student_id: UUID, file: UploadFile = File(...)):
+#the body is read by read_image_upload rather than UploadFile, so the form is described for the docs here
+PROFILE_IMAGE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"]
+        }}}
+    }
+}
+
+@router.put("/upload-profile-image/{student_id}", openapi_extra=PROFILE_IMAGE_BODY)
+async def upload_student_image(student_id: UUID, request: Request):
+    # 1. Read the image off the request stream; anything over MAX_PROFILE_IMAGE_BYTES stops with 413
+    file_content = await read_image_upload(request)
+
+    # 2. Decode and resize in the process pool; only the compact WebP versions are kept
     try:
-        # 1. Read the image file content
-        file_content = await file.read()
-        
-        # 2. Extract extension and create a standardized path
-        # Using student_id as the filename ensures each user has only one file
-        file_extension = file.filename.split(".")[-1]
-        file_path = f"profiles/{student_id}.{file_extension}"
-        
-        # 3. Upload to Supabase Storage with 'upsert=True'
-        # This replaces the existing file if it exists at that path
-        storage_response = SUPABASE.storage.from_(BUCKET).upload(
-            path=file_path,
-            file=file_content,
-            file_options={
-                "content-type": file.content_type,
-                "x-upsert": "true"  # Crucial for updating existing files
-            }
-        )
-
-        # 4. Generate the Public URL
-        # Ensure the bucket is set to 'Public' in Supabase dashboard
-        image_url = SUPABASE.storage.from_(BUCKET).get_public_url(file_path)
-
-        # 5. Update only the student_image column in the STUDENT table
-        db_response = SUPABASE.table("STUDENT")\
-            .update({"student_image": image_url})\
-            .eq("student_id", student_id)\
-            .execute()
+        thumbnails = await run_in_process(make_thumbnails, file_content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        # 3. Upload every size under a content-hashed path, so each URL can be cached for a year
+        paths = thumbnail_paths(student_id, file_content)
+        uploaded = await asyncio.gather(*(
+            run_sync(IMAGE_STORE.put, paths[name], thumbnails[name], THUMBNAIL_CONTENT_TYPE) for name in paths
+        ))
+        image_urls = dict(zip(paths, uploaded))
+        image_url = image_urls[AVATAR_SIZE]
+
+        # 4. Update only the student_image column in the STUDENT table
+        db_response = await run_query(SUPABASE.table("STUDENT")
+            .update({"student_image": image_url})
+            .eq("student_id", student_id))
 
         if not db_response.data:
             raise HTTPException(status_code=404, detail="Student record not found")
 
-        return {
-            "status": "success",
-            "message": "Profile image updated",
-            "student_image_url": image_url
-        }
-
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
 
+    await METRICS_CACHE.invalidate(student_id) #report-data embeds the profile
+
+    # 5. Earlier pictures are no longer referenced; failing to delete them only wastes space
+    try:
+        await run_sync(IMAGE_STORE.prune, f"profiles/{student_id}", set(paths.values()))
+    except Exception as e:
+        print(f"PROFILE IMAGE PRUNE FAILED for {student_id}: {e}")
+
+    return {
+        "status": "success",
+        "message": "Profile image updated",
+        "student_image_url": image_url,
+        "thumbnails": image_urls
+    }
+
 # Route for student login
 @router.post("/login")
 async def login_student(student: StudentLogin):
     try:
-        auth_response = SUPABASE.auth.sign_in_with_password({
+        auth_response = await run_sync(SUPABASE.auth.sign_in_with_password, {
             "email": student.student_email,
             "password": student.student_password,
         })
@@ -115,11 +139,10 @@ async def login_student(student: StudentLogin):
         if not auth_response.user:
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
-        profile_query = SUPABASE.table("STUDENT")\
-            .select("student_id, student_name")\
-            .eq("student_id", auth_response.user.id)\
-            .single()\
-            .execute()
+        profile_query = await run_query(SUPABASE.table("STUDENT")
+            .select("student_id, student_name")
+            .eq("student_id", auth_response.user.id)
+            .single())
 
         if not profile_query.data:
             raise HTTPException(status_code=404, detail="Student profile not found")
@@ -140,9 +163,10 @@ async def login_student(student: StudentLogin):
 async def update_student(student_id:UUID, student_data:StudentUpdate):
     data = student_data.model_dump(exclude_unset=True)
 
-    response = SUPABASE.table("STUDENT").update(data).eq("student_id",student_id).execute()
+    response = await run_query(SUPABASE.table("STUDENT").update(data).eq("student_id",student_id))
     if not response.data:
         raise HTTPException(status_code=404, detail="Student not found")
+    await METRICS_CACHE.invalidate(student_id) #report-data embeds the profile
     
     return response.data[0]
 
@@ -151,45 +175,109 @@ async def update_student(student_id:UUID, student_data:StudentUpdate):
 async def delete_student(student_id:UUID):
     
 
-    response = SUPABASE.table("STUDENT").delete().eq("student_id",student_id).execute()
+    response = await run_query(SUPABASE.table("STUDENT").delete().eq("student_id",student_id))
     if not response.data:
         raise HTTPException(status_code=404, detail="Student not found")
+    await METRICS_CACHE.invalidate(student_id)
     
     return {"message": f"Student {student_id} successfully deleted"}
 
-@router.get("/graduate-on-time/{student_id}")
-async def get_student_got_status(student_id: UUID):
+async def load_got_context(student_id: UUID):
+    """Everything calculate_got_details needs for one student, as plain (picklable) values."""
     # 1. Fetch Student Data
-    student_res = SUPABASE.table("STUDENT")\
-        .select("intake_session, deferment_normal, deferment_medical")\
-        .eq("student_id", student_id)\
-        .maybe_single().execute()
+    student_res = await run_query(SUPABASE.table("STUDENT")
+        .select("intake_session, deferment_normal, deferment_medical")
+        .eq("student_id", student_id)
+        .maybe_single())
     
     if not student_res.data:
         raise HTTPException(status_code=404, detail="Student not found.")
 
     s_data = student_res.data
-    intake_date = date.fromisoformat(s_data["intake_session"])
-    dn = s_data.get("deferment_normal") or 0
-    dm = s_data.get("deferment_medical") or 0
 
     # 2. Fetch Course History
-    courses_res = SUPABASE.table("STUDENT_COURSE")\
-        .select("course_code, semester, grade, status, COURSE(credit_hour)")\
-        .eq("student_id", student_id).execute()
+    snapshot = await AcademicSnapshot.load(student_id)
     
-    # 3. Calculate Probation
-    # (Assuming you use your dynamic probation logic here)
-    prob_count = 0 # Replace with actual calculation logic
+    # 3. Calculate Probation: one pass over the same rows, semester by semester
+    prob_count = snapshot.probation_count
+
+    return {
+        "intake_date": date.fromisoformat(s_data["intake_session"]),
+        "records": snapshot.records,
+        "probation_count": prob_count,
+        "total_degree_credits": 164, # Default for your department
+        "defer_normal": s_data.get("deferment_normal") or 0,
+        "defer_medical": s_data.get("deferment_medical") or 0,
+        "credits": {},
+    }
+
+@router.get("/graduate-on-time/{student_id}")
+async def get_student_got_status(student_id: UUID):
+    context = await load_got_context(student_id)
 
     # 4. Perform Analysis
     analysis = calculate_got_details(
-        intake_date=intake_date, 
-        all_student_courses=courses_res.data or [],
-        probation_count=prob_count,
-        total_degree_credits=164, # Default for your department
-        defer_normal=dn,
-        defer_medical=dm
+        intake_date=context["intake_date"], 
+        all_student_courses=context["records"],
+        probation_count=context["probation_count"],
+        total_degree_credits=context["total_degree_credits"],
+        defer_normal=context["defer_normal"],
+        defer_medical=context["defer_medical"]
+    )
+
+    return {"success": True, "analysis": analysis}
+
+async def compute_probation_timeline(student_id: UUID):
+    snapshot = await AcademicSnapshot.load(student_id)
+    timeline = snapshot.probation_timeline()
+    return {
+        "student_id": str(student_id),
+        "probation_count": sum(entry["is_probation"] for entry in timeline),
+        "semesters": timeline,
+    }
+
+@router.get("/probation-timeline/{student_id}")
+async def get_probation_timeline(student_id: UUID):
+    """Each semester's GPA, probation flag and credit cap (15, or 11 after a finished semester below 2.00)."""
+    return await METRICS_CACHE.get_or_compute(
+        student_id, ("probation_timeline", CATALOG.version),
+        lambda: compute_probation_timeline(student_id)
     )
 
-    return {"success": True, "analysis": analysis}
\ No newline at end of file
+@router.post("/graduate-on-time/{student_id}/simulate")
+async def simulate_student_got(student_id: UUID, request: GotSimulationRequest):
+    """
+    What-if graduation estimates: each scenario (failed courses, extra probation semesters,
+    extra deferments) is run through calculate_got_details, and monte_carlo_runs draws
+    pass/fail for every Current/Planned course from historical pass rates.
+    """
+    context = await load_got_context(student_id)
+
+    # Courses failed in a scenario but not on record need their credits from the catalog
+    for scenario in request.scenarios:
+        for code in scenario.fail_courses:
+            if code in context["credits"] or any(r.get("course_code") == code for r in context["records"]):
+                continue
+            course = await CATALOG.get(code)
+            if not course:
+                raise HTTPException(status_code=404, detail=f"Course code {code} not found")
+            context["credits"][code] = course.get("credit_hour") or 0
+
+    baseline = run_scenario(context, {})
+    scenarios = [scenario.model_dump() for scenario in request.scenarios]
+    analyses = await simulate_scenarios(context, scenarios)
+
+    monte_carlo = None
+    if request.monte_carlo_runs:
+        pass_rates = await historical_pass_rates(pending_courses(context["records"]))
+        monte_carlo = await simulate_monte_carlo(context, pass_rates, request.monte_carlo_runs, request.seed)
+
+    return {
+        "success": True,
+        "baseline": baseline,
+        "scenarios": [
+            {"name": scenario["name"] or f"Scenario {i + 1}", "scenario": scenario, "analysis": analysis}
+            for i, (scenario, analysis) in enumerate(zip(scenarios, analyses))
+        ],
+        "monte_carlo": monte_carlo,
+    }
@@ -1,19 +1,25 @@
-from fastapi import FastAPI,APIRouter, HTTPException
-from Database.database import SUPABASE
-from Model.models import   Summary, StudentCourseAdd, ReadSemesterCourse, UpdateStudentCourse, SemesterRemove, Gpa
-from Services.utils import Calc_Cgpa, Get_Probation_Status, calculate_points_and_credits, TotalCreditHour
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from Database.database import SUPABASE, run_query
+from Model.models import   Summary, StudentCourseAdd, StudentCourseBulkAdd, ReadSemesterCourse, UpdateStudentCourse, SemesterRemove
+from Services.utils import calculate_points_and_credits, find_missing_prereqs, has_passed, probation_from_records
+from Services.snapshot import AcademicSnapshot
+from Services.aggregates import AcademicAggregates, load_revision
+from Services.catalog import CATALOG
+from Services.metrics_cache import METRICS_CACHE
+from Services.prereq_graph import get_prereq_graph
+from Services.planner import SemesterPlanner
+from Services.etag import make_etag, conditional
+from Services.responses import model_list_response
 from uuid import UUID
-import copy
 
 router = APIRouter()
 #get list of course taken by each semester
 @router.get("/get/SemesterCourse/{student_id}/{semester}", response_model=list[ReadSemesterCourse])
 async def get_semester_course(student_id: UUID, semester: int):
-    response = SUPABASE.table("STUDENT_COURSE") \
-    .select("*, COURSE(course_code ,course_name, credit_hour, course_type, course_semester, course_desc, course_department)")  \
-    .eq("student_id", student_id) \
-    .eq("semester", semester) \
-    .execute()
+    response = await run_query(SUPABASE.table("STUDENT_COURSE")
+    .select("*, COURSE(course_code ,course_name, credit_hour, course_type, course_semester, course_desc, course_department)")
+    .eq("student_id", student_id)
+    .eq("semester", semester))
     if not response.data:
         raise HTTPException(status_code=404, detail="Record not found")
 
@@ -32,22 +38,14 @@ async def get_semester_course(student_id: UUID, semester: int):
 
         final_results.append(record)
 
-    return final_results
+    return model_list_response(ReadSemesterCourse, final_results)
 
-@router.get("/get/Standing/{student_id}/{semester}")
-async def get_academic_standing(student_id: UUID, semester: int):
-    """
-    Checks the previous semester's results to determine the credit limit 
-    for the requested semester.
-    """
-    is_probation, max_limit = Get_Probation_Status(str(student_id), semester)
-    
-    current_sem_res = SUPABASE.table("STUDENT_COURSE") \
-        .select("*, COURSE(credit_hour)") \
-        .eq("student_id", student_id) \
-        .eq("semester", semester).execute()
+async def compute_academic_standing(student_id: UUID, semester: int):
+    # The per-semester aggregates answer both the probation rule and the enrolled credits
+    aggregates = await AcademicAggregates.load(student_id)
+    is_probation, max_limit = aggregates.probation_status(semester)
     
-    enrolled_credits = TotalCreditHour(current_sem_res.data)
+    enrolled_credits = aggregates.enrolled_credits(semester)
 
     return {
         "semester": semester,
@@ -60,14 +58,24 @@ async def get_academic_standing(student_id: UUID, semester: int):
         }
     }
 
+@router.get("/get/Standing/{student_id}/{semester}")
+async def get_academic_standing(student_id: UUID, semester: int):
+    """
+    Checks the previous semester's results to determine the credit limit 
+    for the requested semester.
+    """
+    return await METRICS_CACHE.get_or_compute(
+        student_id, ("standing", semester, CATALOG.version),
+        lambda: compute_academic_standing(student_id, semester)
+    )
+
 @router.get("/get/{student_id}/{course_code}/{semester}", response_model=list[ReadSemesterCourse])
 async def read_student_course_specific(student_id: UUID, course_code: str, semester: int):
-    response = SUPABASE.table("STUDENT_COURSE")\
-        .select("*, COURSE(course_code,course_name, credit_hour, course_type,pre_requisite, course_semester, course_desc, course_department)")\
-        .eq("student_id", student_id)\
-        .eq("course_code", course_code)\
-        .eq("semester", semester)\
-        .execute() 
+    response = await run_query(SUPABASE.table("STUDENT_COURSE")
+        .select("*, COURSE(course_code,course_name, credit_hour, course_type,pre_requisite, course_semester, course_desc, course_department)")
+        .eq("student_id", student_id)
+        .eq("course_code", course_code)
+        .eq("semester", semester))
         
     if not response.data:
         raise HTTPException(status_code=404, detail="Record not found")
@@ -87,16 +95,25 @@ async def read_student_course_specific(student_id: UUID, course_code: str, semes
 
         final_results.append(record)
 
-    return final_results
+    return model_list_response(ReadSemesterCourse, final_results)
 
 
 #route to get all course student_course data
 @router.get("/get/{student_id}", response_model=list[ReadSemesterCourse]) 
-async def read_student_course_all(student_id: UUID):
-    response = SUPABASE.table("STUDENT_COURSE") \
-        .select("*, COURSE(course_code, course_name, credit_hour, course_type, pre_requisite, course_semester, course_desc, course_department)") \
-        .eq("student_id", student_id) \
-        .execute()
+async def read_student_course_all(student_id: UUID, request: Request, http_response: Response):
+    # The transcript changes only with the student's rows or the joined COURSE rows. The triggers bump the
+    # aggregate revision on every write to the rows, whoever makes it, so a 304 costs one primary-key read.
+    # Without an aggregate row nothing vouches for the client's copy, so no ETag is sent
+    revision = await load_revision(student_id)
+    if revision is not None:
+        etag = make_etag("transcript", student_id, revision, await CATALOG.content_hash())
+        not_modified = conditional(request, http_response, etag, cache_control="private, no-cache")
+        if not_modified:
+            return not_modified
+
+    response = await run_query(SUPABASE.table("STUDENT_COURSE")
+        .select("*, COURSE(course_code, course_name, credit_hour, course_type, pre_requisite, course_semester, course_desc, course_department)")
+        .eq("student_id", student_id))
     
     if not response.data:
         raise HTTPException(status_code=404, detail="Record not found")
@@ -116,94 +133,115 @@ async def read_student_course_all(student_id: UUID):
 
         final_results.append(record)
 
-    return final_results
+    return model_list_response(ReadSemesterCourse, final_results, http_response)
 
 #add new student_course based on pre-requisite
-@router.post("/add")
-async def add_student_course(course: StudentCourseAdd):
-    # 1. Fetch Course Info
-    course_query = SUPABASE.table("COURSE").select("*").eq("course_code", course.course_code).maybe_single().execute()
-    if not course_query.data:
-        raise HTTPException(status_code=404, detail="Course code not found")
-    
-    new_course_credits = course_query.data.get("credit_hour", 0)
-    raw_pre_reqs = course_query.data.get("pre_requisite")
-    
-    # 2. Normalize Pre-reqs
-    if isinstance(raw_pre_reqs, str):
-        pre_reqs = [raw_pre_reqs.strip()] if raw_pre_reqs.strip() else []
-    elif isinstance(raw_pre_reqs, list):
-        pre_reqs = [p.strip() for p in raw_pre_reqs if p.strip()]
-    else:
-        pre_reqs = []
-
-    # 3. Check Academic Status & Limits
-    is_probation, max_limit = Get_Probation_Status(str(course.student_id), course.semester)
-    
-    current_sem_res = SUPABASE.table("STUDENT_COURSE") \
-        .select("*, COURSE(credit_hour)") \
-        .eq("student_id", course.student_id) \
-        .eq("semester", course.semester).execute()
-    
-    _, current_credits = calculate_points_and_credits(current_sem_res.data)
-    
-    # 4. Prerequisite Logic
-    has_passed_all_prereqs = True
-    missing_prereqs = []
-
-    if pre_reqs:
-        for pre_code in pre_reqs:
-            # Fetch ALL attempts for this prerequisite
-            history = SUPABASE.table("STUDENT_COURSE").select("grade, status") \
-                .eq("student_id", course.student_id) \
-                .eq("course_code", pre_code).execute()
-            
-            # Check if ANY of the attempts were successful
-            passed = False
-            if history.data:
-                # We loop through all records to see if a pass exists
-                for record in history.data:
-                    if record["status"] == "Completed" and record["grade"] not in ["F", "Fail", None]:
-                        passed = True
-                        break # Found a pass, no need to check other attempts
-            
-            if not passed:
-                has_passed_all_prereqs = False
-                missing_prereqs.append(pre_code)
-
-    # 5. Insert Record
+def enrollment_row(course: StudentCourseAdd):
     if course.grade and course.grade.strip():
         course.status = "Completed"
-    
-    new_enrollment = {
+    return {
         "student_id": str(course.student_id),
         "course_code": course.course_code,
         "semester": course.semester,
         "grade": course.grade,
         "status": course.status
     }
-    
+
+def academic_meta(records: list, semester: int, course_info: dict):
+    """Probation, semester credits and prerequisites for one new course, judged against records."""
+    new_course_credits = course_info.get("credit_hour", 0)
+    is_probation, max_limit = probation_from_records(records, semester)
+    _, current_credits = calculate_points_and_credits([r for r in records if str(r["semester"]) == str(semester)])
+    missing_prereqs = find_missing_prereqs(course_info["pre_requisite"], records)
+    return {
+        "is_probation": is_probation,
+        "max_limit": max_limit,
+        "current_total_credits": current_credits + new_course_credits,
+        "limit_exceeded": (current_credits + new_course_credits) > max_limit,
+        "prereqs_met": not missing_prereqs,
+        "missing_prereqs": missing_prereqs
+    }
+
+@router.post("/add")
+async def add_student_course(course: StudentCourseAdd):
+    # 1. Course Info comes from the in-memory catalog (pre_requisite already normalized)
+    course_info = await CATALOG.get(course.course_code)
+    if not course_info:
+        raise HTTPException(status_code=404, detail="Course code not found")
+
+    # 2. ONE history fetch answers probation status, current semester credits and every
+    # prerequisite, whatever their number; all of it is evaluated in memory
+    snapshot = await AcademicSnapshot.load(course.student_id)
+    meta = academic_meta(snapshot.records, course.semester, course_info)
+
+    # 3. Insert Record
     try:
-        response = SUPABASE.table("STUDENT_COURSE").insert(new_enrollment).execute()
+        response = await run_query(SUPABASE.table("STUDENT_COURSE").insert(enrollment_row(course)))
         result = response.data[0]
+        await METRICS_CACHE.invalidate(course.student_id)
         
         return {
             "success": True,
             "data": result,
-            "academic_meta": {
-                "is_probation": is_probation,
-                "max_limit": max_limit,
-                "current_total_credits": current_credits + new_course_credits,
-                "limit_exceeded": (current_credits + new_course_credits) > max_limit,
-                "prereqs_met": has_passed_all_prereqs,
-                "missing_prereqs": missing_prereqs
-            }
+            "academic_meta": meta
         }
     except Exception:
         raise HTTPException(status_code=400, detail="Course already exists in your records.")
 
+@router.post("/add/bulk")
+async def add_student_course_bulk(payload: StudentCourseBulkAdd):
+    """
+    Adds a whole semester or transcript in one go: one history read, one insert.
+    Each course is judged as if added one by one in semester order, so a course passed in an
+    earlier semester of the same batch counts toward later prerequisites and probation.
+    """
+    courses = payload.courses
+    student_id = courses[0].student_id
+    if any(course.student_id != student_id for course in courses):
+        raise HTTPException(status_code=422, detail="All courses must belong to the same student.")
+
+    catalog = {course.course_code: await CATALOG.get(course.course_code) for course in courses}
+    unknown = sorted(code for code, info in catalog.items() if not info)
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Course code not found: {', '.join(unknown)}")
+
+    snapshot = await AcademicSnapshot.load(student_id)
+    taken = {(r["course_code"], str(r["semester"])) for r in snapshot.records}
+    duplicates = []
+    for course in courses:
+        key = (course.course_code, str(course.semester))
+        if key in taken:
+            duplicates.append(f"{course.course_code} (semester {course.semester})")
+        taken.add(key)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Course already exists in your records: {', '.join(duplicates)}")
+
+    # Same records the single add would see, grown one course at a time
+    records = list(snapshot.records)
+    rows = [enrollment_row(course) for course in courses]
+    metas = [None] * len(courses)
+    for i in sorted(range(len(courses)), key=lambda i: courses[i].semester):
+        course_info = catalog[courses[i].course_code]
+        metas[i] = academic_meta(records, courses[i].semester, course_info)
+        records.append({**rows[i], "COURSE": {"credit_hour": course_info.get("credit_hour", 0)}})
+
+    try:
+        response = await run_query(SUPABASE.table("STUDENT_COURSE").insert(rows))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Course already exists in your records.")
+    await METRICS_CACHE.invalidate(student_id)
+
+    return {
+        "success": True,
+        "count": len(response.data),
+        "results": [
+            {"data": result, "academic_meta": meta}
+            for result, meta in zip(response.data, metas)
+        ]
+    }
+
 async def get_courses(student_id: UUID, status: str):
-    response = SUPABASE.table("STUDENT_COURSE").select("*, COURSE(course_code,course_name, credit_hour, course_type, pre_requisite, course_department)").eq("student_id",student_id).eq("status",status).execute()
+    response = await run_query(SUPABASE.table("STUDENT_COURSE").select("*, COURSE(course_code,course_name, credit_hour, course_type, pre_requisite, course_department)").eq("student_id",student_id).eq("status",status))
 
     if not response.data:
         return []
@@ -212,28 +250,23 @@ async def get_courses(student_id: UUID, status: str):
 #route to get completed course
 @router.get("/CompletedCourse/{student_id}", response_model=list[ReadSemesterCourse]) #use list because it returns multiple items of student course
 async def list_completed_course(student_id:UUID):
-    return await get_courses(student_id, "Completed")
+    return model_list_response(ReadSemesterCourse, await get_courses(student_id, "Completed"))
 
 #route to get in progress course
 @router.get("/CurrentCourse/{student_id}", response_model=list[ReadSemesterCourse])
 async def list_current_course(student_id:UUID):
-    return await get_courses(student_id, "Current")
+    return model_list_response(ReadSemesterCourse, await get_courses(student_id, "Current"))
 
 @router.get("/PlannedCourse/{student_id}", response_model=list[ReadSemesterCourse])
 async def list_planned_course(student_id:UUID):
-    return await get_courses(student_id, "Planned")
+    return model_list_response(ReadSemesterCourse, await get_courses(student_id, "Planned"))
 
 #calculation
-@router.get("/Summary/{student_id}", response_model=Summary)
-async def get_student_summary(student_id: UUID):
-    # Fetch records including the semester column
-    response = SUPABASE.table("STUDENT_COURSE")\
-        .select("course_code,semester, grade, status, COURSE(credit_hour)")\
-        .eq("student_id", student_id)\
-        .execute()
-
-    all_data = response.data
-    if not all_data:
+async def compute_student_summary(student_id: UUID):
+    # Every figure below comes from the trigger-maintained aggregates (one small read)
+    aggregates = await AcademicAggregates.load(student_id)
+
+    if not aggregates.has_records:
         return {
             "count_completed_course": 0, 
             "count_current_course": 0, 
@@ -249,42 +282,16 @@ async def get_student_summary(student_id: UUID):
             }
         }
 
-    # 1. Standard Status Filtering
-    completed_list = [c for c in all_data if c["status"] == "Completed" and c["grade"] != "Exemption"]
-    current_list = [c for c in all_data if c["status"] == "Current"]
-    planned_list = [c for c in all_data if c["status"] == "Planned"]
-    
-    # 2. Semester Credit Hour Calculation
-    sem_credits = {}
-    for record in all_data:
-        sem = str(record.get("semester")) 
-        course_info = record.get("COURSE") or {}
-        grade = record.get("grade")
-
-        # 2. If grade is F, we modify the dictionary directly inside the record
-        
-        credits = course_info.get("credit_hour", 0)
-        sem_credits[sem] = sem_credits.get(sem, 0) + credits
-
-    # 3. CGPA Calculation
-    cgpa = Calc_Cgpa(completed_list)
-    total_earned = TotalCreditHour(completed_list)
-
-    try:
-        # Convert keys to int to find max, then back to string
-        latest_sem = str(max([int(s) for s in sem_credits.keys() if s.isdigit()] or [1]))
-    except ValueError:
-        latest_sem = "1"
-
-    is_probation, max_limit = Get_Probation_Status(str(student_id), latest_sem)
+    latest_sem = aggregates.latest_semester
+    is_probation, max_limit = aggregates.probation_status(latest_sem)
     
     return {
-        "count_completed_course": len(completed_list),
-        "count_current_course": len(current_list),
-        "count_planned_course": len(planned_list),
-        "student_cgpa": cgpa,
-        "total_credit_hour": total_earned,
-        "semester_credits": sem_credits,
+        "count_completed_course": aggregates.count_completed,
+        "count_current_course": aggregates.count_current,
+        "count_planned_course": aggregates.count_planned,
+        "student_cgpa": aggregates.cgpa,
+        "total_credit_hour": aggregates.earned_credits,
+        "semester_credits": aggregates.semester_credits,
         "academic_meta": {
             "is_probation": is_probation,
             "max_limit": max_limit,
@@ -293,43 +300,108 @@ async def get_student_summary(student_id: UUID):
         }
     }
 
-@router.get("/GPA/{student_id}/{semester_id}")
-async def get_semester_gpa(student_id: UUID, semester_id: int):
-    response = SUPABASE.table("STUDENT_COURSE")\
-        .select("course_code, grade, status, semester, COURSE(credit_hour)")\
-        .eq("student_id", student_id)\
-        .eq("semester", semester_id)\
-        .eq("status", "Completed")\
-        .execute()
+@router.get("/Summary/{student_id}", response_model=Summary)
+async def get_student_summary(student_id: UUID):
+    return await METRICS_CACHE.get_or_compute(
+        student_id, ("summary", CATALOG.version),
+        lambda: compute_student_summary(student_id)
+    )
 
-    if not response.data:
+async def compute_semester_gpa(student_id: UUID, semester_id: int):
+    aggregates = await AcademicAggregates.load(student_id)
+    sem = aggregates.semester(semester_id)
+
+    if not sem or not sem["status_completed"]:
         return {
             "semester": semester_id,
             "student_gpa": 0.0,
             "message": "No completed courses found for this semester"
         }
 
-    # --- THE FIX: Filter out Exemptions ---
-    # We create a new list that only includes courses where grade is NOT 'Exemption'
-    gpa_eligible_courses = [
-        course for course in response.data 
-        if course.get("grade") != "Exemption"
-    ]
-
-    # If all courses in the semester were exemptions, the list will be empty
-    if not gpa_eligible_courses:
+    # Exemptions are kept out of completed_count / completed_points by the aggregate triggers,
+    # so a semester of only Exemptions has Completed rows but nothing GPA-eligible
+    if not sem["completed_count"]:
         return {
             "semester": semester_id,
             "student_gpa": 0.0,
             "message": "All courses in this semester are Exemptions (no GPA impact)"
         }
 
-    # Pass the filtered list to your utility function
-    gpa = Calc_Cgpa(gpa_eligible_courses) 
-    
     return {
         "semester": semester_id,
-        "student_gpa": gpa
+        "student_gpa": aggregates.completed_gpa(semester_id)
+    }
+
+@router.get("/GPA/{student_id}/{semester_id}")
+async def get_semester_gpa(student_id: UUID, semester_id: int):
+    return await METRICS_CACHE.get_or_compute(
+        student_id, ("gpa", semester_id, CATALOG.version),
+        lambda: compute_semester_gpa(student_id, semester_id)
+    )
+
+@router.get("/plan/{student_id}")
+async def plan_remaining_semesters(student_id: UUID, include: list[str] = Query([]), all_courses: bool = False):
+    """
+    Lays out every remaining course semester by semester, from the semester after the student's
+    latest Completed/Current one. By default the plan covers the department courses that have a
+    recommended course_semester plus the student's Planned courses; add electives with ?include=CODE
+    or plan the whole department with all_courses=true. Missing prerequisites are pulled in automatically.
+    """
+    student_query = await run_query(SUPABASE.table("STUDENT")
+        .select("student_department")
+        .eq("student_id", student_id)
+        .maybe_single())
+
+    if not student_query.data or not student_query.data.get("student_department"):
+        raise HTTPException(status_code=404, detail="Student department not found. Please set your department in your profile.")
+
+    dept_name = student_query.data["student_department"]
+    snapshot = await AcademicSnapshot.load(student_id)
+    graph = await get_prereq_graph()
+
+    # 1. What is already done: passed courses, and Current ones (assumed to be passed this semester)
+    satisfied = {r["course_code"] for r in snapshot.records if has_passed(r) or r["status"] == "Current"}
+    taken_sems = [int(r["semester"]) for r in snapshot.records if r["status"] in ("Completed", "Current")]
+    start_semester = max(taken_sems, default=0) + 1
+
+    # 2. What to plan
+    courses = {}
+    for course in await CATALOG.by_department(dept_name):
+        if all_courses or course.get("course_semester") is not None:
+            courses[course["course_code"]] = course
+
+    # A code no longer in the catalog (a retired Planned course, a typo in include) is left out and reported
+    unknown_courses = []
+    for code in include + [r["course_code"] for r in snapshot.planned_list]:
+        course = await CATALOG.get(code)
+        if not course:
+            if code not in unknown_courses:
+                unknown_courses.append(code)
+            continue
+        courses[code] = course
+
+    for code in list(courses):
+        for pre in graph.requires(code):
+            if pre not in satisfied and pre not in courses and pre not in graph.external:
+                courses[pre] = await CATALOG.get(pre)
+
+    courses = {code: course for code, course in courses.items() if code not in satisfied}
+
+    # Prerequisites outside the catalog (e.g. internship codes) cannot be planned here, so they are assumed met
+    assumed_external = sorted({p for code in courses for p in graph.requires(code) if p in graph.external and p not in satisfied})
+
+    # 3. The first planned semester is capped by the results of the one before it, like /add
+    is_probation, first_limit = probation_from_records(snapshot.records + [{"semester": start_semester}], start_semester)
+
+    planner = SemesterPlanner(courses, graph.prereqs, satisfied | set(assumed_external))
+    plan = planner.plan(start_semester, first_limit=first_limit)
+
+    return {
+        "student_id": str(student_id),
+        "is_probation": is_probation,
+        **plan,
+        "assumed_external": assumed_external,
+        "unknown_courses": unknown_courses,
     }
 
 @router.put("/update/StudentCourse/{student_id}/{course_code}/{semester}", response_model=list[UpdateStudentCourse])
@@ -337,15 +409,15 @@ async def edit_student_course(student_id: UUID, course_code: str, semester: int,
     data = studentcourse_data.model_dump(exclude_unset=True)
 
     # Added .eq("semester", semester) to target the specific record
-    response = SUPABASE.table("STUDENT_COURSE")\
-        .update(data)\
-        .eq("student_id", student_id)\
-        .eq("course_code", course_code)\
-        .eq("semester", semester)\
-        .execute()
+    response = await run_query(SUPABASE.table("STUDENT_COURSE")
+        .update(data)
+        .eq("student_id", student_id)
+        .eq("course_code", course_code)
+        .eq("semester", semester))
         
     if not response.data:
         raise HTTPException(status_code=404, detail="Specific student course record not found")
+    await METRICS_CACHE.invalidate(student_id)
     
     return response.data
 #delete entire semester
@@ -353,9 +425,10 @@ async def edit_student_course(student_id: UUID, course_code: str, semester: int,
 async def delete_semester(student_id:UUID, semester: int):
     
 
-    response = SUPABASE.table("STUDENT_COURSE").delete().eq("student_id",student_id).eq("semester", semester).execute()
+    response = await run_query(SUPABASE.table("STUDENT_COURSE").delete().eq("student_id",student_id).eq("semester", semester))
     if not response.data:
         raise HTTPException(status_code=404, detail="Student not found")
+    await METRICS_CACHE.invalidate(student_id)
     
     return {"message": f"Semester {semester} successfully deleted"}
 
@@ -365,14 +438,19 @@ async def delete_semester(student_id:UUID, semester: int):
 async def delete_student_coursecode(student_id: UUID, course_code: str, semester: int):
     
     # Added .eq("semester", semester)
-    response = SUPABASE.table("STUDENT_COURSE")\
-        .delete()\
-        .eq("student_id", student_id)\
-        .eq("course_code", course_code)\
-        .eq("semester", semester)\
-        .execute()
+    response = await run_query(SUPABASE.table("STUDENT_COURSE")
+        .delete()
+        .eq("student_id", student_id)
+        .eq("course_code", course_code)
+        .eq("semester", semester))
         
     if not response.data:
         raise HTTPException(status_code=404, detail="Record not found")
+    await METRICS_CACHE.invalidate(student_id)
     
     return {"message": f"Course {course_code} in Semester {semester} successfully deleted"}
+
+@router.get("/cache/stats")
+async def read_metrics_cache_stats():
+    """Hit/miss counters for the per-student academic metrics cache."""
+    return METRICS_CACHE.stats()
@@ -0,0 +1,110 @@
+#advisor_cache.py remembers AI advisor analyses by the exact input that produced them
+#the key hashes the normalized transcript together with the prompt and model parameters,
+#so a changed grade, prompt or model simply misses instead of needing an invalidation call
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+ADVISOR_CACHE_MAX_ENTRIES = int(os.getenv("ADVISOR_CACHE_MAX_ENTRIES", "1024"))
+ADVISOR_CACHE_TTL_SECONDS = float(os.getenv("ADVISOR_CACHE_TTL_SECONDS", "86400"))
+
+def advisor_cache_key(transcript: str, system_instruction: str, model: str, **params):
+    """sha256 over everything sent to the model; params are e.g. max_tokens and temperature."""
+    payload = json.dumps(
+        {"transcript": transcript, "system": system_instruction, "model": model, "params": params},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AdvisorCache:
+    """
+    LRU + TTL cache of analyses. Concurrent misses for the same key share one LLM call
+    instead of each spending a request against the router.
+    """
+
+    def __init__(self, max_entries: int = ADVISOR_CACHE_MAX_ENTRIES, ttl_seconds: float = ADVISOR_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() #key -> (stored_at, analysis)
+        self._in_flight = {} #key -> asyncio.Future of the analysis being generated
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, analysis = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return analysis
+
+    def lookup(self, key: str):
+        """get() that counts the hit or miss, for callers that generate the analysis themselves."""
+        analysis = self.get(key)
+        if analysis is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return analysis
+
+    def put(self, key: str, analysis: str):
+        self._entries[key] = (time.monotonic(), analysis)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_generate(self, key: str, generate):
+        """Returns (analysis, cached). generate() is awaited only on a miss; failures are never cached."""
+        analysis = self.get(key)
+        if analysis is not None:
+            self.hits += 1
+            return analysis, True
+
+        if key in self._in_flight:
+            self.hits += 1
+            return await asyncio.shield(self._in_flight[key]), True
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            analysis = await generate()
+            self.put(key, analysis)
+            future.set_result(analysis)
+            return analysis, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() #waiters get the error; don't warn when there were none
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+ADVISOR_CACHE = AdvisorCache()
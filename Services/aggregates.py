@@ -0,0 +1,178 @@
+#aggregates.py reads the running totals kept by Database/migrations/001_academic_aggregates.sql
+#summary, semester GPA, standing and probation cost one small read instead of the whole STUDENT_COURSE history
+#credit figures come back as floats, like COURSE.credit_hour sums did, however PostgREST formats numeric
+
+from uuid import UUID
+from Database.database import SUPABASE_SERVICE, run_query
+from Services.utils import sem_sorter, calculate_points_and_credits, latest_attempts, TotalCreditHour
+
+AGGREGATE_COLUMNS = "*, STUDENT_SEMESTER_AGGREGATE(*)"
+
+def _ratio(points, credits):
+    # Same rounding as Calc_Gpa / Calc_Cgpa; the database keeps exact sums
+    return round(float(points) / float(credits), 2) if credits and credits > 0 else 0.00
+
+def _credits(value):
+    # TotalCreditHour returns an int 0 when nothing was earned, a float sum otherwise
+    return float(value) if value else 0
+
+async def load_revision(student_id: UUID):
+    """
+    Only the revision counter, a single primary-key read. None when no aggregate row is visible
+    (no records yet, or RLS hides it), since then nothing tracks the student's writes.
+    """
+    response = await run_query(SUPABASE_SERVICE.table("STUDENT_ACADEMIC_AGGREGATE")
+        .select("revision")
+        .eq("student_id", student_id))
+    return response.data[0]["revision"] if response.data else None
+
+class AcademicAggregates:
+    """
+    A student's STUDENT_ACADEMIC_AGGREGATE row with its STUDENT_SEMESTER_AGGREGATE rows.
+    Exposes the same figures as AcademicSnapshot, computed by the database triggers.
+    """
+
+    def __init__(self, student_id: UUID, row: dict = None):
+        self.student_id = student_id
+        self.row = row or {}
+        self.by_semester = {
+            str(sem["semester"]): sem
+            for sem in self.row.get("STUDENT_SEMESTER_AGGREGATE") or []
+            if sem.get("row_count", 0) > 0
+        }
+
+    @classmethod
+    async def load(cls, student_id: UUID):
+        # RLS limits these tables to the student's own JWT, so they are read with the service-role client
+        response = await run_query(SUPABASE_SERVICE.table("STUDENT_ACADEMIC_AGGREGATE")
+            .select(AGGREGATE_COLUMNS)
+            .eq("student_id", student_id))
+        aggregates = cls(student_id, response.data[0] if response.data else None)
+        if aggregates.has_records:
+            return aggregates
+
+        # No aggregate row: a new student, or one RLS, a missing migration or a lagging backfill hides.
+        # Compute the same figures from STUDENT_COURSE rather than report zeros for real records
+        from Services.snapshot import AcademicSnapshot #snapshot imports utils, like this module
+        snapshot = await AcademicSnapshot.load(student_id)
+        if snapshot.records:
+            return cls.from_records(student_id, snapshot.records)
+        return aggregates
+
+    @classmethod
+    def from_records(cls, student_id: UUID, records: list):
+        """The row the triggers would keep for these STUDENT_COURSE rows, computed with Services.utils."""
+        completed = [r for r in records if r["status"] == "Completed" and r["grade"] != "Exemption"]
+        cgpa_points, cgpa_credits = calculate_points_and_credits(latest_attempts(completed))
+
+        by_semester = {}
+        for record in records:
+            by_semester.setdefault(str(record["semester"]), []).append(record)
+
+        semesters = []
+        for sem, rows in by_semester.items():
+            sem_completed = [r for r in rows if r["status"] == "Completed" and r["grade"] != "Exemption"]
+            gpa_points, registered_credits = calculate_points_and_credits(rows)
+            completed_points, completed_credits = calculate_points_and_credits(sem_completed)
+            semesters.append({
+                "semester": sem,
+                "row_count": len(rows),
+                "status_completed": sum(r["status"] == "Completed" for r in rows),
+                "status_current": sum(r["status"] == "Current" for r in rows),
+                "status_planned": sum(r["status"] == "Planned" for r in rows),
+                "completed_count": len(sem_completed),
+                "registered_credits": registered_credits,
+                "gpa_points": gpa_points,
+                "graded_credits": TotalCreditHour(rows),
+                "completed_points": completed_points,
+                "completed_credits": completed_credits,
+            })
+
+        return cls(student_id, {
+            "student_id": str(student_id),
+            "completed_count": len(completed),
+            "current_count": sum(r["status"] == "Current" for r in records),
+            "planned_count": sum(r["status"] == "Planned" for r in records),
+            "earned_credits": TotalCreditHour(completed),
+            "cgpa_points": cgpa_points,
+            "cgpa_credits": cgpa_credits,
+            "STUDENT_SEMESTER_AGGREGATE": semesters,
+        })
+
+    @property
+    def has_records(self):
+        return bool(self.by_semester)
+
+    @property
+    def revision(self):
+        """Increments on every change to the student's STUDENT_COURSE rows."""
+        return self.row.get("revision", 0)
+
+    @property
+    def count_completed(self):
+        return self.row.get("completed_count", 0)
+
+    @property
+    def count_current(self):
+        return self.row.get("current_count", 0)
+
+    @property
+    def count_planned(self):
+        return self.row.get("planned_count", 0)
+
+    @property
+    def cgpa(self):
+        """Calc_Cgpa over the completed list (latest attempt of each course)."""
+        return _ratio(self.row.get("cgpa_points", 0), self.row.get("cgpa_credits", 0))
+
+    @property
+    def earned_credits(self):
+        return _credits(self.row.get("earned_credits", 0))
+
+    @property
+    def semesters(self):
+        """Unique semesters as strings, in academic order."""
+        return sorted(self.by_semester, key=sem_sorter)
+
+    @property
+    def semester_credits(self):
+        """Registered credit hours per semester, across all statuses."""
+        return {sem: float(row["registered_credits"]) for sem, row in self.by_semester.items()}
+
+    @property
+    def latest_semester(self):
+        """Highest numeric semester on record, as a string ("1" when there is none)."""
+        return str(max([int(s) for s in self.by_semester if s.isdigit()] or [1]))
+
+    def semester(self, semester):
+        """The aggregate row for one semester, or None."""
+        return self.by_semester.get(str(semester))
+
+    def semester_gpa(self, semester):
+        """Calc_Gpa over every row of the semester (the probation rule's GPA)."""
+        row = self.semester(semester) or {}
+        return _ratio(row.get("gpa_points", 0), row.get("registered_credits", 0))
+
+    def completed_gpa(self, semester):
+        """Calc_Cgpa over the semester's Completed, non-Exemption rows (the /GPA route)."""
+        row = self.semester(semester) or {}
+        return _ratio(row.get("completed_points", 0), row.get("completed_credits", 0))
+
+    def enrolled_credits(self, semester):
+        """TotalCreditHour over the semester's rows."""
+        return _credits((self.semester(semester) or {}).get("graded_credits", 0))
+
+    def probation_status(self, target_semester):
+        """Same rule as probation_from_records, from the per-semester totals."""
+        unique_sems = self.semesters
+        target_sem_str = str(target_semester)
+        if target_sem_str not in unique_sems or target_sem_str == unique_sems[0]:
+            return False, 15
+
+        prev_sem = unique_sems[unique_sems.index(target_sem_str) - 1]
+        prev = self.by_semester[prev_sem]
+
+        if prev["status_completed"] != prev["row_count"]:
+            return False, 15
+
+        return (True, 11) if self.semester_gpa(prev_sem) < 2.00 else (False, 15)
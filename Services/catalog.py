@@ -0,0 +1,239 @@
+#catalog.py keeps the COURSE table in memory for the catalog routes
+#the table only changes through /course/upsert and seed.py, so every write path calls CATALOG.invalidate()
+#invalidate() also bumps the "catalog" revision in Services/revisions.py, which every worker on the host
+#checks at most every CATALOG_SYNC_SECONDS, so one worker's invalidation reloads them all
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from Database.database import SUPABASE, run_query, run_sync
+from Services.catalog_snapshot import CatalogSnapshot, read_meta, write_snapshot
+from Services.revisions import REVISIONS, RevisionStore
+
+#safety net for writes the shared revision never sees (other hosts, the SQL console)
+CATALOG_TTL_SECONDS = float(os.getenv("CATALOG_TTL_SECONDS", "300"))
+#set to a file path to serve the catalog from a memory-mapped snapshot shared by every worker;
+#a worker starting while the file holds a COURSE read younger than the TTL maps it instead of querying,
+#and keeps it only until that read is a TTL old; every reload from the table rewrites it when the content changed
+CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+#how stale a worker may be after another worker (or seed.py) on the host invalidated the catalog
+CATALOG_SYNC_SECONDS = float(os.getenv("CATALOG_SYNC_SECONDS", "1"))
+CATALOG_REVISION = "catalog"
+
+def normalize_prereqs(raw_pre_reqs):
+    """Returns pre_requisite as a clean list of course codes, whether stored as a string, list or null."""
+    if isinstance(raw_pre_reqs, str):
+        return [raw_pre_reqs.strip()] if raw_pre_reqs.strip() else []
+    if isinstance(raw_pre_reqs, list):
+        return [p.strip() for p in raw_pre_reqs if isinstance(p, str) and p.strip()]
+    return []
+
+def normalize_departments(raw_departments):
+    """Same normalization for course_department, which is a jsonb list but may hold a bare string."""
+    if isinstance(raw_departments, str):
+        return [raw_departments]
+    return list(raw_departments or [])
+
+class CourseCatalog:
+    """
+    Versioned in-memory copy of the COURSE table with code, department and type indexes.
+    Lookups return copies so routes can decorate rows (e.g. is_unlocked) without touching the cache.
+    """
+
+    def __init__(self, ttl_seconds: float = CATALOG_TTL_SECONDS, snapshot_path: str = CATALOG_SNAPSHOT_PATH,
+                 sync_seconds: float = CATALOG_SYNC_SECONDS, revisions: RevisionStore = None):
+        self.ttl_seconds = ttl_seconds
+        self.snapshot_path = snapshot_path
+        self.sync_seconds = sync_seconds
+        self.revisions = revisions or REVISIONS
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._courses = {}
+        self._by_department = {}
+        self._by_type = {}
+        self._derived = {}
+        self._content_hash = ""
+        self._snapshot = None
+        self._shared_revision = None
+        self._synced_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self):
+        return self._loaded_version == self.version and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    async def _sync(self):
+        """Marks the catalog stale when another worker has invalidated it since the last check."""
+        if time.monotonic() - self._synced_at < self.sync_seconds:
+            return
+        self._synced_at = time.monotonic() #set before awaiting, so concurrent lookups do not all check
+        try:
+            revision = await self.revisions.get(CATALOG_REVISION)
+        except Exception as e: #an unusable store leaves only the TTL, as before
+            print(f"Could not read the shared catalog revision: {e}")
+            return
+        if self._shared_revision is not None and revision != self._shared_revision:
+            self.version += 1
+        self._shared_revision = revision
+
+    async def _ensure_loaded(self):
+        await self._sync()
+        if self._is_fresh():
+            self.hits += 1
+            return
+
+        self.misses += 1
+        async with self._lock:
+            if self._is_fresh(): #another request reloaded while we waited
+                return
+
+            version = self.version
+            loaded_at = time.monotonic()
+            if self.loads == 0 and self._map_snapshot(cold_start=True): #cold start: a recent shared file
+                # as fresh as the table read that produced it, so it ages out like a worker's own load would
+                loaded_at -= max(0.0, time.time() - self._snapshot.built_at)
+            else:
+                response = await run_query(SUPABASE.table("COURSE").select("*"))
+                self._build(response.data or [])
+                await self._publish_snapshot()
+
+            # A write that landed during the fetch leaves the catalog stale so the next lookup reloads
+            self._loaded_version = version
+            self._loaded_at = loaded_at
+            self.loads += 1
+
+    def _build(self, rows: list):
+        courses, by_department, by_type = {}, {}, {}
+
+        for row in rows:
+            course = dict(row)
+            course["pre_requisite"] = normalize_prereqs(course.get("pre_requisite"))
+            code = course.get("course_code")
+            courses[code] = course
+
+            for dept in normalize_departments(course.get("course_department")):
+                by_department.setdefault(dept, []).append(code)
+
+            course_type = (course.get("course_type") or "").strip().lower()
+            by_type.setdefault(course_type, set()).add(code)
+
+        self._courses, self._by_department, self._by_type = courses, by_department, by_type
+        self._snapshot = None
+        self._derived = {}
+
+        # Derived from the rows themselves, so every worker agrees on it (unlike version, which is per process)
+        canonical = json.dumps([courses[code] for code in sorted(courses, key=str)], sort_keys=True, default=str)
+        self._content_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _map_snapshot(self, expected_hash: str = None, cold_start: bool = False):
+        """
+        Switches lookups to the snapshot file; the per-course dicts are dropped. False if there is none.
+        On a cold start the file must come from a COURSE read younger than the TTL; a file compiled
+        from Data/courses.json, or an old one, would serve rows and ETags the other workers do not.
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            snapshot = CatalogSnapshot(self.snapshot_path)
+        except Exception as e: #a missing, truncated or older-format file only costs the table query
+            print(f"Catalog snapshot {self.snapshot_path} unreadable, using the COURSE table: {e}")
+            return False
+        if expected_hash is not None and snapshot.content_hash != expected_hash:
+            return False #another worker replaced it with different rows meanwhile; keep the dicts
+        if cold_start and (snapshot.source != "db" or time.time() - snapshot.built_at >= self.ttl_seconds):
+            print(f"Catalog snapshot {self.snapshot_path} is not a recent COURSE read "
+                  f"(source {snapshot.source}), using the COURSE table")
+            return False
+
+        self._snapshot = snapshot
+        self._courses, self._by_department, self._by_type = snapshot.courses, {}, {} #by_department asks the snapshot
+        self._derived = {}
+        self._content_hash = snapshot.content_hash
+        return True
+
+    async def _publish_snapshot(self):
+        """
+        After a table load: rewrite the shared file unless another worker already wrote these rows
+        recently (half a TTL, so workers starting later can still map it), then map it.
+        """
+        if not self.snapshot_path:
+            return
+        try:
+            meta = read_meta(self.snapshot_path) or {}
+            current = (meta.get("content_hash") == self._content_hash and meta.get("source") == "db"
+                       and time.time() - meta.get("built_at", 0.0) < self.ttl_seconds / 2)
+            if not current:
+                await run_sync(write_snapshot, self.snapshot_path, list(self._courses.values()), self._content_hash)
+        except Exception as e:
+            print(f"Could not write catalog snapshot {self.snapshot_path}: {e}")
+            return
+        self._map_snapshot(expected_hash=self._content_hash)
+
+    async def invalidate(self):
+        """Marks the catalog stale in every worker on the host; their next lookups reload the COURSE table."""
+        self.version += 1
+        try:
+            await self.revisions.bump(CATALOG_REVISION)
+            self._shared_revision = await self.revisions.get(CATALOG_REVISION) #already reloading for this one
+        except Exception as e:
+            print(f"Could not publish the catalog invalidation, other workers wait for the TTL: {e}")
+
+    async def get(self, course_code: str):
+        await self._ensure_loaded()
+        course = self._courses.get(course_code)
+        return dict(course) if course else None
+
+    async def by_department(self, department: str, course_type: str = None):
+        """Courses whose course_department list contains department, optionally filtered by type (case-insensitive)."""
+        await self._ensure_loaded()
+        if self._snapshot is not None:
+            return self._snapshot.department_rows(department, None if course_type is None else course_type.strip().lower())
+        codes = self._by_department.get(department, [])
+
+        if course_type is not None:
+            type_codes = self._by_type.get(course_type.strip().lower(), set())
+            codes = [code for code in codes if code in type_codes]
+
+        return [dict(self._courses[code]) for code in codes]
+
+    async def all_courses(self):
+        await self._ensure_loaded()
+        return [dict(course) for course in self._courses.values()]
+
+    async def content_hash(self):
+        """sha256 of the loaded COURSE rows; changes whenever any course does. Used for catalog ETags."""
+        await self._ensure_loaded()
+        return self._content_hash
+
+    async def derived(self, name: str, build):
+        """
+        Returns build(all catalog rows), computed once per catalog load.
+        Used for structures compiled from the whole catalog, e.g. the prerequisite graph.
+        """
+        await self._ensure_loaded()
+        if name not in self._derived:
+            self._derived[name] = build(list(self._courses.values()))
+        return self._derived[name]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "loaded": self._loaded_version == self.version,
+            "course_count": len(self._courses),
+            "content_hash": self._content_hash[:16],
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+            "snapshot": self._snapshot.path if self._snapshot else None,
+            "snapshot_bytes": self._snapshot.size if self._snapshot else 0,
+        }
+
+CATALOG = CourseCatalog()
@@ -0,0 +1,264 @@
+#catalog_snapshot.py compiles the COURSE catalog into one binary file that workers memory-map
+#every worker maps the same file, so the page cache holds a single copy however many processes serve it,
+#and a lookup decodes just the row it needs instead of each process keeping a dict per course
+#build one from the COURSE table with: python -m Services.catalog_snapshot --out catalog.snapshot
+#(--from-file compiles Data/courses.json instead, for offline use: workers never map such a file on their own)
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from collections.abc import Mapping
+import orjson
+
+MAGIC = b"CATSNAP\x01"
+HEADER = struct.Struct("<8sI") #magic, meta length; the JSON meta follows, then 8-byte aligned sections
+
+def _code_hash(code: str):
+    return zlib.crc32(code.encode("utf-8"))
+
+def _departments(course: dict):
+    departments = course.get("course_department")
+    return [departments] if isinstance(departments, str) else list(departments or [])
+
+def compile_snapshot(courses: list, content_hash: str, source: str = "db", built_at: float = None):
+    """
+    Packs catalog rows (pre_requisite already normalized, one row per course_code) into snapshot bytes.
+    source says where the rows came from ("db" or "file") and built_at when they were read, so a
+    worker can tell whether the file matches what the COURSE table held recently.
+    Strings are interned once and course i's code is string i, so prerequisite ids below the
+    course count point straight at catalog rows. Each row is also kept as one JSON record, which
+    decodes in a single call with its exact keys, order and types.
+    """
+    strings, string_ids = [], {}
+
+    def intern(value: str):
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    for course in courses:
+        intern(course["course_code"])
+
+    count = len(courses)
+    records = [orjson.dumps(course) for course in courses]
+    credit = [float(c["credit_hour"]) if isinstance(c.get("credit_hour"), (int, float)) else 0.0 for c in courses]
+    type_key = [intern((c.get("course_type") or "").strip().lower()) for c in courses]
+
+    prereq_offsets, prereq_ids = [0], []
+    dept_index = {}
+    for i, course in enumerate(courses):
+        prereq_ids.extend(intern(code) for code in course.get("pre_requisite") or [])
+        prereq_offsets.append(len(prereq_ids))
+        for dept in _departments(course):
+            dept_index.setdefault(dept, []).append(i)
+
+    dept_keys = [intern(dept) for dept in dept_index]
+    dept_offsets, dept_courses = [0], []
+    for rows in dept_index.values():
+        dept_courses.extend(rows)
+        dept_offsets.append(len(dept_courses))
+
+    # open-addressing table code -> row; crc32 because str hashes differ between processes
+    slots = [-1] * (1 << max(1, (2 * count - 1).bit_length()))
+    for i in range(count):
+        slot = _code_hash(strings[i]) & (len(slots) - 1)
+        while slots[slot] >= 0:
+            slot = (slot + 1) & (len(slots) - 1)
+        slots[slot] = i
+
+    def offsets_of(blobs):
+        offsets = [0]
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return offsets
+
+    encoded = [value.encode("utf-8") for value in strings]
+    sections = [
+        ("string_offsets", "I", offsets_of(encoded)),
+        ("string_blob", "B", b"".join(encoded)),
+        ("record_offsets", "I", offsets_of(records)),
+        ("record_blob", "B", b"".join(records)),
+        ("code_slots", "i", slots),
+        ("credit", "d", credit),
+        ("type_key", "i", type_key),
+        ("prereq_offsets", "I", prereq_offsets),
+        ("prereq_ids", "i", prereq_ids),
+        ("dept_keys", "i", dept_keys),
+        ("dept_offsets", "I", dept_offsets),
+        ("dept_courses", "i", dept_courses),
+    ]
+    blobs = [(name, fmt, values if fmt == "B" else struct.pack(f"<{len(values)}{fmt}", *values))
+             for name, fmt, values in sections]
+
+    # offsets depend on the meta length, which depends on the offsets' digits: repeat until stable
+    placed = {}
+    while True:
+        meta = orjson.dumps({
+            "content_hash": content_hash, "count": count, "source": source,
+            "built_at": time.time() if built_at is None else built_at, "sections": placed,
+        })
+        position = -(-(HEADER.size + len(meta)) // 8) * 8
+        layout = {}
+        for name, fmt, data in blobs:
+            layout[name] = [position, len(data), fmt]
+            position = -(-(position + len(data)) // 8) * 8
+        if layout == placed:
+            break
+        placed = layout
+
+    out = bytearray(HEADER.pack(MAGIC, len(meta)) + meta)
+    for name, _, data in blobs:
+        out += b"\0" * (placed[name][0] - len(out)) + data
+    return bytes(out)
+
+def write_snapshot(path: str, courses: list, content_hash: str, source: str = "db", built_at: float = None):
+    """Writes atomically, so workers mapping the old file keep reading it intact."""
+    data = compile_snapshot(courses, content_hash, source, built_at)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+    return len(data)
+
+def read_meta(path: str):
+    """The meta block of a snapshot file (content_hash, source, built_at, ...), or None when there is none."""
+    try:
+        with open(path, "rb") as file:
+            magic, meta_length = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                return None
+            return orjson.loads(file.read(meta_length))
+    except (OSError, struct.error, ValueError):
+        return None
+
+class CatalogSnapshot:
+    """
+    Read-only view of a mapped snapshot file. courses mirrors the code -> row dict CourseCatalog
+    builds from PostgREST rows, decoding rows from the shared pages on access.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.size = len(self._mmap)
+        magic, meta_length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        meta = orjson.loads(self._mmap[HEADER.size:HEADER.size + meta_length])
+
+        self.content_hash = meta["content_hash"]
+        self.count = meta["count"]
+        self.source = meta.get("source", "unknown") #files from before provenance was recorded
+        self.built_at = meta.get("built_at", 0.0)
+        view = memoryview(self._mmap)
+        self._sections = {
+            name: view[offset:offset + length] if fmt == "B" else view[offset:offset + length].cast(fmt)
+            for name, (offset, length, fmt) in meta["sections"].items()
+        }
+        self._string_offsets = self._sections["string_offsets"]
+        self._blob = self._sections["string_blob"]
+        self._record_offsets = self._sections["record_offsets"]
+        self._records = self._sections["record_blob"]
+
+        # only the handful of departments and types get Python-side lookup tables
+        keys = self._sections["dept_keys"]
+        self._departments = {self.string(keys[k]): k for k in range(len(keys))}
+        self._types = {self.string(key): key for key in set(self._sections["type_key"])}
+
+        self.courses = _Courses(self)
+
+    def string(self, string_id: int):
+        offsets = self._string_offsets
+        return str(self._blob[offsets[string_id]:offsets[string_id + 1]], "utf-8")
+
+    def index_of(self, code: str):
+        slots = self._sections["code_slots"]
+        mask = len(slots) - 1
+        slot = _code_hash(code) & mask
+        while slots[slot] >= 0:
+            if self.string(slots[slot]) == code:
+                return slots[slot]
+            slot = (slot + 1) & mask
+        return -1
+
+    def row(self, i: int):
+        """Course i as the dict CourseCatalog would hold, same keys in the same order."""
+        offsets = self._record_offsets
+        return orjson.loads(self._records[offsets[i]:offsets[i + 1]])
+
+    def department_rows(self, department: str, type_key: str = None):
+        """Rows of one department, optionally one lowercased type, filtered on the typed sections."""
+        k = self._departments.get(department)
+        if k is None or (type_key is not None and type_key not in self._types):
+            return []
+        offsets = self._sections["dept_offsets"]
+        rows = self._sections["dept_courses"][offsets[k]:offsets[k + 1]]
+        if type_key is not None:
+            key_id, type_keys = self._types[type_key], self._sections["type_key"]
+            rows = [i for i in rows if type_keys[i] == key_id]
+        return [self.row(i) for i in rows]
+
+    def credits(self):
+        """credit_hour of every course in catalog order, as a zero-copy float64 view."""
+        return self._sections["credit"]
+
+    def prerequisite_indexes(self, i: int):
+        """Catalog rows course i requires (prerequisites outside the catalog are left out)."""
+        offsets = self._sections["prereq_offsets"]
+        return [s for s in self._sections["prereq_ids"][offsets[i]:offsets[i + 1]] if s < self.count]
+
+class _Courses(Mapping):
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+
+    def __getitem__(self, code):
+        i = self._snapshot.index_of(code) if isinstance(code, str) else -1
+        if i < 0:
+            raise KeyError(code)
+        return self._snapshot.row(i)
+
+    def __iter__(self):
+        return (self._snapshot.string(i) for i in range(self._snapshot.count))
+
+    def __len__(self):
+        return self._snapshot.count
+
+    def values(self):
+        return [self._snapshot.row(i) for i in range(self._snapshot.count)]
+
+def main():
+    from Database.database import SUPABASE #imported here: the catalog module imports this one
+    from Services.catalog import CourseCatalog, CATALOG_SNAPSHOT_PATH
+
+    parser = argparse.ArgumentParser(description="Compile the course catalog into a memory-mappable snapshot.")
+    parser.add_argument("--from-file", action="store_true",
+                        help="compile --file instead of the live COURSE table (offline use; workers will not map it)")
+    parser.add_argument("--file", default=os.path.join("Data", "courses.json"))
+    parser.add_argument("--out", default=CATALOG_SNAPSHOT_PATH or "catalog.snapshot")
+    args = parser.parse_args()
+
+    if not args.from_file:
+        rows = SUPABASE.table("COURSE").select("*").execute().data or []
+    else:
+        with open(args.file, "rb") as file:
+            rows = orjson.loads(file.read())
+        for row in rows:
+            if row.get("course_semester") is not None:
+                row["course_semester"] = str(row["course_semester"]) #a text column in COURSE
+
+    catalog = CourseCatalog(snapshot_path="")
+    catalog._build(rows)
+    source = "file" if args.from_file else "db"
+    size = write_snapshot(args.out, list(catalog._courses.values()), catalog._content_hash, source)
+    print(f"Wrote {len(catalog._courses)} courses ({size:,} bytes, from {source}) to {args.out}, content hash {catalog._content_hash[:16]}.")
+
+if __name__ == "__main__":
+    sys.exit(main())
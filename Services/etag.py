@@ -0,0 +1,33 @@
+#etag.py gives read routes strong ETags built from data versions (catalog content hash, aggregate revision)
+#a route computes the tag first; when If-None-Match already holds it, it answers 304 without
+#running its main query or serializing anything
+
+import hashlib
+import json
+from fastapi import Request, Response
+
+def make_etag(*parts):
+    """Strong ETag over the given version parts, e.g. ("catalog", content_hash, department)."""
+    digest = hashlib.sha256(json.dumps(parts, default=str, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request: Request, etag: str):
+    """If-None-Match uses the weak comparison (RFC 9110), so W/ prefixes added by proxies still match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def conditional(request: Request, response: Response, etag: str, cache_control: str = "no-cache"):
+    """
+    Returns a 304 Response when the client already has etag, otherwise None after putting the
+    ETag on the response the route will return. no-cache lets browsers store the body but
+    revalidate on every use, which is what makes them send If-None-Match.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,150 @@
+#gpa_engine.py computes GPA / CGPA / earned credits for many students in one vectorized pass
+#it reproduces calculate_points_and_credits, Calc_Gpa, Calc_Cgpa and TotalCreditHour exactly,
+#so advisor and department reports can use it instead of looping over students
+
+from itertools import chain
+import numpy as np
+
+GRADE_MAP = {
+    "A": 4.00, "A-": 3.75, "B+": 3.50, "B": 3.00,
+    "C+": 2.50, "C": 2.00, "D+": 1.50, "D": 1.00, "F": 0.00
+}
+
+def _quality_points(raw_grade):
+    """Same grade parsing as calculate_points_and_credits."""
+    if isinstance(raw_grade, str) and raw_grade.strip():
+        return GRADE_MAP.get(raw_grade.upper().strip(), 0.00)
+    if raw_grade == "" or raw_grade is None:
+        return 0.00
+    try:
+        return float(raw_grade)
+    except (ValueError, TypeError):
+        return 0.00
+
+def _is_earned(raw_grade):
+    """Same rule as TotalCreditHour: any non-empty grade other than F earns the credits."""
+    grade = raw_grade.upper().strip() if raw_grade else ""
+    return grade != "F" and grade != ""
+
+def _categorical(values: list):
+    """
+    (codes, distinct): distinct holds each value once in first-seen order and codes indexes it per row,
+    so a per-value computation runs once per distinct value and is spread back with distinct_array[codes].
+    """
+    try:
+        table = dict.fromkeys(values)
+    except TypeError: #an unhashable value (e.g. a list from a malformed row): key by repr instead
+        keys = [value if isinstance(value, str) or value is None else repr(value) for value in values]
+        codes, _ = _categorical(keys)
+        value_of = dict(zip(keys, values))
+        return codes, [value_of[key] for key in dict.fromkeys(keys)]
+    index = dict(zip(table, range(len(table))))
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+    return codes, list(table)
+
+def _round_all(points, credits):
+    # Python's round() on each value so results match Calc_Gpa / Calc_Cgpa to the last digit
+    return [round(p / c, 2) if c > 0 else 0.00 for p, c in zip(points.tolist(), credits.tolist())]
+
+class GradeBook:
+    """
+    Columnar view of STUDENT_COURSE rows for many students.
+
+    Records become parallel arrays (student index, course index, semester, credits, quality points,
+    earned flag); grades and semesters are parsed once per distinct value, not per row, and every
+    aggregate afterwards is a NumPy group-by.
+    Feed it the same rows you would pass to the scalar functions, e.g. completed_list for CGPA.
+    """
+
+    def __init__(self, records_by_student: dict):
+        self.students = list(records_by_student)
+
+        counts = [len(records_by_student[student_id]) for student_id in self.students]
+        rows = list(chain.from_iterable(records_by_student[student_id] for student_id in self.students))
+
+        # Grades, course codes and semesters repeat constantly: each column becomes codes into a small
+        # table of its distinct values, and only those values are parsed
+        grade_codes, grades = _categorical([item.get("grade") for item in rows])
+        self.course_idx, courses = _categorical([item.get("course_code") for item in rows])
+        semester_codes, semesters = _categorical([item.get("semester", 0) for item in rows])
+
+        self.student_idx = np.repeat(np.arange(len(self.students), dtype=np.int64), counts)
+        self.semester = np.array([int(semester) for semester in semesters], dtype=np.int64)[semester_codes]
+        self.credits = np.array(
+            [item.get("credit_hour") or (item.get("COURSE") or {}).get("credit_hour", 0) or 0 for item in rows],
+            dtype=np.float64,
+        )
+        quality_points = np.array([_quality_points(grade) for grade in grades], dtype=np.float64)
+        self.grade_points = quality_points[grade_codes] * self.credits
+        self.earned = np.array([_is_earned(grade) for grade in grades], dtype=bool)[grade_codes]
+        self._course_count = max(len(courses), 1)
+
+    @classmethod
+    def from_rows(cls, rows: list, student_key: str = "student_id"):
+        """Builds a GradeBook from a flat list of rows that carry their student id."""
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row[student_key], []).append(row)
+        return cls(grouped)
+
+    def _per_student(self, values):
+        return np.bincount(self.student_idx, weights=values, minlength=len(self.students))
+
+    def gpa(self):
+        """Calc_Gpa over each student's full record list."""
+        points = self._per_student(self.grade_points)
+        credits = self._per_student(self.credits)
+        return dict(zip(self.students, _round_all(points, credits)))
+
+    def semester_gpa(self):
+        """Calc_Gpa per (student, semester): {student_id: {semester: gpa}}."""
+        result = {student_id: {} for student_id in self.students}
+        if not len(self.semester):
+            return result
+
+        # One integer key per (student, semester) keeps the group-by one-dimensional
+        low = self.semester.min()
+        span = int(self.semester.max() - low) + 1
+        keys, group = np.unique(self.student_idx * span + (self.semester - low), return_inverse=True)
+        points = np.bincount(group, weights=self.grade_points, minlength=len(keys))
+        credits = np.bincount(group, weights=self.credits, minlength=len(keys))
+
+        student_idx, semester = np.divmod(keys, span)
+        for s_idx, sem, gpa in zip(student_idx.tolist(), (semester + low).tolist(), _round_all(points, credits)):
+            result[self.students[s_idx]][sem] = gpa
+        return result
+
+    def latest_attempts(self):
+        """
+        Row indices kept by Calc_Cgpa: per (student, course) the attempt with the highest semester,
+        the earliest row winning ties, ordered like Calc_Cgpa's dict (first appearance of the course).
+        """
+        if not len(self.semester):
+            return np.empty(0, dtype=np.int64)
+
+        group = self.student_idx * self._course_count + self.course_idx
+
+        # Sort by (group, semester descending); the stable sort leaves the earliest row first on ties
+        span = int(self.semester.max() - self.semester.min()) + 1
+        order = np.argsort(group * span + (self.semester.max() - self.semester), kind="stable")
+        sorted_group = group[order]
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = sorted_group[1:] != sorted_group[:-1]
+        keep = order[is_first]
+
+        # Summation order matters for bit-identical floats: sort kept rows by their group's first appearance
+        # (keep is ordered by group, exactly like np.unique's output)
+        _, first_seen = np.unique(group, return_index=True)
+        return keep[np.argsort(first_seen, kind="stable")]
+
+    def cgpa(self):
+        """Calc_Cgpa per student (latest attempt of each course only)."""
+        keep = self.latest_attempts()
+        points = np.bincount(self.student_idx[keep], weights=self.grade_points[keep], minlength=len(self.students))
+        credits = np.bincount(self.student_idx[keep], weights=self.credits[keep], minlength=len(self.students))
+        return dict(zip(self.students, _round_all(points, credits)))
+
+    def earned_credits(self):
+        """TotalCreditHour per student (every attempt with a non-F grade)."""
+        earned = self._per_student(np.where(self.earned, self.credits, 0.0))
+        return dict(zip(self.students, earned.tolist()))
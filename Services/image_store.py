@@ -0,0 +1,71 @@
+#image_store.py is where profile thumbnails are written: the Supabase bucket, or a local folder for tests/offline use
+#IMAGE_STORAGE=local keeps files under IMAGE_LOCAL_DIR and main.py serves them at /media
+
+import os
+from starlette.staticfiles import StaticFiles
+from Database.database import SUPABASE
+
+IMAGE_STORAGE = os.getenv("IMAGE_STORAGE", "supabase")
+IMAGE_LOCAL_DIR = os.getenv("IMAGE_LOCAL_DIR", "media")
+IMAGE_LOCAL_BASE_URL = os.getenv("IMAGE_LOCAL_BASE_URL", "/media")
+IMAGE_CACHE_SECONDS = 31536000 #paths are content-hashed, so a file never changes once written
+IMAGE_CACHE_CONTROL = f"public, max-age={IMAGE_CACHE_SECONDS}, immutable"
+
+class SupabaseImageStore:
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+
+    def put(self, path: str, data: bytes, content_type: str):
+        SUPABASE.storage.from_(self.bucket).upload(
+            path=path,
+            file=data,
+            file_options={
+                "content-type": content_type,
+                "cache-control": str(IMAGE_CACHE_SECONDS), #storage serves it as max-age
+                "x-upsert": "true"
+            }
+        )
+        return SUPABASE.storage.from_(self.bucket).get_public_url(path)
+
+    def prune(self, folder: str, keep: set):
+        """Deletes every file in folder except the paths in keep (older uploads)."""
+        listed = SUPABASE.storage.from_(self.bucket).list(folder) or []
+        stale = [f"{folder}/{item['name']}" for item in listed if f"{folder}/{item['name']}" not in keep]
+        if stale:
+            SUPABASE.storage.from_(self.bucket).remove(stale)
+
+class LocalImageStore:
+    def __init__(self, root: str = IMAGE_LOCAL_DIR, base_url: str = IMAGE_LOCAL_BASE_URL):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def put(self, path: str, data: bytes, content_type: str):
+        target = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target + ".tmp", "wb") as file:
+            file.write(data)
+        os.replace(target + ".tmp", target) #readers never see a half-written file
+        return f"{self.base_url}/{path}"
+
+    def prune(self, folder: str, keep: set):
+        directory = os.path.join(self.root, folder)
+        if not os.path.isdir(directory):
+            return
+        for name in os.listdir(directory):
+            if f"{folder}/{name}" not in keep:
+                os.remove(os.path.join(directory, name))
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with the same long-lived Cache-Control the bucket uses."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMAGE_CACHE_CONTROL
+        return response
+
+def get_image_store():
+    if IMAGE_STORAGE == "local":
+        return LocalImageStore()
+    return SupabaseImageStore(os.getenv("SUPABASE_BUCKET"))
+
+IMAGE_STORE = get_image_store()
@@ -0,0 +1,127 @@
+#images.py turns an uploaded profile picture into a few small WebP thumbnails
+#the upload is read straight off the request stream with a hard size cap, and decoding/resizing
+#runs in the process pool (Services/workers.py) so a 12-megapixel phone photo never blocks the event loop
+
+import hashlib
+import io
+import os
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+MAX_IMAGE_BYTES = int(os.getenv("MAX_PROFILE_IMAGE_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = 50_000_000 #header-declared size is checked before any pixel is decoded
+#the only decoders run on uploads; left open, Pillow would sniff EPS (Ghostscript) and other rarely used formats
+ACCEPTED_IMAGE_FORMATS = ("JPEG", "PNG", "WEBP")
+MULTIPART_OVERHEAD = 16 * 1024 #boundaries and part headers around the file itself
+
+THUMBNAIL_SIZES = {"sm": 64, "md": 256, "lg": 512} #square, in pixels; md is the avatar stored on STUDENT
+AVATAR_SIZE = "md"
+THUMBNAIL_FORMAT = "webp"
+THUMBNAIL_CONTENT_TYPE = "image/webp"
+THUMBNAIL_QUALITY = 82
+
+def _too_large():
+    return HTTPException(status_code=413, detail=f"Image is larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB.")
+
+async def read_image_upload(request: Request, field: str = "file", limit: int = MAX_IMAGE_BYTES):
+    """
+    Reads the uploaded image from the request body as it arrives and stops with 413 as soon as the
+    file passes limit, instead of letting the whole body spool to disk first.
+    Accepts multipart/form-data (the file in `field`) or a raw image/* body.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit + MULTIPART_OVERHEAD:
+        raise _too_large()
+
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    data = bytearray()
+
+    if content_type.startswith(b"image/"):
+        async for chunk in request.stream():
+            data += chunk
+            if len(data) > limit:
+                raise _too_large()
+        return bytes(data)
+
+    if content_type != b"multipart/form-data" or not options.get(b"boundary"):
+        raise HTTPException(status_code=415, detail="Send the image as multipart/form-data or an image/* body.")
+
+    part = {"header": b"", "value": b"", "headers": {}, "wanted": False, "found": False}
+
+    def on_header_field(chunk, start, end):
+        part["header"] += chunk[start:end]
+
+    def on_header_value(chunk, start, end):
+        part["value"] += chunk[start:end]
+
+    def on_header_end():
+        part["headers"][part["header"].lower()] = part["value"]
+        part["header"] = part["value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition"))
+        part["wanted"] = not part["found"] and disposition.get(b"name") == field.encode()
+        part["found"] = part["found"] or part["wanted"]
+        part["headers"] = {}
+
+    def on_part_data(chunk, start, end):
+        if part["wanted"]:
+            data.extend(chunk[start:end])
+            if len(data) > limit:
+                raise _too_large()
+
+    parser = MultipartParser(options[b"boundary"], callbacks={
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+    parser.finalize()
+
+    if not part["found"]:
+        raise HTTPException(status_code=422, detail=f"Missing form field '{field}'.")
+    return bytes(data)
+
+def make_thumbnails(data: bytes):
+    """
+    Decodes data and returns {size name: WebP bytes} for every THUMBNAIL_SIZES entry, centre-cropped
+    to a square. Runs in a worker process; raises ValueError for anything that is not a usable
+JPEG, PNG or WebP image.
+    """
+    from PIL import Image, ImageOps #only the worker processes ever load Pillow
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+    try:
+        image = Image.open(io.BytesIO(data), formats=ACCEPTED_IMAGE_FORMATS)
+        if image.width * image.height > MAX_IMAGE_PIXELS: #Pillow itself only warns below twice its limit
+            raise Image.DecompressionBombError(f"{image.width}x{image.height}")
+        # JPEGs decode straight at 1/2, 1/4 or 1/8 scale when that is still big enough, skipping most of the work
+        largest = max(THUMBNAIL_SIZES.values())
+        image.draft("RGB", (largest * 2, largest * 2))
+        image.load() #decode here, so truncated files fail inside this try
+        image = ImageOps.exif_transpose(image) #phone photos are often stored sideways with a rotation tag
+    except Image.DecompressionBombError:
+        raise ValueError("Image has too many pixels.")
+    except (OSError, SyntaxError):
+        raise ValueError("Not a supported image file (JPEG, PNG or WebP).")
+
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    thumbnails = {}
+    for name, size in sorted(THUMBNAIL_SIZES.items(), key=lambda item: -item[1]):
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS) #each size is cut from the previous, larger one
+        buffer = io.BytesIO()
+        image.save(buffer, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, method=4)
+        thumbnails[name] = buffer.getvalue()
+    return thumbnails
+
+def thumbnail_paths(student_id, data: bytes):
+    """
+    Storage paths per size. They carry a hash of the original, so a new picture gets new URLs
+    and the old ones can be cached as immutable.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    return {name: f"profiles/{student_id}/{digest}-{name}.{THUMBNAIL_FORMAT}" for name in THUMBNAIL_SIZES}
@@ -0,0 +1,320 @@
+#job_queue.py runs slow backend calls (advisor analyses) as background jobs
+#a request only enqueues work and returns a job id, so API latency no longer follows LLM latency
+#job state lives in a SQLite file shared by every worker process on the host (like the rate limiter's),
+#so a job submitted to one worker can be polled, deduplicated and awaited through any other
+
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import httpx
+import orjson
+
+ADVISOR_WORKERS = int(os.getenv("ADVISOR_WORKERS", "4")) #also the cap on concurrent calls to the LLM backend
+ADVISOR_QUEUE_MAX = int(os.getenv("ADVISOR_QUEUE_MAX", "100"))
+ADVISOR_JOB_RETRIES = int(os.getenv("ADVISOR_JOB_RETRIES", "3"))
+ADVISOR_JOB_TIMEOUT_SECONDS = float(os.getenv("ADVISOR_JOB_TIMEOUT_SECONDS", "90"))
+ADVISOR_JOB_TTL_SECONDS = float(os.getenv("ADVISOR_JOB_TTL_SECONDS", "3600"))
+ADVISOR_JOB_STORE_PATH = os.getenv("ADVISOR_JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "advisor_jobs.sqlite3"))
+RETRY_BASE_SECONDS = 1.0
+JOB_POLL_SECONDS = 0.5 #how often a worker checks the store for a job another worker is running
+
+TRANSIENT_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+class QueueFull(Exception):
+    pass
+
+def is_transient(error: Exception):
+    """Timeouts, dropped connections and 408/429/5xx answers are worth retrying; anything else is final."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) in TRANSIENT_STATUS
+
+class Job:
+    def __init__(self, key: str, payload):
+        self.id = str(uuid.uuid4())
+        self.key = key
+        self.payload = payload
+        self.status = "queued" #queued -> running -> done | failed
+        self.result = None
+        self.error = None
+        self.attempts = 0
+        self.created_at = time.time()
+        self.finished_at = None
+        self.finished = asyncio.Event()
+
+    @classmethod
+    def from_row(cls, row: dict):
+        """A read-only copy of a job owned by another worker, as stored in JobStore."""
+        job = cls.__new__(cls)
+        job.id, job.key, job.payload = row["job_id"], row["key"], None
+        job.status, job.result, job.error = row["status"], row["result"], row["error"]
+        job.attempts, job.created_at, job.finished_at = row["attempts"], row["created_at"], row["finished_at"]
+        job.finished = asyncio.Event()
+        if not job.is_active:
+            job.finished.set()
+        return job
+
+    @property
+    def is_active(self):
+        return self.status in ("queued", "running")
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+class JobStore:
+    """
+    Job rows in one SQLite table, written by the worker that owns the job and read by all of them.
+    Same approach as Services.rate_limit.SQLiteStorage: one connection per process, WAL so reads
+    never wait on a writer. path ":memory:" keeps jobs private to the process (single worker, tests).
+    """
+
+    COLUMNS = ("job_id", "key", "status", "result", "error", "attempts", "created_at", "finished_at")
+
+    def __init__(self, path: str = ADVISOR_JOB_STORE_PATH, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        # A connection must not cross a fork (gunicorn --preload), so each process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS advisor_job ("
+                " job_id TEXT PRIMARY KEY, key TEXT NOT NULL, status TEXT NOT NULL, result TEXT, error TEXT,"
+                " attempts INTEGER NOT NULL, created_at REAL NOT NULL, finished_at REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS advisor_job_key ON advisor_job (key, status)")
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def _row(self, values):
+        row = dict(zip(self.COLUMNS, values))
+        row["result"] = None if row["result"] is None else orjson.loads(row["result"])
+        return row
+
+    def save(self, job: Job):
+        self._execute(
+            "INSERT OR REPLACE INTO advisor_job (job_id, key, status, result, error, attempts, created_at, finished_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.key, job.status, None if job.result is None else orjson.dumps(job.result),
+             job.error, job.attempts, job.created_at, job.finished_at)
+        )
+
+    def load(self, job_id: str):
+        rows = self._execute(f"SELECT {', '.join(self.COLUMNS)} FROM advisor_job WHERE job_id = ?", (job_id,))
+        return self._row(rows[0]) if rows else None
+
+    def find(self, key: str, statuses: tuple, since: float):
+        """The newest job for key in one of statuses created after since, or None."""
+        rows = self._execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM advisor_job "
+            f"WHERE key = ? AND status IN ({', '.join('?' * len(statuses))}) AND created_at > ? "
+            "ORDER BY created_at DESC LIMIT 1",
+            (key, *statuses, since)
+        )
+        return self._row(rows[0]) if rows else None
+
+    def expire(self, finished_before: float, created_before: float):
+        """Drops finished jobs past their TTL, and active ones no worker can still be running."""
+        self._execute(
+            "DELETE FROM advisor_job WHERE finished_at < ? OR (finished_at IS NULL AND created_at < ?)",
+            (finished_before, created_before)
+        )
+
+    def counts(self):
+        return dict(self._execute("SELECT status, COUNT(*) FROM advisor_job GROUP BY status"))
+
+class JobQueue:
+    """
+    Bounded asyncio queue drained by a fixed set of worker tasks.
+
+    - submit() with the key of an active job returns that job instead of queueing a duplicate
+    - transient failures are retried with exponential backoff and jitter, each attempt under a timeout
+    - finished jobs are kept for ADVISOR_JOB_TTL_SECONDS so clients can still poll them
+    - every state change is written to the shared JobStore; jobs run in the worker they were submitted to
+    Workers start on the first submit, inside the running event loop.
+    """
+
+    def __init__(self, run, workers: int = ADVISOR_WORKERS, max_queued: int = ADVISOR_QUEUE_MAX,
+                 retries: int = ADVISOR_JOB_RETRIES, timeout: float = ADVISOR_JOB_TIMEOUT_SECONDS,
+                 ttl_seconds: float = ADVISOR_JOB_TTL_SECONDS, on_success=None, store: JobStore = None):
+        self.run = run #async callable(payload) -> result
+        self.on_success = on_success #optional callable(job, result), e.g. to fill a cache
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retries = retries
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds
+        self.store = store or JobStore()
+        # a job still active after every attempt and backoff could have run belongs to a worker that died
+        self.stale_seconds = (retries + 1) * timeout + RETRY_BASE_SECONDS * 2 ** (retries + 1)
+        self.jobs = OrderedDict() #job_id -> Job this worker owns, oldest first
+        self.active_by_key = {}
+        self.deduplicated = 0
+        self.retried = 0
+        self._queue = None
+        self._tasks = []
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def _expire(self):
+        now = time.time()
+        while self.jobs:
+            job = next(iter(self.jobs.values()))
+            if job.is_active or now - job.finished_at < self.ttl_seconds:
+                break
+            self.jobs.popitem(last=False)
+        self.store.expire(now - self.ttl_seconds, now - self.stale_seconds - self.ttl_seconds)
+
+    def submit(self, key: str, payload):
+        """Queues run(payload) unless a job with the same key is already queued or running."""
+        self._start()
+        self._expire()
+
+        existing = self.active_by_key.get(key)
+        if existing is None:
+            row = self.store.find(key, ("queued", "running"), time.time() - self.stale_seconds)
+            existing = row and Job.from_row(row) #in flight on another worker
+        if existing is not None:
+            self.deduplicated += 1
+            return existing
+
+        job = Job(key, payload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull()
+
+        self.jobs[job.id] = job
+        self.active_by_key[key] = job
+        self.store.save(job)
+        return job
+
+    def completed(self, key: str, result):
+        """
+        A finished job for work that needed no run (e.g. answered from a cache). The same key
+        always has the same result, so a done job still within its TTL is returned again.
+        """
+        self._expire()
+        row = self.store.find(key, ("done",), time.time() - self.ttl_seconds)
+        if row is not None:
+            return self.jobs.get(row["job_id"]) or Job.from_row(row)
+
+        job = Job(key, None)
+        self.jobs[job.id] = job
+        self._finish(job, "done", result=result)
+        return job
+
+    def get(self, job_id: str):
+        """This worker's job, or a copy of one another worker owns; None when unknown or expired."""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        row = self.store.load(job_id)
+        if row is None:
+            return None
+        job = Job.from_row(row)
+        if job.is_active and time.time() - job.created_at > self.stale_seconds:
+            job.status, job.error = "failed", "The worker running this job stopped before it finished."
+            job.finished.set()
+        return job
+
+    async def wait(self, job: Job, timeout: float):
+        """Waits up to timeout for job to finish and returns its latest state, wherever it runs."""
+        if job.id in self.jobs:
+            try:
+                await asyncio.wait_for(job.finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return job
+
+        deadline = time.monotonic() + timeout
+        while job.is_active and time.monotonic() < deadline:
+            await asyncio.sleep(min(JOB_POLL_SECONDS, max(0.0, deadline - time.monotonic())))
+            job = self.get(job.id) or job
+        return job
+
+    def _finish(self, job: Job, status: str, result=None, error: str = None):
+        job.status, job.result, job.error = status, result, error
+        job.finished_at = time.time()
+        if self.active_by_key.get(job.key) is job:
+            del self.active_by_key[job.key]
+        try:
+            self.store.save(job)
+        finally:
+            job.finished.set()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: Job):
+        job.status = "running"
+        self.store.save(job)
+        while True:
+            job.attempts += 1
+            try:
+                result = await asyncio.wait_for(self.run(job.payload), self.timeout)
+            except Exception as e:
+                if job.attempts <= self.retries and is_transient(e):
+                    self.retried += 1
+                    await asyncio.sleep(RETRY_BASE_SECONDS * 2 ** (job.attempts - 1) * (1 + random.random()))
+                    continue
+                print(f"JOB {job.id} FAILED after {job.attempts} attempt(s): {e!r}")
+                self._finish(job, "failed", error=str(e) or type(e).__name__)
+                return
+
+            if self.on_success is not None:
+                try:
+                    self.on_success(job, result)
+                except Exception as e: #the result is still good; a failing hook must not strand the job
+                    print(f"JOB {job.id} on_success hook failed: {e!r}")
+            self._finish(job, "done", result=result)
+            return
+
+    def stats(self):
+        statuses = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queued": self.max_queued,
+            "jobs": statuses, #owned by this worker
+            "all_workers": self.store.counts(),
+            "deduplicated": self.deduplicated,
+            "retried": self.retried,
+        }
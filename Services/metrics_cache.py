@@ -0,0 +1,85 @@
+#metrics_cache.py remembers computed academic figures (summary, GPA, standing, report) per student
+#a student's records only change through the student_course mutation routes, which call invalidate()
+#invalidate() bumps the student's revision in Services/revisions.py, shared by every worker process on
+#the host, so a write handled by one worker retires what the others cached at once. Hosts do not share
+#revisions: a write made through another host (or outside the API) is picked up when the TTL runs out
+
+import os
+import time
+from collections import OrderedDict
+from Services.revisions import REVISIONS, RevisionStore
+
+METRICS_CACHE_MAX_STUDENTS = int(os.getenv("METRICS_CACHE_MAX_STUDENTS", "2048"))
+#bounds staleness for writes this host's revisions never see (other hosts, SQL console, scripts)
+METRICS_CACHE_TTL_SECONDS = float(os.getenv("METRICS_CACHE_TTL_SECONDS", "60"))
+
+class StudentMetricsCache:
+    """
+    LRU cache keyed by student. Each student holds a small dict of results
+    (e.g. "summary", ("gpa", 3)), so one invalidate() drops everything derived from their records.
+    """
+
+    def __init__(self, max_students: int = METRICS_CACHE_MAX_STUDENTS, ttl_seconds: float = METRICS_CACHE_TTL_SECONDS,
+                 revisions: RevisionStore = None):
+        self.max_students = max_students
+        self.ttl_seconds = ttl_seconds
+        self.revisions = revisions or REVISIONS
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.discarded = 0
+        self._students = OrderedDict() #student_id -> {key: (stored_at, revision, value)}
+
+    async def get_or_compute(self, student_id, key, compute):
+        """Returns the cached value for (student_id, key) or awaits compute() and stores it."""
+        student_key = str(student_id)
+        revision = await self.revisions.get(student_key)
+        entries = self._students.get(student_key)
+
+        if entries is not None and key in entries:
+            stored_at, stored_revision, value = entries[key]
+            if stored_revision == revision and time.monotonic() - stored_at < self.ttl_seconds:
+                self._students.move_to_end(student_key)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        value = await compute() #exceptions (e.g. 404s) propagate and are never cached
+
+        if await self.revisions.get(student_key) != revision:
+            # a write landed while compute() ran, so value may predate it: serve it once, never store it
+            self.discarded += 1
+            return value
+
+        entries = self._students.setdefault(student_key, {})
+        entries[key] = (time.monotonic(), revision, value)
+        self._students.move_to_end(student_key)
+
+        while len(self._students) > self.max_students:
+            self._students.popitem(last=False)
+            self.evictions += 1
+
+        return value
+
+    async def invalidate(self, student_id):
+        """Drops every cached figure for one student, in every worker; call after any write to their records."""
+        self._students.pop(str(student_id), None)
+        await self.revisions.bump(str(student_id))
+
+    def clear(self):
+        self._students.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "students": len(self._students),
+            "max_students": self.max_students,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "discarded": self.discarded,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+METRICS_CACHE = StudentMetricsCache()
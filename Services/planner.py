@@ -0,0 +1,182 @@
+#planner.py lays out a student's remaining courses semester by semester
+#prerequisites are hard constraints, probation_from_records's 15/11 caps bound each semester,
+#and course_semester (the programme's recommended semester) breaks ties between otherwise equal courses
+
+import heapq
+from math import ceil
+
+FULL_LOAD = 15
+NO_HINT = 10 ** 6 #courses without a course_semester hint go after hinted ones
+
+def semester_hint(course: dict):
+    try:
+        return int(course.get("course_semester"))
+    except (TypeError, ValueError):
+        return NO_HINT
+
+def _priority_chain_first(code, course, height):
+    return (-height, semester_hint(course), -(course.get("credit_hour") or 0), code)
+
+def _priority_hint_first(code, course, height):
+    return (semester_hint(course), -height, -(course.get("credit_hour") or 0), code)
+
+STRATEGIES = {"chain_first": _priority_chain_first, "hint_first": _priority_hint_first}
+
+def credit_lower_bound(total_credits, first_limit: int, limit: int = FULL_LOAD):
+    """Fewest semesters the credits alone need, given a (possibly reduced) first semester."""
+    if total_credits <= 0:
+        return 0
+    if total_credits <= first_limit:
+        return 1
+    return 1 + ceil((total_credits - first_limit) / limit)
+
+class SemesterPlanner:
+    """
+    List scheduler over the prerequisite graph restricted to the courses being planned.
+
+    Each semester takes the highest-priority ready courses that still fit under the credit cap.
+    Ready courses sit in one heap per credit value, so picking the best course that fits is a
+    comparison of a handful of heap heads rather than a scan of everything ready.
+    Two priority orders are tried (longest remaining chain first, recommended semester first)
+    and the plan with fewer semesters wins.
+    """
+
+    def __init__(self, courses: dict, prereqs: dict, satisfied: set = frozenset()):
+        """
+        courses:   {course_code: catalog row} to schedule
+        prereqs:   {course_code: prerequisite codes}, e.g. PrerequisiteGraph.prereqs
+        satisfied: codes that already count as passed (history, in-progress, assumed external)
+        """
+        self.courses = courses
+        self.unscheduled = {}
+
+        for code, course in courses.items():
+            missing = [p for p in prereqs.get(code, ()) if p not in satisfied and p not in courses]
+            if missing:
+                self.unscheduled[code] = f"Requires {', '.join(missing)}, which is not in the plan"
+            elif (course.get("credit_hour") or 0) > FULL_LOAD:
+                self.unscheduled[code] = f"Exceeds the {FULL_LOAD} credit semester limit"
+
+        # Edges inside the plan only; anything else is satisfied or already rejected
+        self.before = {
+            code: [p for p in prereqs.get(code, ()) if p in courses]
+            for code in courses
+        }
+        self.after = {code: [] for code in courses}
+        for code, pres in self.before.items():
+            for pre in pres:
+                self.after[pre].append(code)
+
+        self._propagate_unscheduled()
+        self.height = self._heights()
+
+    def _propagate_unscheduled(self):
+        stack = list(self.unscheduled)
+        while stack:
+            code = stack.pop()
+            for dependent in self.after[code]:
+                if dependent not in self.unscheduled:
+                    self.unscheduled[dependent] = f"Depends on {code}, which cannot be scheduled"
+                    stack.append(dependent)
+
+    def _heights(self):
+        """Longest chain of semesters from each course to the end of the plan (Kahn order, sinks last)."""
+        pending = {code: len(self.before[code]) for code in self.courses if code not in self.unscheduled}
+        order = [code for code, count in pending.items() if count == 0]
+        for code in order:
+            for dependent in self.after[code]:
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        order.append(dependent)
+
+        for code in pending.keys() - set(order):
+            self.unscheduled[code] = "Part of, or depends on, a prerequisite cycle"
+        self._propagate_unscheduled()
+
+        height = {}
+        for code in reversed(order):
+            if code not in self.unscheduled:
+                height[code] = 1 + max((height[d] for d in self.after[code] if d in height), default=0)
+        return height
+
+    @property
+    def total_credits(self):
+        return sum(self.courses[code].get("credit_hour") or 0 for code in self.height)
+
+    def lower_bound(self, first_limit: int, limit: int = FULL_LOAD):
+        """No plan can be shorter than the longest chain or than the credits allow."""
+        longest_chain = max(self.height.values(), default=0)
+        return max(longest_chain, credit_lower_bound(self.total_credits, first_limit, limit))
+
+    def _schedule(self, priority, first_limit: int, limit: int):
+        waiting = {code: len(self.before[code]) for code in self.height}
+        ready = {} #credit value -> heap of (priority, code)
+
+        def push(code):
+            course = self.courses[code]
+            heapq.heappush(
+                ready.setdefault(course.get("credit_hour") or 0, []),
+                (priority(code, course, self.height[code]), code)
+            )
+
+        for code, count in waiting.items():
+            if count == 0:
+                push(code)
+
+        semesters, remaining = [], len(waiting)
+        while remaining:
+            cap = first_limit if not semesters else limit
+            capacity, taken = cap, []
+
+            while True:
+                best = None
+                for credit, heap in ready.items():
+                    if heap and credit <= capacity and (best is None or heap[0] < ready[best][0]):
+                        best = credit
+                if best is None:
+                    break
+                _, code = heapq.heappop(ready[best])
+                taken.append(code)
+                capacity -= best
+
+            # Dependents become ready only from the following semester
+            for code in taken:
+                for dependent in self.after[code]:
+                    if dependent in waiting:
+                        waiting[dependent] -= 1
+                        if waiting[dependent] == 0:
+                            push(dependent)
+
+            semesters.append((cap, taken))
+            remaining -= len(taken)
+
+        return semesters
+
+    def plan(self, start_semester: int, first_limit: int = FULL_LOAD, limit: int = FULL_LOAD):
+        best_name, best = None, None
+        for name, priority in STRATEGIES.items():
+            semesters = self._schedule(priority, first_limit, limit)
+            if best is None or len(semesters) < len(best):
+                best_name, best = name, semesters
+
+        return {
+            "start_semester": start_semester,
+            "semester_count": len(best),
+            "lower_bound": self.lower_bound(first_limit, limit),
+            "total_credits": self.total_credits,
+            "strategy": best_name,
+            "semesters": [
+                {
+                    "semester": start_semester + offset,
+                    "max_limit": cap,
+                    "credits": sum(self.courses[code].get("credit_hour") or 0 for code in taken),
+                    "courses": [self.courses[code] for code in taken],
+                }
+                for offset, (cap, taken) in enumerate(best)
+            ],
+            "unscheduled": [
+                {"course_code": code, "reason": reason}
+                for code, reason in sorted(self.unscheduled.items())
+            ],
+        }
@@ -0,0 +1,171 @@
+#prereq_graph.py compiles the catalog's pre_requisite lists into a graph once per catalog load
+#after that, "what does X unlock" and "what is the longest chain to X" are dictionary lookups
+
+from Services.catalog import CATALOG
+
+class PrerequisiteGraph:
+    """
+    Prerequisite graph over course codes, with edges prerequisite -> dependent course.
+
+    Compiled once from the catalog rows:
+      - topo_order: every course after all of its prerequisites
+      - cycles: groups of courses that (indirectly) require each other; empty for a sane catalog
+      - transitive closure in both directions (all prerequisites / everything a course unlocks)
+      - longest prerequisite chain ending at each course (the critical path to take it)
+
+    Codes listed as prerequisites but missing from the catalog become nodes with 0 credits
+    and are reported in `external`.
+    """
+
+    def __init__(self, courses: list):
+        self.credits = {}
+        self.prereqs = {}
+
+        for course in courses:
+            code = course.get("course_code")
+            self.credits[code] = course.get("credit_hour") or 0
+            self.prereqs[code] = tuple(dict.fromkeys(course.get("pre_requisite") or []))
+
+        self.external = sorted({p for pres in self.prereqs.values() for p in pres if p not in self.prereqs})
+        for code in self.external:
+            self.credits[code] = 0
+            self.prereqs[code] = ()
+
+        self.dependents = {code: [] for code in self.prereqs}
+        for code, pres in self.prereqs.items():
+            for pre in pres:
+                self.dependents[pre].append(code)
+
+        self._compile()
+
+    def _strongly_connected(self):
+        """Iterative Tarjan over prerequisite -> dependent edges; components come out sinks first."""
+        index_of, lowlink, on_stack = {}, {}, set()
+        stack, components = [], []
+        counter = 0
+
+        for root in self.prereqs:
+            if root in index_of:
+                continue
+
+            work = [(root, iter(self.dependents[root]))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+
+                for child in children:
+                    if child not in index_of:
+                        index_of[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.dependents[child])))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[child])
+
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    def _compile(self):
+        components = self._strongly_connected()
+        components.reverse() #sources first: every component after the ones it depends on
+
+        self.cycles = [
+            sorted(component) for component in components
+            if len(component) > 1 or component[0] in self.prereqs[component[0]]
+        ]
+        self.topo_order = [code for component in components for code in component]
+
+        # Transitive prerequisites as bitsets over topo positions, then decoded once per course
+        position = {code: i for i, code in enumerate(self.topo_order)}
+        ancestor_bits = {}
+        self.chain_length = {}
+        self._chain_parent = {}
+
+        for component in components:
+            members = set(component)
+            bits = 0
+            best_length, best_parent = 0, None
+
+            for code in component:
+                for pre in self.prereqs[code]:
+                    if pre in members:
+                        bits |= 1 << position[pre] #a course in a cycle requires its whole cycle
+                        continue
+                    bits |= ancestor_bits[pre] | (1 << position[pre])
+                    if self.chain_length[pre] > best_length:
+                        best_length, best_parent = self.chain_length[pre], pre
+
+            for code in component:
+                ancestor_bits[code] = bits
+                self.chain_length[code] = best_length + 1
+                self._chain_parent[code] = best_parent
+
+        self.all_prereqs = {code: self._decode(ancestor_bits[code]) for code in self.topo_order}
+
+        unlocks = {code: [] for code in self.topo_order}
+        for code, prereqs in self.all_prereqs.items():
+            for pre in prereqs:
+                if pre != code:
+                    unlocks[pre].append(code)
+        self.all_unlocks = {code: tuple(sorted(codes)) for code, codes in unlocks.items()}
+
+    def _decode(self, bits: int):
+        codes = []
+        while bits:
+            low = bits & -bits
+            codes.append(self.topo_order[low.bit_length() - 1])
+            bits ^= low
+        return tuple(codes) #already in topological order
+
+    def __contains__(self, code: str):
+        return code in self.prereqs
+
+    @property
+    def is_acyclic(self):
+        return not self.cycles
+
+    def unlocks(self, code: str):
+        """Every course that directly or indirectly requires code."""
+        return self.all_unlocks[code]
+
+    def requires(self, code: str):
+        """Every course that must be passed, directly or indirectly, before code (in taking order)."""
+        return self.all_prereqs[code]
+
+    def critical_path(self, code: str):
+        """The longest prerequisite chain ending at code, first course first."""
+        path = []
+        while code is not None:
+            path.append(code)
+            code = self._chain_parent[code]
+        path.reverse()
+        return path
+
+async def get_prereq_graph():
+    """The graph for the current catalog; rebuilt only when the catalog reloads."""
+    return await CATALOG.derived("prereq_graph", PrerequisiteGraph)
@@ -0,0 +1,95 @@
+#rate_limit.py keeps slowapi's counters in a SQLite file shared by every worker process on the host
+#with the default in-memory storage each uvicorn/gunicorn worker counts on its own, so N workers allow N x the limit
+#importing this module registers the sqlite:// scheme with limits, so Limiter(storage_uri="sqlite:///...") just works
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from limits.storage import Storage
+
+RATE_LIMIT_STORAGE_URI = os.getenv(
+    "RATE_LIMIT_STORAGE_URI",
+    "sqlite:///" + os.path.join(tempfile.gettempdir(), "rate_limits.sqlite3")
+)
+PURGE_EVERY = 1000 #increments between sweeps of expired counters
+
+class SQLiteStorage(Storage):
+    """
+    Fixed-window counters in one SQLite table. Each increment is a single UPSERT ... RETURNING
+    statement, so it is atomic across processes without an explicit transaction, and WAL mode
+    lets readers carry on while another worker writes.
+
+    URI: sqlite:////absolute/path.db or sqlite:///relative/path.db
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str = None, wrap_exceptions: bool = False, timeout: float = 5.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = (uri or "").split("://", 1)[-1][1:] #sqlite:///x.db -> x.db, sqlite:////tmp/x.db -> /tmp/x.db
+        self.path = path or RATE_LIMIT_STORAGE_URI.split("://", 1)[-1][1:]
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._increments = 0
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        # A connection must not cross a fork (gunicorn --preload), so each process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL") #a crash can lose the last few hits, never corrupt the file
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit ("
+                " key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        rows = self._execute(
+            "INSERT INTO rate_limit (key, count, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            " count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,"
+            " expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+            "RETURNING count",
+            (key, amount, now + expiry, now, now)
+        )
+
+        self._increments += 1
+        if self._increments % PURGE_EVERY == 0:
+            self._execute("DELETE FROM rate_limit WHERE expires_at <= ?", (now,))
+        return rows[0][0]
+
+    def get(self, key: str) -> int:
+        rows = self._execute("SELECT count FROM rate_limit WHERE key = ? AND expires_at > ?", (key, time.time()))
+        return rows[0][0] if rows else 0
+
+    def get_expiry(self, key: str) -> float:
+        rows = self._execute("SELECT expires_at FROM rate_limit WHERE key = ? AND expires_at > ?", (key, time.time()))
+        return rows[0][0] if rows else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        return len(self._execute("DELETE FROM rate_limit RETURNING key"))
+
+    def clear(self, key: str) -> None:
+        self._execute("DELETE FROM rate_limit WHERE key = ?", (key,))
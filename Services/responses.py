@@ -0,0 +1,66 @@
+#responses.py serializes the large list payloads (catalog, report-data, transcripts) in as few passes as possible
+#returning a response object skips FastAPI's jsonable_encoder, which costs far more than the JSON rendering
+#itself on these payloads (see Benchmarks/bench_json.py); main.py makes orjson the default renderer too
+
+from functools import lru_cache
+from typing import get_args
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson with int dict keys allowed (report semesters) and str() for anything it cannot encode, like json.dumps(default=str)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS, default=str)
+
+def json_response(content, response: Response = None):
+    """
+    Returns content, already JSON-shaped data such as supabase rows, as a FastJSONResponse.
+    Pass the route's injected Response so headers set on it (e.g. the ETag) are kept.
+    """
+    return FastJSONResponse(content, headers=dict(response.headers) if response is not None else None)
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type[BaseModel]):
+    """TypeAdapter(list[model]), compiled once per model instead of per request."""
+    return TypeAdapter(list[model])
+
+@lru_cache(maxsize=None)
+def row_fields(model: type[BaseModel]):
+    """
+    (key, default, as_float, nested fields) per field of model, compiled once per model.
+    as_float marks float fields, which pydantic writes as 3.0 where PostgREST may send 3.
+    """
+    fields = []
+    for name, field in model.model_fields.items():
+        args = get_args(field.annotation) or (field.annotation,)
+        nested = next((arg for arg in args if isinstance(arg, type) and issubclass(arg, BaseModel)), None)
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        fields.append((field.alias or name, default, float in args and int not in args, row_fields(nested) if nested else None))
+    return tuple(fields)
+
+def project_row(row: dict, fields: tuple):
+    """row cut down to the model's fields, with its defaults and float rendering, as response_model would dump it."""
+    out = {}
+    for key, default, as_float, nested in fields:
+        value = row.get(key, default)
+        if value is not None:
+            if nested is not None and isinstance(value, dict):
+                value = project_row(value, nested)
+            elif as_float and type(value) is int:
+                value = float(value)
+        out[key] = value
+    return out
+
+def model_list_response(model: type[BaseModel], rows: list, response: Response = None):
+    """
+    Same JSON as response_model=list[model] for rows read from our own tables, without validating them:
+    each row keeps only the model's fields and orjson writes the list. Rows from a client must still go
+    through list_adapter(model).validate_python. Routes keep their response_model so the OpenAPI schema
+    does not change.
+    """
+    fields = row_fields(model)
+    body = orjson.dumps([project_row(row, fields) for row in rows])
+    return Response(body, media_type="application/json", headers=dict(response.headers) if response is not None else None)
@@ -0,0 +1,67 @@
+#revisions.py keeps write counters (one per student, one for the catalog) in a SQLite file shared by every
+#worker process on the host (like the rate limiter's), so a write handled by one worker retires what the
+#others cached at once. The file is local to the host: with several hosts, a write made through another
+#host only shows up here when the cached value's TTL runs out
+#reads and writes go through the shared executor, since a busy file can block for up to the timeout
+
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from Database.executor import run_sync
+
+REVISION_STORE_PATH = os.getenv(
+    "REVISION_STORE_PATH",
+    os.path.join(tempfile.gettempdir(), "revisions.sqlite3")
+)
+
+class RevisionStore:
+    """
+    Named write counters in one SQLite table. Revisions are prefixed with the store's epoch, created
+    with the table, so a recreated file can never hand out a revision an old cache entry already used.
+    path ":memory:" keeps the counters private to the process (single worker, tests).
+    """
+
+    def __init__(self, path: str = REVISION_STORE_PATH, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._epoch = None
+
+    def _connect(self):
+        # A connection must not cross a fork (gunicorn --preload), so each process opens its own
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS store_epoch (id INTEGER PRIMARY KEY CHECK (id = 1), epoch TEXT NOT NULL)")
+            connection.execute("INSERT OR IGNORE INTO store_epoch (id, epoch) VALUES (1, ?)", (uuid.uuid4().hex[:12],))
+            connection.execute("CREATE TABLE IF NOT EXISTS revision (name TEXT PRIMARY KEY, revision INTEGER NOT NULL)")
+            self._epoch = connection.execute("SELECT epoch FROM store_epoch").fetchone()[0]
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _get(self, name: str):
+        with self._lock:
+            row = self._connect().execute("SELECT revision FROM revision WHERE name = ?", (name,)).fetchone()
+            return f"{self._epoch}.{row[0] if row else 0}"
+
+    def _bump(self, name: str):
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO revision (name, revision) VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET revision = revision + 1",
+                (name,)
+            )
+
+    async def get(self, name: str):
+        """The current revision of name; changes with every bump(), in any worker on the host."""
+        return await run_sync(self._get, name)
+
+    async def bump(self, name: str):
+        await run_sync(self._bump, name)
+
+REVISIONS = RevisionStore()
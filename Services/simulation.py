@@ -0,0 +1,200 @@
+#simulation.py runs what-if and Monte Carlo variants of calculate_got_details
+#scenarios and runs are cut into batches and spread over the process pool (Services/workers.py);
+#workers only get plain dicts and return small Counters, so very little crosses process boundaries
+
+import os
+import random
+import time
+from collections import Counter
+from math import ceil
+from Database.database import SUPABASE, run_query
+from Services.utils import calculate_got_details, has_passed
+from Services.workers import CPU_MAX_WORKERS, map_in_processes
+
+DEFAULT_PASS_RATE = 0.9 #prior for courses with little or no history
+PRIOR_WEIGHT = 5 #how many imaginary attempts the prior is worth
+INLINE_EVALUATIONS = 200 #below this the pool's startup/pickling costs more than it saves
+INLINE_RUNS = 5000 #Monte Carlo runs reuse repeated outcomes, so they stay inline for longer
+PASS_RATE_PAGE = 1000
+PASS_RATE_TTL_SECONDS = float(os.getenv("PASS_RATE_TTL_SECONDS", "3600"))
+
+MONTH_ORDER = {"Jan": 1, "May": 5, "Sept": 9}
+
+_pass_rates = {} #course_code -> (stored_at, rate)
+
+async def historical_pass_rates(course_codes: list):
+    """
+    Share of Completed attempts that passed, per course, across every student.
+    Smoothed toward DEFAULT_PASS_RATE so a course with two attempts does not swing to 0% or 100%.
+    """
+    now = time.monotonic()
+    missing = [c for c in course_codes if c not in _pass_rates or now - _pass_rates[c][0] >= PASS_RATE_TTL_SECONDS]
+
+    if missing:
+        attempts, passes, offset = Counter(), Counter(), 0
+        while True:
+            page = (await run_query(SUPABASE.table("STUDENT_COURSE")
+                .select("course_code, grade, status")
+                .eq("status", "Completed")
+                .in_("course_code", missing)
+                .order("course_code")
+                .range(offset, offset + PASS_RATE_PAGE - 1))).data or []
+            for row in page:
+                attempts[row["course_code"]] += 1
+                passes[row["course_code"]] += has_passed(row)
+            if len(page) < PASS_RATE_PAGE:
+                break
+            offset += PASS_RATE_PAGE
+
+        for code in missing:
+            rate = (passes[code] + DEFAULT_PASS_RATE * PRIOR_WEIGHT) / (attempts[code] + PRIOR_WEIGHT)
+            _pass_rates[code] = (now, rate)
+
+    return {code: _pass_rates[code][1] for code in course_codes}
+
+def pending_courses(records: list):
+    """Courses whose latest attempt is still Current or Planned and that have never been passed."""
+    latest = {}
+    for record in records:
+        code = record.get("course_code")
+        if code and (code not in latest or int(record.get("semester", 0)) > int(latest[code].get("semester", 0))):
+            latest[code] = record
+    passed = {r.get("course_code") for r in records if has_passed(r)}
+    return [code for code, record in latest.items() if code not in passed and record.get("status") in ("Current", "Planned")]
+
+def _failed_attempt(code: str, attempts: list, context: dict):
+    if attempts:
+        semester = max(int(a.get("semester", 0)) for a in attempts)
+        course_info = attempts[0].get("COURSE") or {}
+    else:
+        semester = max([int(r.get("semester", 0)) for r in context["records"]] or [0]) + 1
+        course_info = {"credit_hour": context["credits"].get(code, 0)}
+    return {"course_code": code, "semester": semester, "grade": "F", "status": "Completed", "COURSE": course_info}
+
+def run_scenario(context: dict, scenario: dict):
+    """
+    calculate_got_details for one what-if scenario:
+      fail_courses            every attempt of these courses is replaced by a failed one
+      probation_semesters     extra probation semesters on top of the student's own
+      extra_deferment_normal / extra_deferment_medical   extra deferments
+    """
+    records = context["records"]
+    fail = set(scenario.get("fail_courses") or [])
+    if fail:
+        attempts = {}
+        for record in records:
+            attempts.setdefault(record.get("course_code"), []).append(record)
+        records = [r for r in records if r.get("course_code") not in fail]
+        records += [_failed_attempt(code, attempts.get(code, []), context) for code in sorted(fail)]
+
+    return calculate_got_details(
+        intake_date=context["intake_date"],
+        all_student_courses=records,
+        probation_count=context["probation_count"] + scenario.get("probation_semesters", 0),
+        total_degree_credits=context["total_degree_credits"],
+        defer_normal=context["defer_normal"] + scenario.get("extra_deferment_normal", 0),
+        defer_medical=context["defer_medical"] + scenario.get("extra_deferment_medical", 0)
+    )
+
+def run_scenario_batch(batch: tuple):
+    context, scenarios = batch
+    return [run_scenario(context, scenario) for scenario in scenarios]
+
+def run_monte_carlo_batch(batch: tuple):
+    """Draws pass/fail for every pending course runs times; returns distributions, not the runs."""
+    context, pass_rates, runs, seed = batch
+    rng = random.Random(seed)
+    pending = list(pass_rates.items())
+
+    # Same records run_scenario would build, assembled from pieces prepared once per batch
+    attempts = {}
+    for record in context["records"]:
+        attempts.setdefault(record.get("course_code"), []).append(record)
+    settled = [r for r in context["records"] if r.get("course_code") not in pass_rates]
+    failed_row = {code: _failed_attempt(code, attempts.get(code, []), context) for code in pass_rates}
+
+    def analyse(failed: tuple):
+        records = list(settled)
+        for code, _ in pending:
+            if code in failed:
+                records.append(failed_row[code])
+            else:
+                records.extend(attempts.get(code, []))
+        return calculate_got_details(
+            intake_date=context["intake_date"],
+            all_student_courses=records,
+            probation_count=context["probation_count"],
+            total_degree_credits=context["total_degree_credits"],
+            defer_normal=context["defer_normal"],
+            defer_medical=context["defer_medical"]
+        )
+
+    # The estimate depends only on which pending courses fail, and most runs share a handful of outcomes
+    outcomes = {}
+    dates, residency = Counter(), Counter()
+    invalid = on_time = 0
+    for _ in range(runs):
+        failed = tuple(code for code, rate in pending if rng.random() >= rate)
+        if failed not in outcomes:
+            outcomes[failed] = analyse(failed)
+        analysis = outcomes[failed]
+        residency[analysis["total_semesters"] if not analysis["is_valid_degree"] else analysis["residency_count"]] += 1
+        if not analysis["is_valid_degree"]:
+            invalid += 1
+            continue
+        dates[analysis["graduate_on_time_date"]] += 1
+        on_time += analysis["meta"]["extra_semesters"] == 0
+
+    return dates, residency, invalid, on_time
+
+def _chunks(items: list, count: int):
+    size = max(1, ceil(len(items) / count))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _date_key(label: str):
+    month, year = label.split()
+    return int(year), MONTH_ORDER.get(month, 0)
+
+def _distribution(counter: Counter, total: int, key=None):
+    return [
+        {"value": value, "count": count, "probability": round(count / total, 4)}
+        for value, count in sorted(counter.items(), key=lambda item: key(item[0]) if key else item[0])
+    ]
+
+async def simulate_scenarios(context: dict, scenarios: list):
+    if len(scenarios) < INLINE_EVALUATIONS:
+        return run_scenario_batch((context, scenarios))
+
+    results = await map_in_processes(run_scenario_batch, [(context, chunk) for chunk in _chunks(scenarios, CPU_MAX_WORKERS)])
+    return [analysis for chunk in results for analysis in chunk]
+
+async def simulate_monte_carlo(context: dict, pass_rates: dict, runs: int, seed: int = None):
+    """Distribution of graduation dates and residency counts over runs random outcomes of the pending courses."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+
+    if runs < INLINE_RUNS:
+        batches = [run_monte_carlo_batch((context, pass_rates, runs, seed))]
+    else:
+        workers = min(CPU_MAX_WORKERS, ceil(runs / INLINE_RUNS))
+        sizes = [runs // workers + (i < runs % workers) for i in range(workers)]
+        batches = await map_in_processes(
+            run_monte_carlo_batch,
+            [(context, pass_rates, size, seed + i) for i, size in enumerate(sizes)]
+        )
+
+    dates, residency, invalid, on_time = Counter(), Counter(), 0, 0
+    for batch_dates, batch_residency, batch_invalid, batch_on_time in batches:
+        dates.update(batch_dates)
+        residency.update(batch_residency)
+        invalid += batch_invalid
+        on_time += batch_on_time
+
+    return {
+        "runs": runs,
+        "seed": seed,
+        "pending_courses": {code: round(rate, 4) for code, rate in sorted(pass_rates.items())},
+        "on_time_probability": round(on_time / runs, 4) if runs else 0.0,
+        "invalid_degree_probability": round(invalid / runs, 4) if runs else 0.0,
+        "graduation_dates": _distribution(dates, runs, key=_date_key),
+        "residency_counts": _distribution(residency, runs),
+    }
@@ -0,0 +1,72 @@
+#snapshot.py loads a student's whole STUDENT_COURSE history once per request
+#summary, standing, probation and the add path all compute from the same rows instead of re-querying
+
+from uuid import UUID
+from Database.database import SUPABASE, run_query
+from Services.utils import Calc_Cgpa, TotalCreditHour, probation_from_records, probation_timeline, sem_sorter
+
+SNAPSHOT_COLUMNS = "course_code, semester, grade, status, COURSE(credit_hour)"
+
+class AcademicSnapshot:
+    """One student's academic records plus the figures derived from them."""
+
+    def __init__(self, student_id: UUID, records: list):
+        self.student_id = student_id
+        self.records = records or []
+
+        # Standard Status Filtering (Exemptions never count toward CGPA)
+        self.completed_list = [c for c in self.records if c["status"] == "Completed" and c["grade"] != "Exemption"]
+        self.current_list = [c for c in self.records if c["status"] == "Current"]
+        self.planned_list = [c for c in self.records if c["status"] == "Planned"]
+
+    @classmethod
+    async def load(cls, student_id: UUID):
+        response = await run_query(SUPABASE.table("STUDENT_COURSE")
+            .select(SNAPSHOT_COLUMNS)
+            .eq("student_id", student_id))
+        return cls(student_id, response.data)
+
+    @property
+    def semesters(self):
+        """Unique semesters as strings, in academic order."""
+        return sorted(set(str(r["semester"]) for r in self.records), key=sem_sorter)
+
+    def records_in(self, semester):
+        return [r for r in self.records if str(r["semester"]) == str(semester)]
+
+    def probation_status(self, target_semester):
+        return probation_from_records(self.records, target_semester)
+
+    def probation_timeline(self):
+        return probation_timeline(self.records)
+
+    @property
+    def probation_count(self):
+        """Semesters spent on probation (capped at 11 credits)."""
+        return sum(entry["is_probation"] for entry in self.probation_timeline())
+
+    @property
+    def cgpa(self):
+        return Calc_Cgpa(self.completed_list)
+
+    @property
+    def earned_credits(self):
+        return TotalCreditHour(self.completed_list)
+
+    @property
+    def semester_credits(self):
+        """Registered credit hours per semester, across all statuses."""
+        sem_credits = {}
+        for record in self.records:
+            sem = str(record.get("semester"))
+            course_info = record.get("COURSE") or {}
+            sem_credits[sem] = sem_credits.get(sem, 0) + course_info.get("credit_hour", 0)
+        return sem_credits
+
+    @property
+    def latest_semester(self):
+        """Highest numeric semester on record, as a string ("1" when there is none)."""
+        try:
+            return str(max([int(s) for s in self.semester_credits.keys() if s.isdigit()] or [1]))
+        except ValueError:
+            return "1"
@@ -1,8 +1,6 @@
-from passlib.context import CryptContext
-from Database.database import SUPABASE
+from Database.providers import Provider
 from math import ceil
-from datetime import date, timedelta
-from uuid import UUID
+from datetime import date
 import os
 import secrets
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -33,7 +31,11 @@ def authenticate_admin(credentials: HTTPBasicCredentials = Depends(security)):
         )
     return credentials.username
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def create_pwd_context():
+    from passlib.context import CryptContext #only the signup/login routes need bcrypt
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+pwd_context = Provider("pwd_context", create_pwd_context)
 def HashPassword(password:str):
     safe_password = password[:72] #72 bytes of password hashed only
     return pwd_context.hash(safe_password)
@@ -41,6 +43,18 @@ def HashPassword(password:str):
 def VerifyPassword(plain_password:str, hashed_password:str):
     return pwd_context.verify(plain_password,hashed_password)
 
+def has_passed(record: dict):
+    """A single attempt counts as a pass when it is Completed with a non-failing grade."""
+    return record.get("status") == "Completed" and record.get("grade") not in ["F", "Fail", None]
+
+def find_missing_prereqs(pre_reqs: list, history: list):
+    """
+    Returns the prerequisite codes with no passing attempt in history.
+    history holds the student's STUDENT_COURSE rows (any number of attempts per course).
+    """
+    passed_codes = {record.get("course_code") for record in history if has_passed(record)}
+    return [code for code in pre_reqs if code not in passed_codes]
+
 def TotalCreditHour(courses: list):
 
     total_earned_credits = 0 # Credits that actually count toward graduation
@@ -108,48 +122,44 @@ def Calc_Cgpa(completed_list: list):
     if not completed_list:
         return 0.00
 
+    # Standard calculation using your existing utility, on the latest attempts only
+    points, credits = calculate_points_and_credits(latest_attempts(completed_list))
+    return round(points / credits, 2) if credits > 0 else 0.00
+
+def latest_attempts(completed_list: list):
+    """The latest attempt of each course_code, as Calc_Cgpa counts them."""
     # 1. Group by course_code to find all attempts
-    latest_attempts = {}
+    latest = {}
     for record in completed_list:
         code = record.get("course_code")
         # Ensure semester is treated as an integer for comparison
         sem = int(record.get("semester", 0))
         
-        if code not in latest_attempts or sem > int(latest_attempts[code].get("semester", 0)):
-            latest_attempts[code] = record
+        if code not in latest or sem > int(latest[code].get("semester", 0)):
+            latest[code] = record
 
     # 2. Extract only the latest unique attempts
-    unique_latest_courses = list(latest_attempts.values())
+    return list(latest.values())
 
-    # 3. Standard calculation using your existing utility
-    points, credits = calculate_points_and_credits(unique_latest_courses)
-    return round(points / credits, 2) if credits > 0 else 0.00
+def sem_sorter(sem):
+    """Orders semesters numerically, placing the text-based Internship between 7 and 8."""
+    try:
+        return float(sem) # Numeric sems (1, 2, 3...)
+    except ValueError:
+        return 7.5 # Place text-based internship between 7 and 8
 
-def Get_Probation_Status(student_id: UUID, target_semester: str):
+def probation_from_records(records: list, target_semester: str):
     """
-    Checks the GPA of the semester logically preceding target_semester.
-    Works for any department or semester naming convention.
+    Pure version of the probation rule, evaluated on a student's already-loaded STUDENT_COURSE rows
+    (each with semester, status, grade and COURSE(credit_hour)).
     """
-    # 1. Fetch all unique semesters this student has records for
-    all_sems_query = SUPABASE.table("STUDENT_COURSE") \
-        .select("semester") \
-        .eq("student_id", student_id) \
-        .execute()
-    
-    if not all_sems_query.data:
+    if not records:
         return False, 15
 
-    # 2. Create a sorted unique list of semesters
-    # We use a helper to ensure "Internship" comes after "7" but before "8"
-    def sem_sorter(sem):
-        try:
-            return float(sem) # Numeric sems (1, 2, 3...)
-        except ValueError:
-            return 7.5 # Place text-based internship between 7 and 8
-
-    unique_sems = sorted(list(set(str(r['semester']) for r in all_sems_query.data)), key=sem_sorter)
+    # 1. Create a sorted unique list of semesters
+    unique_sems = sorted(set(str(r['semester']) for r in records), key=sem_sorter)
 
-    # 3. Identify the previous semester
+    # 2. Identify the previous semester
     target_sem_str = str(target_semester)
     if target_sem_str not in unique_sems or target_sem_str == unique_sems[0]:
         return False, 15
@@ -157,21 +167,45 @@ def Get_Probation_Status(student_id: UUID, target_semester: str):
     current_index = unique_sems.index(target_sem_str)
     prev_sem = unique_sems[current_index - 1]
 
-    # 4. Fetch and Calculate GPA for that specific previous semester
-    # NOTE: Use .eq("semester", prev_sem) directly if the DB column is text. 
-    # If DB is smallint, use int(prev_sem) inside a try/except.
-    response = SUPABASE.table("STUDENT_COURSE") \
-        .select("*, COURSE(credit_hour)") \
-        .eq("student_id", student_id) \
-        .eq("semester", prev_sem) \
-        .execute()
+    # 3. Calculate GPA for that specific previous semester
+    prev_records = [r for r in records if str(r['semester']) == prev_sem]
 
-    if not response.data or not all(r.get("status") == "Completed" for r in response.data):
+    if not prev_records or not all(r.get("status") == "Completed" for r in prev_records):
         return False, 15
 
-    gpa = Calc_Gpa(response.data)
+    gpa = Calc_Gpa(prev_records)
     return (True, 11) if gpa < 2.00 else (False, 15)
 
+def probation_timeline(records: list):
+    """
+    Every semester's GPA, probation flag and credit cap, in sem_sorter order, from one pass over
+    a student's STUDENT_COURSE rows. Each entry matches probation_from_records(records, semester).
+    """
+    by_sem = {}
+    for r in records:
+        by_sem.setdefault(str(r['semester']), []).append(r)
+
+    timeline = []
+    prev = None
+    for sem in sorted(by_sem, key=sem_sorter):
+        sem_records = by_sem[sem]
+        entry = {
+            "semester": sem,
+            "gpa": Calc_Gpa(sem_records),
+            "all_completed": all(r.get("status") == "Completed" for r in sem_records),
+            "is_probation": False,
+            "max_limit": 15,
+        }
+        # Same rule as probation_from_records: a finished previous semester below 2.00
+        if prev is not None and prev["all_completed"] and prev["gpa"] < 2.00:
+            entry["is_probation"], entry["max_limit"] = True, 11
+        entry["status_label"] = "Probation" if entry["is_probation"] else "Normal"
+
+        timeline.append(entry)
+        prev = entry
+
+    return timeline
+
 def calculate_got_details(
     intake_date: date, 
     all_student_courses: list, 
@@ -0,0 +1,42 @@
+#workers.py runs CPU-bound work (GOT simulations and the like) in a process pool
+#a thread would hold the GIL and stall every request waiting on the event loop
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+CPU_MAX_WORKERS = int(os.getenv("CPU_MAX_WORKERS", str(os.cpu_count() or 2)))
+
+_pool = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Returns the shared process pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        # forkserver: workers neither inherit the listening socket nor fork a process that is running threads
+        _pool = ProcessPoolExecutor(max_workers=CPU_MAX_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+    return _pool
+
+def shutdown_process_pool():
+    """
+    Stops the pool's workers; called from the app's shutdown. uvicorn re-raises SIGTERM after its own
+    shutdown, so atexit never runs and the workers would otherwise outlive the server.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+async def run_in_process(func, *args, **kwargs):
+    """
+    Runs func(*args, **kwargs) in the process pool and awaits the result.
+    func must be a module-level function and its arguments picklable.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+async def map_in_processes(func, chunks: list):
+    """Runs func(chunk) for every chunk concurrently across the pool, results in chunk order."""
+    return await asyncio.gather(*(run_in_process(func, chunk) for chunk in chunks))
@@ -1,11 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends
 from Database.database import SUPABASE
+from Database import http_pool
 from Routes import student,course, student_course, advisor, report
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from Routes.advisor import limiter  
-app = FastAPI()
+from Services.workers import shutdown_process_pool
+from Services.responses import FastJSONResponse
+from Services.utils import authenticate_admin
+from Services.image_store import IMAGE_STORAGE, IMAGE_LOCAL_DIR, CachedStaticFiles
+import os
+
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024")) #smaller bodies fit in a packet or two anyway
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6")) #level 9 costs ~2x the CPU for ~2% smaller catalog/transcript bodies
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_process_pool() #simulation and thumbnail workers must not outlive the server
+
+#orjson renders every response; the big catalog/report routes also skip jsonable_encoder via json_response
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
@@ -28,6 +46,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+#server-sent events (text/event-stream) are left uncompressed by the middleware
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_LEVEL)
 
 app.include_router(student.router, prefix="/student", tags=["student"]) #take every router from student.py and include it in main app
 app.include_router(course.router, prefix="/course", tags=["course"]) #if i have routes like @router.get("/course") in course.py then it will be accessible at /course/course
@@ -35,6 +55,11 @@ app.include_router(student_course.router, prefix="/student_course", tags=["stude
 app.include_router(advisor.router, prefix="/advisor", tags=["advisor"])
 app.include_router(report.router, prefix="/report", tags=["report"])
 
+#local stand-in for the storage bucket (IMAGE_STORAGE=local): thumbnails are served from disk
+if IMAGE_STORAGE == "local":
+    os.makedirs(IMAGE_LOCAL_DIR, exist_ok=True)
+    app.mount("/media", CachedStaticFiles(directory=IMAGE_LOCAL_DIR), name="media")
+
 @app.get("/check") #@app is the main FastAPI instance which connects all routes (@router) together
 def check_connection():
     try:
@@ -44,4 +69,9 @@ def check_connection():
         return {"status": "Database connection successful"} 
     
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Connection failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Connection failed: {str(e)}")
+
+@app.get("/check/http")
+def read_http_pool_stats(username: str = Depends(authenticate_admin)):
+    """Requests, new connections and TLS handshakes per outbound HTTP client (see Database/http_pool.py)."""
+    return http_pool.stats()
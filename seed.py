@@ -1,33 +1,225 @@
 #seed.py is for adding course or updating course information to the database
 #to update the course information in the database, make a change in Data/courses.json
 #and then, in cmd, run cd backend, run python seed.py
+#by default only courses whose content changed are upserted; python seed.py --dry-run shows the diff
+#without writing, python seed.py --full upserts every course like before
 
 from Database.database import SUPABASE
+from Services.catalog import CATALOG, normalize_prereqs, normalize_departments
+import argparse
+import asyncio
+import hashlib
 import os #for file manipulation and detection
 import json
+import sys
+import httpx
+import orjson
 
-def seed_courses():
-    file_path = os.path.join("Data","courses.json")
+SEED_CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", "500")) #rows per upsert request
+READ_PAGE_SIZE = 1000 #PostgREST's default max-rows, so larger catalogs are read page by page
+READ_BUFFER_SIZE = 64 * 1024
 
-    if not os.path.exists(file_path):
-        print(f"Error: {file_path} not found")
+def invalidate_catalog_cache():
+    """
+    The API keeps COURSE in memory, so after a write we ask it to reload.
+    Bumping the shared catalog revision reaches every worker on this host within CATALOG_SYNC_SECONDS.
+    Set API_BASE_URL (plus ADMIN_USER / ADMIN_PASS) to notify a server on another host;
+    otherwise it picks the change up once CATALOG_TTL_SECONDS expires.
+    """
+    asyncio.run(CATALOG.invalidate())
+
+    api_base_url = os.getenv("API_BASE_URL")
+    if not api_base_url:
+        print("API_BASE_URL not set: servers on other hosts will reload the catalog when their cache TTL expires.")
         return
 
     try:
-        with open(file_path, "r") as file:
-            courses_data = json.load(file)
-            
-        print(f"Read {len(courses_data)} courses from JSON.")
+        response = httpx.post(
+            f"{api_base_url.rstrip('/')}/course/cache/invalidate",
+            auth=(os.getenv("ADMIN_USER", ""), os.getenv("ADMIN_PASS", "")),
+            timeout=10,
+        )
+        response.raise_for_status()
+        print("Notified the API to reload its course catalog.")
+    except httpx.HTTPError as e:
+        print(f"Could not notify the API to reload its course catalog: {e}")
+
+def iter_json_array(file, buffer_size: int = READ_BUFFER_SIZE):
+    """
+    Yields the objects of a top-level JSON array one at a time, reading the file in buffer_size
+    pieces, so a catalog of any size never has to be held in memory as a whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof, started = "", 0, False, False
+
+    while True:
+        # skip whitespace and separators; refill when the buffer runs out
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of file: the course array is not closed.")
+            buffer, pos = file.read(buffer_size), 0
+            eof = not buffer
+            continue
+
+        if not started:
+            if buffer[pos] != "[":
+                raise ValueError("The course file must contain a JSON array of courses.")
+            started, pos = True, pos + 1
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(buffer_size) #the object is cut off at the buffer end
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        if not isinstance(item, dict):
+            raise ValueError(f"Expected a course object, got {type(item).__name__}.")
+        yield item
+        pos = end #the buffer is only trimmed when a read refills it, once per chunk
+
+def canonical_course(row: dict, fields):
+    """The fields of a course in one comparable form, whatever way the file or table spells them."""
+    course = {}
+    for field in fields:
+        value = row.get(field)
+        if field == "pre_requisite":
+            value = normalize_prereqs(value)
+        elif field == "course_department":
+            value = normalize_departments(value)
+        elif field == "course_semester":
+            value = None if value is None else str(value) #a text column in COURSE
+        elif field == "credit_hour":
+            value = float(value or 0)
+        course[field] = value
+    return course
+
+def course_hash(row: dict, fields):
+    canonical = orjson.dumps(canonical_course(row, fields), option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.sha256(canonical).hexdigest()
+
+def fetch_stored_courses():
+    """Every COURSE row by course_code, read in pages."""
+    stored, start = {}, 0
+    while True:
+        response = (SUPABASE.table("COURSE").select("*")
+            .order("course_code")
+            .range(start, start + READ_PAGE_SIZE - 1)
+            .execute())
+        rows = response.data or []
+        for row in rows:
+            stored[row["course_code"]] = row
+        if len(rows) < READ_PAGE_SIZE:
+            return stored
+        start += READ_PAGE_SIZE
+
+def diff_courses(file_courses, stored: dict):
+    """
+    Compares the file with the table by content hash.
+    Returns (added, changed, unchanged count, removed codes); added and changed hold the file rows.
+    """
+    pending, unchanged, seen = {}, set(), set()
 
-        response = SUPABASE.table("COURSE").upsert( #insert and update all courses info into course table
-            courses_data, 
-            on_conflict="course_code"
-        ).execute()
+    for course in file_courses:
+        code = course.get("course_code")
+        if not code:
+            raise ValueError(f"Course without a course_code: {course}")
+        if code in seen:
+            print(f"Warning: {code} appears more than once in the file; the last entry wins.")
+            pending.pop(code, None)
+            unchanged.discard(code)
+        seen.add(code)
 
-        print(f"Successfully synced {len(response.data)} courses to Supabase.")
+        if code in stored and course_hash(course, course.keys()) == course_hash(stored[code], course.keys()):
+            unchanged.add(code)
+        else:
+            pending[code] = course
 
+    added = [course for code, course in pending.items() if code not in stored]
+    changed = [course for code, course in pending.items() if code in stored]
+    removed = sorted(code for code in stored if code not in seen)
+    return added, changed, len(unchanged), removed
+
+def print_diff(added: list, changed: list, unchanged: int, removed: list, stored: dict):
+    for course in added:
+        print(f"  + {course['course_code']} {course.get('course_name') or ''}".rstrip())
+    for course in changed:
+        old = canonical_course(stored[course["course_code"]], course.keys())
+        new = canonical_course(course, course.keys())
+        fields = [field for field in new if new[field] != old[field]]
+        print(f"  ~ {course['course_code']}: {', '.join(fields)}")
+    for code in removed:
+        print(f"  - {code} (in the table but not in the file; left untouched)")
+    print(f"{len(added)} new, {len(changed)} changed, {unchanged} unchanged, {len(removed)} only in the table.")
+
+def upsert_in_chunks(courses: list, chunk_size: int):
+    """Upserts courses chunk by chunk; returns (rows written, codes in chunks that failed)."""
+    written, failed = 0, []
+    for start in range(0, len(courses), chunk_size):
+        chunk = courses[start:start + chunk_size]
+        try:
+            response = SUPABASE.table("COURSE").upsert( #insert and update the courses info in the course table
+                chunk,
+                on_conflict="course_code"
+            ).execute()
+            written += len(response.data)
+        except Exception as e:
+            codes = [course["course_code"] for course in chunk]
+            failed.extend(codes)
+            print(f"Chunk {start // chunk_size + 1} ({codes[0]} .. {codes[-1]}, {len(codes)} courses) failed: {e}")
+    return written, failed
+
+def seed_courses(file_path: str = os.path.join("Data", "courses.json"), dry_run: bool = False,
+                 full: bool = False, chunk_size: int = SEED_CHUNK_SIZE):
+    """Syncs the course file into COURSE; returns False when anything could not be read or written."""
+    if not os.path.exists(file_path):
+        print(f"Error: {file_path} not found")
+        return False
+
+    try:
+        stored = {} if full else fetch_stored_courses()
+        with open(file_path, "r") as file:
+            if full:
+                added, changed, unchanged, removed = list(iter_json_array(file)), [], 0, []
+            else:
+                added, changed, unchanged, removed = diff_courses(iter_json_array(file), stored)
     except Exception as e:
         print(f"An error occurred during seeding: {e}")
+        return False
+
+    if full:
+        print(f"Read {len(added)} courses from JSON; upserting all of them.")
+    else:
+        print_diff(added, changed, unchanged, removed, stored)
+
+    pending = added + changed
+    if dry_run or not pending:
+        print("Dry run: nothing written." if dry_run else "Course table already up to date.")
+        return True
+
+    written, failed = upsert_in_chunks(pending, chunk_size)
+    print(f"Successfully synced {written} courses to Supabase.")
+    if written:
+        invalidate_catalog_cache()
+    if failed:
+        print(f"{len(failed)} courses were not synced: {', '.join(failed)}")
+    return not failed
 
 if __name__ == "__main__":
-    seed_courses()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync Data/courses.json into the COURSE table.")
+    parser.add_argument("--file", default=os.path.join("Data", "courses.json"))
+    parser.add_argument("--dry-run", action="store_true", help="print what would change without writing")
+    parser.add_argument("--full", action="store_true", help="upsert every course, changed or not")
+    parser.add_argument("--chunk-size", type=int, default=SEED_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    ok = seed_courses(args.file, dry_run=args.dry_run, full=args.full, chunk_size=max(1, args.chunk_size))
+    sys.exit(0 if ok else 1)